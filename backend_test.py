@@ -331,6 +331,34 @@ class EPasarAPITester:
                     "Valid agricultural product was not approved during creation"
                 )
 
+    def test_bulk_product_import(self):
+        """Test bulk product import with a per-row report"""
+        print("\n📥 Testing Bulk Product Import...")
+
+        timestamp = int(datetime.now().timestamp())
+        rows = [
+            {"productName": f"Fresh Organic Carrots {timestamp}", "description": "Locally grown organic carrots vegetable",
+             "price": 3.5, "category": 2, "availableQty": 40},
+            {"productName": "Office Chair", "description": "Comfortable swivel chair for office use", "price": 150, "category": 1},
+        ]
+        body = "\n".join(json.dumps(row) for row in rows)
+
+        try:
+            response = requests.post(
+                f"{self.base_url}/products/import",
+                data=body.encode("utf-8"),
+                headers={"Content-Type": "application/x-ndjson", "Authorization": f"Bearer {self.token}"}
+            )
+            result = response.json().get("data", {})
+            statuses = [row.get("status") for row in result.get("rows", [])]
+            self.log_test(
+                "Bulk Product Import",
+                response.status_code == 200 and statuses == ["created", "rejected"],
+                f"Status: {response.status_code}, rows: {statuses}"
+            )
+        except Exception as e:
+            self.log_test("Bulk Product Import", False, f"Request failed: {str(e)}")
+
     def test_enhanced_suggest_category(self):
         """Test the enhanced suggest-category endpoint with approval status"""
         print("\n🎯 Testing Enhanced Suggest-Category Endpoint...")
@@ -456,6 +484,7 @@ class EPasarAPITester:
         # Run all verification tests
         self.test_enhanced_product_verification()
         self.test_product_creation_with_verification()
+        self.test_bulk_product_import()
         self.test_enhanced_suggest_category()
         self.test_confidence_threshold_enforcement()
         
@@ -560,6 +589,14 @@ class EPasarAPITester:
                 200
             )
             
+            # Test batch view statistics
+            self.run_test(
+                "Get Batch View Statistics",
+                "GET",
+                f"products/view-stats?ids={product_id}",
+                200
+            )
+            
             # Test popular products
             self.run_test(
                 "Get Popular Products",
@@ -769,6 +806,13 @@ class EPasarAPITester:
         
         # Test cart functionality
         self.run_test("Get Cart", "GET", "cart/view", 404)  # Empty cart expected
+        self.run_test(
+            "Reject Invalid Batch Cart Update",
+            "PATCH",
+            "cart/items",
+            400,
+            data={"operations": [{"op": "replace", "productId": 1, "quantity": 1}]}
+        )
         
         # Test orders
         self.run_test("Get User Orders", "GET", "orders/user", 400)  # No orders expected
@@ -11,6 +11,7 @@ const Endpoint = {
     checkout: `${server_base}/checkout`,
     banners: `${server_base}/banners`,
     orders: `${server_base}/orders`,
+    sellerSummary: `${server_base}/sellers/me/summary`,
     featuredProducts: `${server_base}/featuredProducts`,
     proceedToPayment: `${server_base}/proceedToPayment`,
     verifyAdminToken: `${server_base}/../schedule/verifyToken`,
@@ -18,16 +19,22 @@ const Endpoint = {
     adminLogin: `${server_base}/login`,
     adminUsers: `${server_base}/admin/users`,
     suspendAccount: `${server_base}/admin/changeAccountStatus`,
+    bulkAccountStatus: `${server_base}/admin/changeAccountStatus/bulk`,
     approveSeller: `${server_base}/admin/approve-seller`,
     rejectSeller: `${server_base}/admin/reject-seller`,
     sellerApplication: `${server_base}/admin/seller_application`,
+    sellerApplications: `${server_base}/admin/seller-applications`,
+    approveSellers: `${server_base}/admin/approve-sellers`,
+    rejectSellers: `${server_base}/admin/reject-sellers`,
     addAdmin: `${server_base}/admin/add-admin`,
     userProfile: `${server_base}/profile`,
     updateUser: `${server_base}/user/update`,
     // New endpoints for upgraded features
     suggestCategory: `${server_base}/products/suggest-category`,
     generateImage: `${server_base}/products/generate-image`,
+    importProducts: `${server_base}/products/import`,
     imageOptions: `${server_base}/products/image-options`,
+    productImageStatus: `${server_base}/products/image-status`,
     trackView: `${server_base}/products/track-view`,
     viewStats: `${server_base}/products/view-stats`,
     popularProducts: `${server_base}/products/popular`,
@@ -39,6 +46,7 @@ const Endpoint = {
     sendMessage: `${server_base}/communication/conversation`,
     manageDispute: `${server_base}/communication/conversation`,
     unreadCount: `${server_base}/communication/unread-count`,
+    inbox: `${server_base}/communication/inbox`,
     searchUsers: `${server_base}/communication/search-users`,
     // NEW ENHANCED COMMUNICATION ENDPOINTS
     contactSeller: `${server_base}/communication/contact-seller`,
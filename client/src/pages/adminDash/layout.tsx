@@ -71,6 +71,13 @@ export default function Admin_Lay({ children }: { children: React.ReactNode }) {
                                         <span>👥</span>
                                         <span>Users</span>
                                     </Link>
+                                    <Link 
+                                        href="/adminDash/sellerApplications"
+                                        className="flex items-center space-x-2 hover:bg-white hover:bg-opacity-10 px-3 py-2 rounded-lg transition duration-200"
+                                    >
+                                        <span>📝</span>
+                                        <span>Seller Applications</span>
+                                    </Link>
                                     <Link 
                                         href="/adminDash/communications"
                                         className="flex items-center space-x-2 hover:bg-white hover:bg-opacity-10 px-3 py-2 rounded-lg transition duration-200"
@@ -0,0 +1,170 @@
+import { useEffect, useState } from 'react';
+import axios from 'axios';
+import Endpoint from '@/endpoint';
+import getToken from '@/tokenmanager';
+import Admin_Lay from './layout';
+
+export default function Admin_SellerApplications() {
+    const [applications, setApplications] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [selected, setSelected] = useState<number[]>([]);
+    const [loading, setLoading] = useState(false);
+
+    // pending applications, oldest first; "Load more" continues from the last one
+    const loadApplications = (cursor: string | null) => {
+        const token = getToken('token');
+        setLoading(true);
+        axios.get(Endpoint.sellerApplications, {
+            headers: { Authorization: `Bearer ${token}` },
+            params: cursor ? { cursor } : {}
+        })
+        .then((res) => {
+            if (res.data.status === 200) {
+                setApplications(prev => cursor ? [...prev, ...res.data.data] : res.data.data);
+                setNextCursor(res.data.pagination.nextCursor);
+            } else {
+                throw new Error(res.data.message || 'Session expired');
+            }
+        })
+        .catch((err) => {
+            console.error('Failed to fetch seller applications:', err);
+        })
+        .finally(() => setLoading(false));
+    };
+
+    useEffect(() => {
+        loadApplications(null);
+    }, []);
+
+    const toggleSelected = (id: number) => {
+        setSelected(prev => prev.includes(id) ? prev.filter(selectedId => selectedId !== id) : [...prev, id]);
+    };
+
+    const toggleAll = () => {
+        setSelected(selected.length === applications.length ? [] : applications.map(application => application.UserID));
+    };
+
+    const handleReview = (decision: 'Approved' | 'Rejected') => {
+        const token = getToken('token');
+        const endpoint = decision === 'Approved' ? Endpoint.approveSellers : Endpoint.rejectSellers;
+
+        axios.patch(endpoint, { ids: selected }, {
+            headers: { Authorization: `Bearer ${token}` }
+        })
+        .then((response) => {
+            const results = response.data.data || [];
+            const done = results.filter((r: any) => r.result !== 'failed').map((r: any) => Number(r.userID));
+            const failed = results.filter((r: any) => r.result === 'failed');
+            alert(`${done.length} application(s) processed` + (failed.length ? `, ${failed.length} failed: ${failed.map((r: any) => `#${r.userID} ${r.message}`).join('; ')}` : ''));
+            // reviewed applications leave the pending queue
+            setApplications(prev => prev.filter(application => !done.includes(application.UserID)));
+            setSelected([]);
+        })
+        .catch(() => alert('Error reviewing seller applications'));
+    };
+
+    return (
+        <Admin_Lay>
+            <div className="bg-white rounded-lg shadow-xl">
+                {/* Header */}
+                <div className="bg-gradient-to-r from-red-50 to-purple-50 p-6 border-b">
+                    <h1 className="text-2xl font-bold text-gray-800 flex items-center">
+                        📝 <span className="ml-2">Seller Applications</span>
+                    </h1>
+                    <p className="text-gray-600 mt-2">Pending seller applications, oldest first</p>
+                </div>
+
+                {/* Bulk actions */}
+                <div className="flex items-center gap-3 px-6 py-3 border-b">
+                    <span className="text-sm text-gray-700">{selected.length} selected</span>
+                    <button
+                        onClick={() => handleReview('Approved')}
+                        disabled={selected.length === 0}
+                        className="px-4 py-2 bg-green-600 text-white rounded-lg hover:bg-green-700 disabled:opacity-50"
+                    >
+                        ✅ Approve selected
+                    </button>
+                    <button
+                        onClick={() => handleReview('Rejected')}
+                        disabled={selected.length === 0}
+                        className="px-4 py-2 bg-red-600 text-white rounded-lg hover:bg-red-700 disabled:opacity-50"
+                    >
+                        ❌ Reject selected
+                    </button>
+                </div>
+
+                {/* Applications Table */}
+                <div className="overflow-x-auto">
+                    <table className="min-w-full divide-y divide-gray-200">
+                        <thead className="bg-gray-50">
+                            <tr>
+                                <th className="px-6 py-3">
+                                    <input
+                                        type="checkbox"
+                                        checked={applications.length > 0 && selected.length === applications.length}
+                                        onChange={toggleAll}
+                                    />
+                                </th>
+                                <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                                    Applicant
+                                </th>
+                                <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                                    Company
+                                </th>
+                                <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                                    Submitted
+                                </th>
+                            </tr>
+                        </thead>
+                        <tbody className="bg-white divide-y divide-gray-200">
+                            {applications.map((application) => (
+                                <tr key={application.UserID} className="hover:bg-gray-50">
+                                    <td className="px-6 py-4">
+                                        <input
+                                            type="checkbox"
+                                            checked={selected.includes(application.UserID)}
+                                            onChange={() => toggleSelected(application.UserID)}
+                                        />
+                                    </td>
+                                    <td className="px-6 py-4">
+                                        <div className="text-sm font-medium text-gray-900">{application.Username}</div>
+                                        <div className="text-sm text-gray-500">{application.Email}</div>
+                                        <div className="text-sm text-gray-500">{application.ContactNo}</div>
+                                    </td>
+                                    <td className="px-6 py-4">
+                                        <div className="text-sm text-gray-900">{application.ComRegNum}</div>
+                                        <div className="text-sm text-gray-500">{application.ComAddress}</div>
+                                    </td>
+                                    <td className="px-6 py-4 text-sm text-gray-600">
+                                        {application.SubmittedAt ? new Date(application.SubmittedAt).toLocaleString() : '-'}
+                                    </td>
+                                </tr>
+                            ))}
+                        </tbody>
+                    </table>
+                </div>
+
+                {/* Empty State */}
+                {!loading && applications.length === 0 && (
+                    <div className="text-center py-12">
+                        <div className="text-4xl mb-4">📝</div>
+                        <h3 className="text-lg font-semibold text-gray-800 mb-2">No pending applications</h3>
+                        <p className="text-gray-600">New seller applications will show up here.</p>
+                    </div>
+                )}
+
+                {nextCursor && (
+                    <div className="p-6 border-t text-center">
+                        <button
+                            onClick={() => loadApplications(nextCursor)}
+                            disabled={loading}
+                            className="px-4 py-2 border border-gray-300 rounded-lg disabled:opacity-50"
+                        >
+                            {loading ? 'Loading...' : 'Load more'}
+                        </button>
+                    </div>
+                )}
+            </div>
+        </Admin_Lay>
+    );
+}
@@ -6,28 +6,51 @@ import Admin_Lay from './layout';
 import { useRouter } from 'next/router';
 import { getRole } from '@/tokenmanager';
 
+const PAGE_SIZE = 25;
+
 export default function Admin_Users() {
     const [users, setUsers] = useState<any[]>([]);
     const [myRole, setMyRole] = useState<string>('');
     const [searchTerm, setSearchTerm] = useState('');
+    const [search, setSearch] = useState('');
+    const [filters, setFilters] = useState({ accountState: '', userAuth: '', sellerStatus: '' });
+    const [page, setPage] = useState(1);
+    const [pagination, setPagination] = useState({ page: 1, total: 0, totalPages: 0 });
+    const [selected, setSelected] = useState<number[]>([]);
     const router = useRouter();
     const [sellerDetails, setSellerDetails] = useState<Record<number, { ComRegNum: string, ComAddress: string }>>({});
 
 
+    useEffect(() => {
+        setMyRole(getRole() || '');
+    }, []);
+
+    // search runs on the server, once typing pauses
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            setSearch(searchTerm.trim());
+            setPage(1);
+        }, 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
     useEffect(() => {
         const token = getToken('token');
-        const role = getRole();
-        setMyRole(role || '');
+        const params: Record<string, string | number> = { page, limit: PAGE_SIZE };
+        if (search) params.search = search;
+        for (const [key, value] of Object.entries(filters)) {
+            if (value) params[key] = value;
+        }
 
         axios.get(Endpoint.adminUsers, {
-            headers: { Authorization: `Bearer ${token}` }
+            headers: { Authorization: `Bearer ${token}` },
+            params
         })
         .then((res) => {
             if (res.data.status === 200) {
-                console.log('users from API:', res.data.data);
-                console.log('type:', typeof res.data.data);
-              
                 setUsers(res.data.data);
+                setPagination(res.data.pagination);
+                setSelected([]);
             } else {
                 throw new Error(res.data.message || 'Session expired');
             }
@@ -35,7 +58,12 @@ export default function Admin_Users() {
         .catch((err) => {
             console.error('Auth failed:', err);
         });        
-    }, []);
+    }, [page, search, filters]);
+
+    const handleFilter = (key: string, value: string) => {
+        setFilters(prev => ({ ...prev, [key]: value }));
+        setPage(1);
+    };
 
     const handleSellerStatus = (id: number, status: string) => {
         const token = getToken('token');
@@ -89,12 +117,35 @@ export default function Admin_Users() {
         .catch(() => alert('Error updating account state'));
       };      
 
-      const filteredUsers = Array.isArray(users)
-      ? users.filter(user =>
-          user.Username.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          user.Email.toLowerCase().includes(searchTerm.toLowerCase())
-        )
-      : [];
+      // accounts the signed-in admin may suspend or reactivate
+      const canChangeState = (user: any) =>
+        (myRole === 'SuperAdmin') || (myRole === 'Admin' && user.UserAuth !== 'Admin' && user.UserAuth !== 'SuperAdmin');
+
+      const toggleSelected = (id: number) => {
+        setSelected(prev => prev.includes(id) ? prev.filter(selectedId => selectedId !== id) : [...prev, id]);
+      };
+
+      const handleBulkAccountState = (state: string) => {
+        const token = getToken('token');
+        axios.patch(Endpoint.bulkAccountStatus, { ids: selected, state }, {
+          headers: { Authorization: `Bearer ${token}` }
+        })
+        .then((response) => {
+          const results = response.data.data?.results || [];
+          const updated = results.filter((r: any) => r.result === 'updated').map((r: any) => Number(r.userID));
+          const failed = results.filter((r: any) => r.result === 'failed');
+          alert(`${updated.length} account(s) updated` + (failed.length ? `, ${failed.length} failed: ${failed.map((r: any) => `#${r.userID} ${r.message}`).join('; ')}` : ''));
+          setUsers(prev =>
+            prev.map(user =>
+              updated.includes(user.UserID) ? { ...user, AccountState: state } : user
+            )
+          );
+          setSelected([]);
+        })
+        .catch(() => alert('Error updating account states'));
+      };
+
+      const filteredUsers = Array.isArray(users) ? users : [];
     
 
     const fetchSellerInfo = async (userID: number) => {
@@ -152,7 +203,7 @@ export default function Admin_Users() {
                     <div className="relative max-w-md">
                         <input
                             type="text"
-                            placeholder="Search users by username or email..."
+                            placeholder="Search users by username or email prefix..."
                             value={searchTerm}
                             onChange={(e) => setSearchTerm(e.target.value)}
                             className="w-full pl-10 pr-4 py-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-red-500 focus:border-red-500 transition duration-200"
@@ -163,13 +214,65 @@ export default function Admin_Users() {
                             </svg>
                         </span>
                     </div>
+                    <div className="flex flex-wrap gap-3 mt-4">
+                        <select
+                            value={filters.userAuth}
+                            onChange={(e) => handleFilter('userAuth', e.target.value)}
+                            className="border border-gray-300 rounded-lg px-3 py-2 focus:ring-2 focus:ring-red-500 focus:border-red-500"
+                        >
+                            <option value="">All roles</option>
+                            <option value="User">User</option>
+                            <option value="Seller">Seller</option>
+                            {myRole === 'SuperAdmin' && <option value="Admin">Admin</option>}
+                        </select>
+                        <select
+                            value={filters.accountState}
+                            onChange={(e) => handleFilter('accountState', e.target.value)}
+                            className="border border-gray-300 rounded-lg px-3 py-2 focus:ring-2 focus:ring-red-500 focus:border-red-500"
+                        >
+                            <option value="">All account states</option>
+                            <option value="Active">Active</option>
+                            <option value="Suspended">Suspended</option>
+                        </select>
+                        <select
+                            value={filters.sellerStatus}
+                            onChange={(e) => handleFilter('sellerStatus', e.target.value)}
+                            className="border border-gray-300 rounded-lg px-3 py-2 focus:ring-2 focus:ring-red-500 focus:border-red-500"
+                        >
+                            <option value="">All seller statuses</option>
+                            <option value="Pending">Pending Review</option>
+                            <option value="Approved">Approved</option>
+                            <option value="Rejected">Rejected</option>
+                            <option value="None">Not Applied</option>
+                        </select>
+                    </div>
                 </div>
 
+                {/* Bulk actions */}
+                {selected.length > 0 && (
+                    <div className="flex items-center gap-3 px-6 py-3 bg-red-50 border-b">
+                        <span className="text-sm text-gray-700">{selected.length} selected</span>
+                        <button
+                            onClick={() => handleBulkAccountState('Suspended')}
+                            className="px-4 py-2 bg-red-600 text-white rounded-lg hover:bg-red-700"
+                        >
+                            🚫 Suspend selected
+                        </button>
+                        <button
+                            onClick={() => handleBulkAccountState('Active')}
+                            className="px-4 py-2 border border-gray-300 rounded-lg hover:bg-gray-50"
+                        >
+                            ✅ Reactivate selected
+                        </button>
+                    </div>
+                )}
+
                 {/* Users Table */}
                 <div className="overflow-x-auto">
                     <table className="min-w-full divide-y divide-gray-200">
                         <thead className="bg-gray-50">
                             <tr>
+                                <th className="px-6 py-3"></th>
                                 <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                                     User Details
                                 </th>
@@ -187,6 +290,15 @@ export default function Admin_Users() {
                         <tbody className="bg-white divide-y divide-gray-200">
                             {filteredUsers.map((user) => (
                                 <tr key={user.UserID} className="hover:bg-gray-50">
+                                    <td className="px-6 py-4">
+                                        {canChangeState(user) && (
+                                            <input
+                                                type="checkbox"
+                                                checked={selected.includes(user.UserID)}
+                                                onChange={() => toggleSelected(user.UserID)}
+                                            />
+                                        )}
+                                    </td>
                                     {/* User Details */}
                                     <td className="px-6 py-4">
                                         <div className="flex items-center">
@@ -256,7 +368,7 @@ export default function Admin_Users() {
 
                                     {/* Account State */}
                                     <td className="px-6 py-4">
-                                        {(myRole === 'SuperAdmin') || (myRole === 'Admin' && user.UserAuth !== 'Admin' && user.UserAuth !== 'SuperAdmin') ? (
+                                        {canChangeState(user) ? (
                                             <select
                                                 value={user.AccountState}
                                                 onChange={(e) => handleAccountState(user.UserID, e.target.value)}
@@ -285,6 +397,31 @@ export default function Admin_Users() {
                         <p className="text-gray-600">Try adjusting your search criteria.</p>
                     </div>
                 )}
+
+                {/* Pagination */}
+                {pagination.totalPages > 1 && (
+                    <div className="flex items-center justify-between p-6 border-t">
+                        <span className="text-sm text-gray-600">
+                            Page {pagination.page} of {pagination.totalPages} ({pagination.total} users)
+                        </span>
+                        <div className="space-x-2">
+                            <button
+                                onClick={() => setPage(page - 1)}
+                                disabled={page <= 1}
+                                className="px-4 py-2 border border-gray-300 rounded-lg disabled:opacity-50"
+                            >
+                                Previous
+                            </button>
+                            <button
+                                onClick={() => setPage(page + 1)}
+                                disabled={page >= pagination.totalPages}
+                                className="px-4 py-2 border border-gray-300 rounded-lg disabled:opacity-50"
+                            >
+                                Next
+                            </button>
+                        </div>
+                    </div>
+                )}
             </div>
         </Admin_Lay>
     );
@@ -11,7 +11,6 @@ import { getCartFromCookie, updateCartItemQuantity, removeItemFromCart} from "..
 export default function Cart(){
 
     let [cartItems, setCartItems] = useState<any[]>([]); // setCartItems function always updates the state of cartItems by overridding.
-    let cartProductImages : any [] =[];
     let temp_cart : any [] = [];
     let temp_cart1 : any [] = [];
     let [useEffectTrigger, setUseEffectTrigger] = useState<string>('0'); // This is to trigger the update of cart items by triggering the useEffect() hook.
@@ -42,13 +41,9 @@ export default function Cart(){
               if (response.status === 200){
                 temp_cart = response.data.data
                 
-                  if (temp_cart.length != 0){
-                    for(let i =0;i<temp_cart.length;i++){
-                      const response = await axios.get(`${Endpoint.products}/product/${temp_cart[i].ProductID}`)
-                      const product = response.data.data;
-                      temp_cart1.push({"ProductID":product.ProductID,"ProductName":product.ProductName,"Quantity":temp_cart[i].Quantity,"Price":product.Price,"PromoActive":product.PromoActive,"DiscPrice":product.DiscPrice,"AvailableQty":product.AvailableQty,"MOQ":product.MOQ});
-                    }
-                    
+                  // the cart lines already carry live prices, stock and MOQ
+                  for (const item of temp_cart){
+                    temp_cart1.push({"ProductID":item.ProductID,"ProductName":item.ProductName,"Quantity":item.Quantity,"Price":item.Price,"PromoActive":item.PromoActive,"DiscPrice":item.DiscPrice,"AvailableQty":item.AvailableQty,"MOQ":item.MOQ});
                   }
                 
                 setCartItems(temp_cart1)
@@ -68,31 +63,8 @@ export default function Cart(){
     
     useEffect(()=>{
 
-      //--------------------------------Get Cart Images of Cart------------------------------
-        const getCartImages = async ()=>{
-
-            
-            if(cartItems.length > 0){
-               
-                for (let product of cartItems){
-                    try{
-
-                        const response = await axios.get(`${Endpoint.products}/image/${product.ProductID}`);  // Fetch productimage by ID
-                        // Handle Response Status. 
-                        if (response.status === 200){
-                            cartProductImages.push({ProductImage:response.data.data,ProductID:product.ProductID});
-                        }
-                    }
-                    catch(error){
-                        console.log("Error fetching images of products:", error);
-                    }
-                }
-            }
-        }
-
         // ----------------Set the Cart Items whether Front or Back End Cart------------------------
         fetch_cart();
-        getCartImages();
 
     },[useEffectTrigger]);
 
@@ -290,9 +262,7 @@ export default function Cart(){
                 <td className="p-4">
                   <div className="flex items-center gap-4 w-max">
                     <div className="h-32 shrink-0">           
-                        {cartProductImages.filter(productImage => productImage.ProductID === item.ProductID).map((productImage) => (
-                            <img src={`data:image/jpeg;base64,${productImage.ProductImage}`} alt ={`Image of ${item.ProductName}`} className="object-contain rounded-lg" />
-                        ))}
+                        <img src={`${Endpoint.products}/image/${item.ProductID}`} alt ={`Image of ${item.ProductName}`} className="object-contain rounded-lg" />
                     </div>
                     <div>
                       <p className="text-base font-bold text-gray-800">{item.ProductName}</p>
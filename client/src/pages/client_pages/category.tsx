@@ -84,7 +84,7 @@ import ShoppingCart from '../customComponents';
           for(let product of products){
               try{
                   // Create image URL directly instead of fetching image data
-                  const imageUrl = `${Endpoint.products}/image/${product.ProductID}`;
+                  const imageUrl = `${Endpoint.products}/image/${product.ProductID}?size=thumb`;
                   productImages.push({
                       ProductImage: imageUrl,
                       ProductID: product.ProductID
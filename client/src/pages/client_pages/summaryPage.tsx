@@ -41,17 +41,9 @@ export default function SummaryPage(){
                         if (response.status === 200){
                             temp_cart = response.data.data
                             
-                            if (temp_cart.length != 0){
-                                for(let i = 0;i<temp_cart.length;i++){
-                                const response = await axios.get(`${Endpoint.products}/product/${temp_cart[i].ProductID}`)
-                                const product = response.data.data;
-                                if (product.PromoActive){
-                                    temp_cart1.push({"ProductID":product.ProductID,"ProductName":product.ProductName,"Quantity":temp_cart[i].Quantity,"Price":product.DiscPrice});
-                                }else{
-                                    temp_cart1.push({"ProductID":product.ProductID,"ProductName":product.ProductName,"Quantity":temp_cart[i].Quantity,"Price":product.Price});
-                                }
-                               
-                                }       
+                            // EffectivePrice is the promo price while a promotion is active
+                            for (const item of temp_cart){
+                                temp_cart1.push({"ProductID":item.ProductID,"ProductName":item.ProductName,"Quantity":item.Quantity,"Price":item.EffectivePrice});
                             }
                             
                             setCart(temp_cart1||[])
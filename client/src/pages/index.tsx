@@ -42,12 +42,12 @@ export const getServerSideProps = async (context) => {
   // Use correct IDs for images (backend expects IDs, not filenames)
   const categoryImages = categories.map((c: any) => ({
     CategoryID: c.CategoryID,
-    CategoryImage: `${Endpoint.category}/image/${c.CategoryID}`,
+    CategoryImage: `${Endpoint.category}/image/${c.CategoryID}?size=small`,
   }));
 
   const productImages = products.map((p: any) => ({
     ProductID: p.ProductID,
-    ProductImage: `${Endpoint.products}/image/${p.ProductID}`,
+    ProductImage: `${Endpoint.products}/image/${p.ProductID}?size=thumb`,
   }));
 
   return {
@@ -1,7 +1,52 @@
 import Sellers_Lay from "./layout"
 import Link from "next/link"
+import axios from "axios"
+import Endpoint from "@/endpoint"
+import * as cookie from "cookie"
 
-export default function Sellers_Dash(){
+const WINDOWS = [
+    { value: "7d", label: "7 days" },
+    { value: "30d", label: "30 days" },
+    { value: "90d", label: "90 days" },
+    { value: "365d", label: "1 year" },
+]
+
+export const getServerSideProps = async (context) => {
+
+    let summary = null;
+    let token = 'null';
+    const window = WINDOWS.some(option => option.value === context.query.window) ? context.query.window : "30d";
+
+    if (context.req.headers.cookie) {
+        const cookies = cookie.parse(context.req.headers.cookie);
+        cookies['token'] ? (token = cookies['token']) : token;
+    }
+
+    // One precomputed summary instead of product lists, orders and per-product view stats
+    try {
+        const response = await axios.get(`${Endpoint.sellerSummary}`, {
+            headers: { 'Authorization': `Bearer ${token}` },
+            params: { window }
+        });
+
+        if (response.status === 200) {
+            summary = response.data.data;
+        }
+    } catch (error) {
+        console.log('Error fetching seller summary:', error);
+    }
+
+    return {
+        props: {
+            summary,
+            window,
+        },
+    };
+};
+
+export default function Sellers_Dash({ summary, window }: any){
+    const windowLabel = WINDOWS.find(option => option.value === window)?.label || "30 days";
+    const stat = (value: any) => (summary ? value : "--");
     return(
         <Sellers_Lay>
             <div className="min-h-screen">
@@ -75,25 +120,67 @@ export default function Sellers_Dash(){
                 </section>
 
                 {/* Statistics Overview */}
+                <section className="flex justify-end space-x-2 mb-4">
+                    {WINDOWS.map(option => (
+                        <Link key={option.value} href={`/sellerDash?window=${option.value}`}>
+                            <span className={`px-3 py-1 rounded-full text-sm font-semibold ${option.value === window ? "bg-green-600 text-white" : "bg-white text-gray-700 border border-gray-200"}`}>
+                                {option.label}
+                            </span>
+                        </Link>
+                    ))}
+                </section>
                 <section className="grid grid-cols-1 md:grid-cols-4 gap-6 mb-8">
                     <div className="bg-gradient-to-r from-green-500 to-green-600 text-white rounded-lg p-6 text-center">
-                        <div className="text-3xl font-bold mb-2">--</div>
+                        <div className="text-3xl font-bold mb-2">{stat(summary?.products.total)}</div>
                         <div className="font-semibold">Total Products</div>
                     </div>
                     <div className="bg-gradient-to-r from-blue-500 to-blue-600 text-white rounded-lg p-6 text-center">
-                        <div className="text-3xl font-bold mb-2">--</div>
-                        <div className="font-semibold">Orders This Month</div>
+                        <div className="text-3xl font-bold mb-2">{stat(summary?.orders)}</div>
+                        <div className="font-semibold">Orders ({windowLabel})</div>
                     </div>
                     <div className="bg-gradient-to-r from-purple-500 to-purple-600 text-white rounded-lg p-6 text-center">
-                        <div className="text-3xl font-bold mb-2">--</div>
-                        <div className="font-semibold">Revenue</div>
+                        <div className="text-3xl font-bold mb-2">{stat(`RM ${summary?.revenue.toFixed(2)}`)}</div>
+                        <div className="font-semibold">Revenue ({windowLabel})</div>
                     </div>
                     <div className="bg-gradient-to-r from-orange-500 to-orange-600 text-white rounded-lg p-6 text-center">
-                        <div className="text-3xl font-bold mb-2">--</div>
+                        <div className="text-3xl font-bold mb-2">{stat(summary?.products.active)}</div>
                         <div className="font-semibold">Active Listings</div>
                     </div>
                 </section>
 
+                {summary && (
+                    <section className="grid grid-cols-1 lg:grid-cols-2 gap-8 mb-8">
+                        {/* Top Products */}
+                        <div className="bg-white rounded-lg shadow-xl p-6">
+                            <h3 className="text-lg font-semibold text-gray-800 mb-1">🏆 Top Products</h3>
+                            <p className="text-sm text-gray-600 mb-4">
+                                {summary.unitsSold} units sold, {summary.views} views
+                                {summary.conversionRate !== null && `, ${(summary.conversionRate * 100).toFixed(1)}% conversion`}
+                            </p>
+                            {summary.topProducts.length === 0 && <p className="text-gray-500">No sales in this period.</p>}
+                            {summary.topProducts.map((product: any) => (
+                                <div key={product.ProductID} className="flex items-center justify-between p-3 border-b border-gray-100">
+                                    <span className="font-medium text-gray-800">{product.ProductName}</span>
+                                    <span className="text-sm text-gray-600">{product.unitsSold} sold · RM {product.revenue.toFixed(2)}</span>
+                                </div>
+                            ))}
+                        </div>
+
+                        {/* Low Stock */}
+                        <div className="bg-white rounded-lg shadow-xl p-6">
+                            <h3 className="text-lg font-semibold text-gray-800 mb-1">⚠️ Low Stock</h3>
+                            <p className="text-sm text-gray-600 mb-4">Active products with {summary.lowStock.threshold} or fewer units left</p>
+                            {summary.lowStock.products.length === 0 && <p className="text-gray-500">Stock levels look good.</p>}
+                            {summary.lowStock.products.map((product: any) => (
+                                <div key={product.ProductID} className="flex items-center justify-between p-3 border-b border-gray-100">
+                                    <span className="font-medium text-gray-800">{product.ProductName}</span>
+                                    <span className="text-sm font-semibold text-orange-600">{product.AvailableQty} left</span>
+                                </div>
+                            ))}
+                        </div>
+                    </section>
+                )}
+
                 {/* Recent Activity */}
                 <section className="bg-white rounded-lg shadow-xl p-8">
                     <h2 className="text-2xl font-bold text-gray-800 mb-6 flex items-center">
@@ -1,12 +1,14 @@
 import axios from 'axios';
 import Endpoint from '@/endpoint';
 import Sellers_Lay from './layout';
+import Link from 'next/link';
 import * as cookie from 'cookie';
 
 
 export const getServerSideProps = async (context) => {
   
   let orders: any[] = [];
+  let pagination: any = null;
   let token = 'null';
 
   if (context.req.headers.cookie) {
@@ -14,12 +16,18 @@ export const getServerSideProps = async (context) => {
     cookies['token'] ? (token = cookies['token']) : token;
   }
 
-  // FETCHING THE orders BASED ON THE SELLER ID.
+  // FETCHING THE orders BASED ON THE SELLER ID (one page, newest first).
+  const { cursor, from, to, deliveryStatus } = context.query;
+
   try {
-    const response = await axios.get(`${Endpoint.orders}`, { headers: { 'Authorization': `Bearer ${token}` } });
+    const response = await axios.get(`${Endpoint.orders}`, {
+      headers: { 'Authorization': `Bearer ${token}` },
+      params: { cursor, from, to, deliveryStatus }
+    });
 
     if (response.status === 200) {
       orders = response.data.data;
+      pagination = response.data.pagination || null;
     }
   } catch (error) {
     console.log('Error fetching orders:', error);
@@ -28,11 +36,13 @@ export const getServerSideProps = async (context) => {
   return {
     props: {
       orders: orders || [],
+      pagination,
+      filters: { from: from || null, to: to || null, deliveryStatus: deliveryStatus || null },
     },
   };
 };
 
-export default function sellerProductListPage({ orders }: any) {
+export default function sellerProductListPage({ orders, pagination, filters }: any) {
   if (!Array.isArray(orders)) {
     return <div className="text-center py-5 text-danger"> Orders format is invalid</div>;
   }
@@ -102,6 +112,24 @@ export default function sellerProductListPage({ orders }: any) {
               <p className="text-muted fs-5"> No orders found.</p>
             </div>
           )}
+
+          {/* Next page keeps the same filters */}
+          {pagination?.nextCursor && (
+            <div className="text-center">
+              <Link
+                href={{
+                  pathname: '/sellerDash/seller_orders',
+                  query: {
+                    ...Object.fromEntries(Object.entries(filters || {}).filter(([, value]) => value)),
+                    cursor: pagination.nextCursor,
+                  },
+                }}
+                className="btn btn-outline-primary"
+              >
+                Older orders
+              </Link>
+            </div>
+          )}
         </div>
       </div>
     </Sellers_Lay>
@@ -28,6 +28,7 @@ const shoppingCartStyle = {
       let products: any[] =[];
       let filteredProducts: any[] =[];
       let productImages: any[] =[];
+      let viewStats: any[] = [];
       let postMsg = '';
       let token = 'null';
 
@@ -53,6 +54,16 @@ const shoppingCartStyle = {
               if (response.status === 200) {
                   products = response.data.data;
               }
+
+              // View counts of every product of the seller in one request
+              try {
+                  const statsResponse = await axios.get(`${Endpoint.viewStats}`, { params: { sellerId: userId } });
+                  if (statsResponse.status === 200) {
+                      viewStats = statsResponse.data.data;
+                  }
+              } catch (error) {
+                  console.log("Error fetching view stats:", error);
+              }
           }
       } 
       catch (error) {
@@ -108,6 +119,7 @@ const shoppingCartStyle = {
       props: {
         products: products || [],
         categories: categories || [],
+        viewStats: viewStats || [],
         productImages: productImages.map(img => ({
           ProductImage: img.ProductImage || null,
           ProductID: img.ProductID || null
@@ -117,7 +129,7 @@ const shoppingCartStyle = {
   };
 
 
-export default function sellerProductListPage({ products , categories, productImages }:any) {
+export default function sellerProductListPage({ products , categories, productImages, viewStats }:any) {
 
   
   const router = useRouter();
@@ -331,6 +343,7 @@ const changeProductStatus = () => {
         <th className="p-4 text-left">Product</th>
         <th className="p-4 text-left">Quantity</th>
         <th className="p-4 text-left">Price</th>
+        <th className="p-4 text-left">Views</th>
         <th className="p-4 text-left">Status</th>
         <th className="p-4 text-left">Actions</th>
       </tr>
@@ -358,6 +371,10 @@ const changeProductStatus = () => {
           </td>
           <td className="p-4">{item.AvailableQty}</td>
           <td className="p-4 font-semibold text-gray-800">RM {item.Price}</td>
+          <td className="p-4">
+            {viewStats.find(stats => stats.productId === item.ProductID)?.totalViews ?? 0}
+            <p className="text-gray-500 text-xs">{viewStats.find(stats => stats.productId === item.ProductID)?.recentViews ?? 0} this week</p>
+          </td>
           <td className="p-4">
             <span
               className={`inline-block px-2 py-1 rounded-full text-xs font-medium ${
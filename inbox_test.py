@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+E-Pasar Conversation Inbox Testing
+Tests the paginated inbox endpoint (GET /communication/inbox):
+
+1. Inbox returns conversations with pagination metadata
+2. Sending a message moves the thread to the top with a last-message preview
+3. Unread count is reported per thread for the recipient
+4. Pagination limits and page numbers are respected
+"""
+
+import requests
+import sys
+import time
+
+class InboxTester:
+    def __init__(self, base_url="http://localhost:8001"):
+        self.base_url = base_url
+        self.buyer_token = None
+        self.seller_token = None
+        self.seller_id = None
+        self.tests_run = 0
+        self.tests_passed = 0
+        self.test_results = []
+
+    def log_test(self, name, success, message):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name}: {message}")
+        else:
+            print(f"❌ {name}: {message}")
+
+        self.test_results.append({'test': name, 'success': success, 'message': message})
+
+    def login(self, username, password):
+        """Login and return token"""
+        response = requests.post(f"{self.base_url}/login", json={"username": username, "password": password})
+        if response.status_code == 200:
+            return response.json()['data']['token']
+        return None
+
+    def get_inbox(self, token, params=None):
+        """Fetch one inbox page"""
+        response = requests.get(
+            f"{self.base_url}/communication/inbox",
+            headers={'Authorization': f'Bearer {token}'},
+            params=params or {}
+        )
+        return response
+
+    def test_login(self):
+        """Login as demo buyer and seller"""
+        self.buyer_token = self.login("buyer1", "Buyer1234")
+        self.seller_token = self.login("seller1", "Seller1234")
+        success = self.buyer_token is not None and self.seller_token is not None
+        self.log_test("Login", success, "Logged in as buyer1 and seller1" if success else "Demo accounts unavailable")
+        return success
+
+    def test_inbox_shape(self):
+        """Inbox returns conversations and pagination"""
+        response = self.get_inbox(self.buyer_token)
+        if response.status_code != 200:
+            self.log_test("Inbox Shape", False, f"Status {response.status_code}: {response.text}")
+            return
+        data = response.json().get('data', {})
+        has_shape = 'conversations' in data and 'pagination' in data
+        self.log_test("Inbox Shape", has_shape, f"Pagination: {data.get('pagination')}")
+
+    def test_last_message_and_unread(self):
+        """New message appears as last-message preview and unread count for the seller"""
+        seller_search = requests.get(
+            f"{self.base_url}/communication/search-users",
+            headers={'Authorization': f'Bearer {self.buyer_token}'},
+            params={'username': 'seller1'}
+        )
+        sellers = seller_search.json().get('data', []) if seller_search.status_code == 200 else []
+        seller = next((s for s in sellers if s['Username'] == 'seller1'), None)
+        if not seller:
+            self.log_test("Last Message Preview", False, "seller1 not found via search-users")
+            return
+
+        text = f"Inbox preview check {int(time.time())}"
+        contact = requests.post(
+            f"{self.base_url}/communication/contact-seller",
+            headers={'Authorization': f'Bearer {self.buyer_token}'},
+            json={'sellerId': seller['UserID'], 'initialMessage': text}
+        )
+        if contact.status_code != 200:
+            self.log_test("Last Message Preview", False, f"contact-seller failed: {contact.text}")
+            return
+        conversation_id = contact.json()['data']['conversationId']
+
+        buyer_inbox = self.get_inbox(self.buyer_token).json()['data']['conversations']
+        top = buyer_inbox[0] if buyer_inbox else {}
+        self.log_test(
+            "Last Message Preview",
+            top.get('DisputeID') == conversation_id and (top.get('LastMessage') or {}).get('Snippet') == text,
+            f"Top thread {top.get('DisputeID')} preview: {(top.get('LastMessage') or {}).get('Snippet')}"
+        )
+
+        seller_inbox = self.get_inbox(self.seller_token).json()['data']['conversations']
+        thread = next((c for c in seller_inbox if c['DisputeID'] == conversation_id), None)
+        self.log_test(
+            "Unread Count",
+            thread is not None and thread['UnreadCount'] >= 1,
+            f"Seller unread count for thread {conversation_id}: {thread['UnreadCount'] if thread else 'missing'}"
+        )
+
+    def test_pagination(self):
+        """Limit and page are honoured"""
+        response = self.get_inbox(self.buyer_token, {'limit': 1, 'page': 1})
+        data = response.json().get('data', {}) if response.status_code == 200 else {}
+        conversations = data.get('conversations', [])
+        pagination = data.get('pagination', {})
+        self.log_test(
+            "Pagination",
+            len(conversations) <= 1 and pagination.get('limit') == 1,
+            f"Returned {len(conversations)} of {pagination.get('total')} conversations"
+        )
+
+    def run_all_tests(self):
+        """Run all inbox tests"""
+        print("🚀 Starting Conversation Inbox Tests")
+        print(f"📡 Testing against: {self.base_url}")
+        print("=" * 80)
+
+        if not self.test_login():
+            return False
+
+        self.test_inbox_shape()
+        self.test_last_message_and_unread()
+        self.test_pagination()
+
+        print("\n" + "=" * 80)
+        print(f"📊 Inbox Test Results: {self.tests_passed}/{self.tests_run} tests passed")
+
+        failed_tests = [r for r in self.test_results if not r['success']]
+        if failed_tests:
+            print("\n❌ Failed Tests:")
+            for test in failed_tests:
+                print(f"   - {test['test']}: {test['message']}")
+        else:
+            print("\n🎉 All inbox tests passed!")
+
+        return len(failed_tests) == 0
+
+def main():
+    """Main test execution for the conversation inbox"""
+    tester = InboxTester("http://localhost:8001")
+
+    try:
+        success = tester.run_all_tests()
+        return 0 if success else 1
+    except KeyboardInterrupt:
+        print("\n⚠️ Tests interrupted by user")
+        return 1
+    except Exception as e:
+        print(f"\n💥 Unexpected error: {str(e)}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
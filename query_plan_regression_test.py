@@ -0,0 +1,933 @@
+#!/usr/bin/env python3
+"""
+E-Pasar Query Plan Regression Testing
+Checks the SQL issued by the hot routes against a copy of server/database.sqlite:
+
+1. The copy gets the indexes declared in server/migrations and a generated large dataset
+2. EXPLAIN QUERY PLAN must not show a full SCAN (or an automatic index) on a large table
+3. EXPLAIN QUERY PLAN must not show a temp B-tree for ORDER BY where an index was expected
+4. Each query is timed and compared with the stored baseline (query_plan_baselines.json)
+
+The queries below mirror what the routes send (raw SQL as written, Sequelize finders as generated).
+Keep them in step when a route changes. Refresh the baselines with --update-baselines.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATABASE = os.path.join(ROOT, "server", "database.sqlite")
+MIGRATIONS_DIR = os.path.join(ROOT, "server", "migrations")
+BASELINES_FILE = os.path.join(ROOT, "query_plan_baselines.json")
+
+# Rows generated per table at --scale 1
+DATASET = {
+    "USERS": 5000,
+    "CATEGORY": 20,
+    "PRODUCTS": 20000,
+    "PRODUCT_VIEWS": 300000,
+    "DISPUTE": 10000,
+    "DISPUTE_MSG": 100000,
+    "TRANSACTIONS": 30000,
+    "CART": 20000,
+    "REPORT": 2000,
+}
+
+LARGE_TABLE_ROWS = 5000     # a full scan of a table at least this big fails the plan check
+TIMING_RUNS = 5
+
+# Index entries in the migrations: { table: 'X', fields: ['A', 'B'], name: 'idx_x' }
+MIGRATION_INDEX = re.compile(r"\{\s*table:\s*'(\w+)',\s*fields:\s*\[([^\]]*)\],\s*name:\s*'(\w+)'\s*\}")
+INDEX_FIELD = re.compile(r"'(\w+)'(?:\s*,\s*collate:\s*'(\w+)')?")   # 'Column' or { name: 'Column', collate: 'NOCASE' }
+
+SCAN = re.compile(r"^SCAN (?:TABLE )?([\w\->]+)(?: AS ([\w\->]+))?")
+AUTOMATIC_INDEX = re.compile(r"^SEARCH (?:TABLE )?([\w\->]+)(?: AS ([\w\->]+))? USING AUTOMATIC")
+TABLE_ALIAS = re.compile(r"(?:FROM|JOIN)\s+[`\"]?(\w+)[`\"]?(?:\s+(?:AS\s+)?[`\"]?([\w\->]+)[`\"]?)?", re.IGNORECASE)
+SQL_KEYWORDS = {"ON", "WHERE", "LEFT", "INNER", "OUTER", "JOIN", "GROUP", "ORDER", "LIMIT", "USING"}
+
+
+def sequelize_date(value):
+    """Dates as Sequelize stores them in SQLite"""
+    return value.strftime("%Y-%m-%d %H:%M:%S.") + f"{value.microsecond // 1000:03d} +00:00"
+
+
+SELLER_ORDERS_SQL = """
+    WITH page AS (
+        SELECT t.TransactionID, t.TransactionState, t.CreatedAt, t.DeliveryID
+        FROM TRANSACTIONS t
+        LEFT JOIN DELIVERY_DETAILS d ON d.DeliveryID = t.DeliveryID
+        WHERE t.TransactionID IN (
+                SELECT pti.TransactionID
+                FROM PRODUCT_TRANSACTION_INFO pti
+                JOIN PRODUCTS p ON p.ProductID = pti.ProductID
+                WHERE p.UserID = :sellerId
+            )
+            AND t.TransactionState = 'APPROVED'
+            {filters}
+        ORDER BY t.CreatedAt DESC, t.TransactionID DESC
+        LIMIT :limit
+    )
+    SELECT page.TransactionID, page.CreatedAt,
+           json_group_array(json_object('ProductID', pti.ProductID, 'Quantity', pti.Quantity,
+               'PRODUCT', json_object('ProductName', p.ProductName),
+               'TRANSACTION', json_object('DELIVERY_DETAIL', json_object('DeliveryStatus', d.DeliveryStatus)))) AS Lines
+    FROM page
+    JOIN PRODUCT_TRANSACTION_INFO pti ON pti.TransactionID = page.TransactionID
+    JOIN PRODUCTS p ON p.ProductID = pti.ProductID AND p.UserID = :sellerId
+    LEFT JOIN DELIVERY_DETAILS d ON d.DeliveryID = page.DeliveryID
+    GROUP BY page.TransactionID
+    ORDER BY page.CreatedAt DESC, page.TransactionID DESC
+"""
+
+SELLER_APPLICATIONS_SQL = """
+    SELECT s.UserID, s.ComRegNum, s.ComAddress, s.IsVerified, s.SubmittedAt,
+           u.Username, u.Email, u.FirstName, u.LastName, u.ContactNo, u.UserAuth, u.AccountState
+    FROM SELLER_INFO s
+    JOIN USERS u ON u.UserID = s.UserID
+    WHERE s.IsVerified = :status
+      {cursor}
+    ORDER BY s.SubmittedAt ASC, s.UserID ASC
+    LIMIT :limit
+"""
+
+
+# Seller dashboard aggregates (migration 20261019000005), created here when the copy predates them
+SELLER_STATS_TABLES = """
+    CREATE TABLE IF NOT EXISTS PRODUCT_DAILY_STATS (
+        ProductID INTEGER NOT NULL, StatDate DATE NOT NULL, SellerID INTEGER NOT NULL,
+        Views INTEGER NOT NULL DEFAULT 0, UnitsSold INTEGER NOT NULL DEFAULT 0,
+        Revenue REAL NOT NULL DEFAULT 0, Orders INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (ProductID, StatDate));
+    CREATE INDEX IF NOT EXISTS idx_product_daily_stats_seller_date ON PRODUCT_DAILY_STATS (SellerID, StatDate);
+    CREATE TABLE IF NOT EXISTS SELLER_DAILY_STATS (
+        SellerID INTEGER NOT NULL, StatDate DATE NOT NULL,
+        Views INTEGER NOT NULL DEFAULT 0, UnitsSold INTEGER NOT NULL DEFAULT 0,
+        Revenue REAL NOT NULL DEFAULT 0, Orders INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (SellerID, StatDate));
+"""
+
+
+# Hot queries. `allow_scan` lists large tables a query may scan on purpose and
+# `allow_sort` is set where sorting an aggregate or a small per-user set is expected.
+QUERIES = [
+    {
+        "name": "popular",
+        "route": "GET /products/popular",
+        "sql": """
+            SELECT p.ProductID, p.ProductName, p.Price, p.DiscPrice, p.PromoActive, p.CategoryID,
+                   p.Description, p.AvailableQty, p.ProdStatus, COUNT(pv.ViewID) as viewCount
+            FROM PRODUCTS p
+            LEFT JOIN PRODUCT_VIEWS pv ON p.ProductID = pv.ProductID
+            WHERE p.ProdStatus = 'Active'
+            GROUP BY p.ProductID
+            ORDER BY viewCount DESC
+            LIMIT :limit
+        """,
+        "params": lambda ctx: {"limit": 10},
+        "allow_scan": {"PRODUCTS": "ranks every active product by view count"},
+        "allow_sort": "ORDER BY an aggregate",
+    },
+    {
+        "name": "view_stats_seller",
+        "route": "GET /products/view-stats?sellerId=...",
+        "sql": """
+            SELECT p.ProductID AS productId,
+                   COUNT(pv.ViewID) AS totalViews,
+                   COALESCE(SUM(CASE WHEN pv.ViewedAt >= :sevenDaysAgo THEN 1 ELSE 0 END), 0) AS recentViews,
+                   COALESCE(SUM(CASE WHEN pv.ViewedAt >= :thirtyDaysAgo THEN 1 ELSE 0 END), 0) AS last30DaysViews
+            FROM PRODUCTS p
+            LEFT JOIN PRODUCT_VIEWS pv ON pv.ProductID = p.ProductID
+            WHERE p.UserID = :sellerId
+            GROUP BY p.ProductID
+            ORDER BY p.ProductID ASC
+        """,
+        "params": lambda ctx: {"sellerId": ctx["seller_id"], "sevenDaysAgo": ctx["seven_days_ago"],
+                               "thirtyDaysAgo": ctx["thirty_days_ago"]},
+        "allow_sort": "groups one seller's products",
+    },
+    {
+        "name": "recommendations_user_history",
+        "route": "GET /products/recommendations/user",
+        "sql": """
+            SELECT `PRODUCT_VIEWS`.*, `PRODUCT`.`ProductID` AS `PRODUCT.ProductID`, `PRODUCT`.`CategoryID` AS `PRODUCT.CategoryID`,
+                   `PRODUCT->CATEGORY`.`CategoryName` AS `PRODUCT.CATEGORY.CategoryName`
+            FROM `PRODUCT_VIEWS` AS `PRODUCT_VIEWS`
+            INNER JOIN `PRODUCTS` AS `PRODUCT` ON `PRODUCT_VIEWS`.`ProductID` = `PRODUCT`.`ProductID` AND `PRODUCT`.`ProdStatus` = 'Active'
+            LEFT OUTER JOIN `CATEGORY` AS `PRODUCT->CATEGORY` ON `PRODUCT`.`CategoryID` = `PRODUCT->CATEGORY`.`CategoryID`
+            WHERE `PRODUCT_VIEWS`.`UserID` = :userId
+            ORDER BY `PRODUCT_VIEWS`.`ViewedAt` DESC
+            LIMIT 10
+        """,
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+        "allow_sort": "sorts one user's views",
+    },
+    {
+        "name": "recommendations_user_coviewed",
+        "route": "GET /products/recommendations/user",
+        "sql": lambda ctx: f"""
+            SELECT p.ProductID, p.ProductName, p.Price, p.DiscPrice, p.PromoActive, p.ProductImage,
+                   p.Description, p.CategoryID, p.AvailableQty, COUNT(pv.ViewID) as coViewCount
+            FROM PRODUCTS p
+            INNER JOIN PRODUCT_VIEWS pv ON p.ProductID = pv.ProductID
+            WHERE p.ProdStatus = 'Active'
+                AND p.ProductID NOT IN ({ctx['viewed_ids']})
+                AND pv.UserID IN (
+                    SELECT DISTINCT UserID
+                    FROM PRODUCT_VIEWS
+                    WHERE ProductID IN ({ctx['viewed_ids']})
+                    AND UserID IS NOT NULL
+                )
+            GROUP BY p.ProductID
+            ORDER BY coViewCount DESC, p.ProductID DESC
+            LIMIT 5
+        """,
+        "params": lambda ctx: {},
+        "allow_sort": "ORDER BY an aggregate",
+    },
+    {
+        "name": "recommendations_user_popular",
+        "route": "GET /products/recommendations/user",
+        "sql": lambda ctx: f"""
+            SELECT p.ProductID, p.ProductName, p.Price, p.DiscPrice, p.PromoActive, p.ProductImage,
+                   p.Description, p.CategoryID, p.AvailableQty, COUNT(pv.ViewID) as viewCount
+            FROM PRODUCTS p
+            LEFT JOIN PRODUCT_VIEWS pv ON p.ProductID = pv.ProductID
+            WHERE p.ProdStatus = 'Active'
+                AND p.ProductID NOT IN ({ctx['viewed_ids']})
+            GROUP BY p.ProductID
+            ORDER BY viewCount DESC, p.ProductID DESC
+            LIMIT 3
+        """,
+        "params": lambda ctx: {},
+        "allow_scan": {"PRODUCTS": "ranks every active product by view count"},
+        "allow_sort": "ORDER BY an aggregate",
+    },
+    {
+        "name": "recommendations_product_coviewed",
+        "route": "GET /products/recommendations/product/:productId",
+        "sql": """
+            SELECT DISTINCT p.ProductID, p.ProductName, p.Price, p.DiscPrice, p.PromoActive, p.ProductImage,
+                   p.Description, p.CategoryID, p.AvailableQty, COUNT(pv2.ViewID) as coViewCount
+            FROM PRODUCTS p
+            INNER JOIN PRODUCT_VIEWS pv2 ON p.ProductID = pv2.ProductID
+            WHERE p.ProdStatus = 'Active'
+                AND p.ProductID != :productId
+                AND pv2.UserID IN (
+                    SELECT DISTINCT UserID
+                    FROM PRODUCT_VIEWS
+                    WHERE ProductID = :productId AND UserID IS NOT NULL
+                )
+            GROUP BY p.ProductID
+            ORDER BY coViewCount DESC
+            LIMIT 3
+        """,
+        "params": lambda ctx: {"productId": ctx["product_id"]},
+        "allow_sort": "ORDER BY an aggregate",
+    },
+    {
+        "name": "my_conversations",
+        "route": "GET /communication/my-conversations",
+        "sql": """
+            SELECT `DISPUTE`.*, `Complainant`.`Username` AS `Complainant.Username`,
+                   `Respondent`.`Username` AS `Respondent.Username`, `Handler`.`Username` AS `Handler.Username`
+            FROM `DISPUTE` AS `DISPUTE`
+            LEFT OUTER JOIN `USERS` AS `Complainant` ON `DISPUTE`.`LodgedBy` = `Complainant`.`UserID`
+            LEFT OUTER JOIN `USERS` AS `Respondent` ON `DISPUTE`.`LodgedAgainst` = `Respondent`.`UserID`
+            LEFT OUTER JOIN `USERS` AS `Handler` ON `DISPUTE`.`HandledBy` = `Handler`.`UserID`
+            WHERE (`DISPUTE`.`LodgedBy` = :userId OR `DISPUTE`.`LodgedAgainst` = :userId)
+            ORDER BY `DISPUTE`.`CreatedAt` DESC
+        """,
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+        "allow_sort": "sorts one user's conversations",
+    },
+    {
+        "name": "my_conversations_admin",
+        "route": "GET /communication/my-conversations (admin)",
+        "sql": """
+            SELECT `DISPUTE`.*, `Complainant`.`Username` AS `Complainant.Username`,
+                   `Respondent`.`Username` AS `Respondent.Username`, `Handler`.`Username` AS `Handler.Username`
+            FROM `DISPUTE` AS `DISPUTE`
+            LEFT OUTER JOIN `USERS` AS `Complainant` ON `DISPUTE`.`LodgedBy` = `Complainant`.`UserID`
+            LEFT OUTER JOIN `USERS` AS `Respondent` ON `DISPUTE`.`LodgedAgainst` = `Respondent`.`UserID`
+            LEFT OUTER JOIN `USERS` AS `Handler` ON `DISPUTE`.`HandledBy` = `Handler`.`UserID`
+            WHERE (`DISPUTE`.`LodgedBy` = :userId OR `DISPUTE`.`LodgedAgainst` = :userId OR `DISPUTE`.`HandledBy` = :userId
+                OR `DISPUTE`.`DisputeID` IN (SELECT AdminConversationID FROM REPORT WHERE AssignedAdminID = :userId AND AdminConversationID IS NOT NULL))
+            ORDER BY `DISPUTE`.`CreatedAt` DESC
+        """,
+        "params": lambda ctx: {"userId": ctx["admin_id"]},
+        "allow_sort": "sorts one admin's conversations",
+    },
+    {
+        "name": "inbox",
+        "route": "GET /communication/inbox",
+        "sql": """
+            SELECT d.DisputeID, COALESCE(d.LastMessageAt, d.CreatedAt) AS LastActivityAt,
+                   m.MessageID AS LastMessageID, substr(m.Message, 1, 120) AS LastMessageSnippet,
+                   (SELECT COUNT(*) FROM DISPUTE_MSG u
+                    WHERE u.DisputeID = d.DisputeID AND u.IsRead = 0 AND u.SentBy != :userId) AS UnreadCount,
+                   c.Username, r.Username, h.Username,
+                   COUNT(*) OVER () AS TotalCount
+            FROM DISPUTE d
+            LEFT JOIN DISPUTE_MSG m ON m.MessageID = d.LastMessageID
+            LEFT JOIN USERS c ON c.UserID = d.LodgedBy
+            LEFT JOIN USERS r ON r.UserID = d.LodgedAgainst
+            LEFT JOIN USERS h ON h.UserID = d.HandledBy
+            WHERE (d.LodgedBy = :userId OR d.LodgedAgainst = :userId)
+            ORDER BY LastActivityAt DESC, d.DisputeID DESC
+            LIMIT 20 OFFSET 0
+        """,
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+        "allow_sort": "sorts one user's conversations by last activity",
+    },
+    {
+        "name": "inbox_count_past_last_page",
+        "route": "GET /communication/inbox?page=<past the last page>",
+        "sql": """
+            SELECT COUNT(*) AS TotalCount FROM DISPUTE d
+            WHERE (d.LodgedBy = :userId OR d.LodgedAgainst = :userId)
+        """,
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+    },
+    {
+        "name": "unread_count_disputes",
+        "route": "GET /communication/unread-count",
+        "sql": """
+            SELECT `DisputeID` FROM `DISPUTE` AS `DISPUTE`
+            WHERE (`DISPUTE`.`LodgedBy` = :userId OR `DISPUTE`.`LodgedAgainst` = :userId OR `DISPUTE`.`HandledBy` = :userId)
+        """,
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+    },
+    {
+        "name": "unread_count_messages",
+        "route": "GET /communication/unread-count",
+        "sql": lambda ctx: f"""
+            SELECT count(*) AS `count` FROM `DISPUTE_MSG` AS `DISPUTE_MSG`
+            WHERE `DISPUTE_MSG`.`DisputeID` IN ({ctx['dispute_ids']})
+                AND `DISPUTE_MSG`.`SentBy` != :userId AND `DISPUTE_MSG`.`IsRead` = 0
+        """,
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+    },
+    {
+        "name": "orders_seller",
+        "route": "GET /orders",
+        "sql": SELLER_ORDERS_SQL.format(filters=""),
+        "params": lambda ctx: {"sellerId": ctx["seller_id"], "limit": 21},
+        "allow_sort": "sorts one seller's transactions",
+    },
+    {
+        "name": "orders_seller_next_page",
+        "route": "GET /orders?cursor=...&deliveryStatus=...",
+        "sql": SELLER_ORDERS_SQL.format(filters="""
+            AND d.DeliveryStatus = :deliveryStatus
+            AND (t.CreatedAt < :cursorCreatedAt OR (t.CreatedAt = :cursorCreatedAt AND t.TransactionID < :cursorId))
+        """),
+        "params": lambda ctx: {"sellerId": ctx["seller_id"], "limit": 21, "deliveryStatus": "Delivered",
+                               "cursorCreatedAt": ctx["seller_cursor"][0], "cursorId": ctx["seller_cursor"][1]},
+        "allow_sort": "sorts one seller's transactions",
+    },
+    {
+        "name": "seller_summary_totals",
+        "route": "GET /sellers/me/summary",
+        "sql": """
+            SELECT COALESCE(SUM(Revenue), 0) AS revenue, COALESCE(SUM(UnitsSold), 0) AS unitsSold,
+                   COALESCE(SUM(Orders), 0) AS orders, COALESCE(SUM(Views), 0) AS views
+            FROM SELLER_DAILY_STATS
+            WHERE SellerID = :sellerId AND StatDate >= :from
+        """,
+        "params": lambda ctx: {"sellerId": ctx["seller_id"], "from": ctx["summary_from"]},
+    },
+    {
+        "name": "seller_summary_top_products",
+        "route": "GET /sellers/me/summary",
+        "sql": """
+            SELECT s.ProductID, p.ProductName, SUM(s.Revenue) AS revenue, SUM(s.UnitsSold) AS unitsSold,
+                   SUM(s.Orders) AS orders, SUM(s.Views) AS views
+            FROM PRODUCT_DAILY_STATS s
+            JOIN PRODUCTS p ON p.ProductID = s.ProductID
+            WHERE s.SellerID = :sellerId AND s.StatDate >= :from
+            GROUP BY s.ProductID
+            HAVING SUM(s.UnitsSold) > 0
+            ORDER BY revenue DESC, unitsSold DESC, s.ProductID ASC
+            LIMIT 5
+        """,
+        "params": lambda ctx: {"sellerId": ctx["seller_id"], "from": ctx["summary_from"]},
+        "allow_sort": "ORDER BY an aggregate over one seller's rows",
+    },
+    {
+        "name": "seller_summary_low_stock",
+        "route": "GET /sellers/me/summary",
+        "sql": """
+            SELECT ProductID, ProductName, AvailableQty
+            FROM PRODUCTS
+            WHERE UserID = :sellerId AND ProdStatus = 'Active' AND AvailableQty <= :lowStock
+            ORDER BY AvailableQty ASC, ProductID ASC
+            LIMIT 20
+        """,
+        "params": lambda ctx: {"sellerId": ctx["seller_id"], "lowStock": 5},
+        "allow_sort": "sorts one seller's products",
+    },
+    {
+        "name": "orders_user",
+        "route": "GET /orders/user",
+        "sql": """
+            SELECT `TRANSACTIONS`.*, `PRODUCT_TRANSACTION_INFOs`.`Quantity`, `PRODUCT_TRANSACTION_INFOs`.`SoldPrice`,
+                   `PRODUCT_TRANSACTION_INFOs->PRODUCT`.`ProductName`, `DELIVERY_DETAIL`.`DeliveryStatus`
+            FROM `TRANSACTIONS` AS `TRANSACTIONS`
+            LEFT OUTER JOIN `PRODUCT_TRANSACTION_INFO` AS `PRODUCT_TRANSACTION_INFOs` ON `TRANSACTIONS`.`TransactionID` = `PRODUCT_TRANSACTION_INFOs`.`TransactionID`
+            LEFT OUTER JOIN `PRODUCTS` AS `PRODUCT_TRANSACTION_INFOs->PRODUCT` ON `PRODUCT_TRANSACTION_INFOs`.`ProductID` = `PRODUCT_TRANSACTION_INFOs->PRODUCT`.`ProductID`
+            LEFT OUTER JOIN `DELIVERY_DETAILS` AS `DELIVERY_DETAIL` ON `TRANSACTIONS`.`DeliveryID` = `DELIVERY_DETAIL`.`DeliveryID`
+            WHERE `TRANSACTIONS`.`UserID` = :userId AND `TRANSACTIONS`.`TransactionState` = 'APPROVED'
+            ORDER BY `TRANSACTIONS`.`CreatedAt` DESC
+        """,
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+        "allow_sort": "sorts one user's orders",
+    },
+    {
+        "name": "cart_view",
+        "route": "GET /cart/view",
+        "sql": """
+            SELECT c.UserID, c.ProductID, c.Quantity,
+                   p.ProductName, p.Price, p.DiscPrice, p.PromoActive, p.MOQ, p.AvailableQty, p.ProdStatus,
+                   CASE WHEN p.PromoActive THEN p.DiscPrice ELSE p.Price END AS EffectivePrice,
+                   '/products/image/' || c.ProductID AS ImageURL
+            FROM CART c
+            JOIN PRODUCTS p ON p.ProductID = c.ProductID
+            WHERE c.UserID = :userId
+            ORDER BY c.ProductID ASC
+        """,
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+    },
+    {
+        "name": "admin_users_page",
+        "route": "GET /admin/users",
+        "sql": """
+            SELECT u.UserID, u.Username, u.Email, u.FirstName, u.LastName, u.ContactNo, u.UserAuth, u.AccountState,
+                   s.UserID AS SellerUserID, s.IsVerified
+            FROM USERS u
+            LEFT JOIN SELLER_INFO s ON s.UserID = u.UserID
+            WHERE +u.UserAuth IN ('User', 'Seller')
+            ORDER BY u.UserID ASC
+            LIMIT 25 OFFSET 50
+        """,
+        "params": lambda ctx: {},
+        "allow_scan": {"USERS": "walks USERS in UserID order and stops after one page"},
+    },
+    {
+        "name": "admin_users_by_username",
+        "route": "GET /admin/users?sort=username",
+        "sql": """
+            SELECT u.UserID, u.Username, u.Email, u.UserAuth, u.AccountState, s.UserID AS SellerUserID, s.IsVerified
+            FROM USERS u
+            LEFT JOIN SELLER_INFO s ON s.UserID = u.UserID
+            WHERE +u.UserAuth IN ('User', 'Seller') AND u.AccountState = 'Active'
+            ORDER BY u.Username COLLATE NOCASE ASC, u.UserID ASC
+            LIMIT 25 OFFSET 0
+        """,
+        "params": lambda ctx: {},
+        "allow_scan": {"USERS": "walks the NOCASE username index and stops after one page"},
+    },
+    {
+        "name": "admin_users_search",
+        "route": "GET /admin/users?search=",
+        "sql": """
+            SELECT u.UserID, u.Username, u.Email, u.UserAuth, u.AccountState, s.UserID AS SellerUserID, s.IsVerified
+            FROM USERS u
+            LEFT JOIN SELLER_INFO s ON s.UserID = u.UserID
+            WHERE +u.UserAuth IN ('User', 'Seller', 'Admin')
+              AND (u.Username LIKE 'PLAN_USER_12%' ESCAPE '\\' OR u.Email LIKE 'PLAN_USER_12%' ESCAPE '\\')
+            ORDER BY u.UserID ASC
+            LIMIT 25 OFFSET 0
+        """,
+        "params": lambda ctx: {},
+        "allow_sort": "sorts the accounts matching one prefix",
+    },
+    {
+        "name": "admin_users_count",
+        "route": "GET /admin/users",
+        "sql": """
+            SELECT COUNT(*) AS total
+            FROM USERS u
+            WHERE u.UserAuth IN ('User', 'Seller') AND u.AccountState = 'Suspended'
+        """,
+        "params": lambda ctx: {},
+    },
+    {
+        "name": "suspend_accounts_carts",
+        "route": "PATCH /admin/changeAccountStatus/bulk",
+        "sql": """
+            DELETE FROM `CART` WHERE `ProductID` IN
+                (SELECT ProductID FROM PRODUCTS WHERE ProdStatus = 'Suspended' AND UserID IN (:sellerId))
+        """,
+        "params": lambda ctx: {"sellerId": ctx["seller_id"]},
+    },
+    {
+        "name": "suspend_accounts_products",
+        "route": "PATCH /admin/changeAccountStatus/bulk",
+        "sql": """
+            UPDATE `PRODUCTS` SET `ProdStatus` = 'Suspended'
+            WHERE `UserID` IN (:sellerId) AND `ProdStatus` = 'Active'
+        """,
+        "params": lambda ctx: {"sellerId": ctx["seller_id"]},
+    },
+    {
+        "name": "seller_applications_queue",
+        "route": "GET /admin/seller-applications",
+        "sql": SELLER_APPLICATIONS_SQL.format(cursor=""),
+        "params": lambda ctx: {"status": "Pending", "limit": 51},
+    },
+    {
+        "name": "seller_applications_next_page",
+        "route": "GET /admin/seller-applications?cursor=",
+        "sql": SELLER_APPLICATIONS_SQL.format(
+            cursor="AND (s.SubmittedAt > :cursorSubmittedAt OR (s.SubmittedAt = :cursorSubmittedAt AND s.UserID > :cursorId))"),
+        "params": lambda ctx: {"status": "Pending", "limit": 51,
+                               "cursorSubmittedAt": ctx["application_cursor"][0], "cursorId": ctx["application_cursor"][1]},
+    },
+    {
+        "name": "lockqty_pending_transaction",
+        "route": "GET /checkout/lockQty",
+        "sql": """
+            SELECT * FROM `TRANSACTIONS` AS `TRANSACTIONS`
+            WHERE `TRANSACTIONS`.`UserID` = :userId AND `TRANSACTIONS`.`TransactionState` = 'PENDING'
+            LIMIT 1
+        """,
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+    },
+    {
+        "name": "lockqty_cart",
+        "route": "GET /checkout/lockQty",
+        "sql": "SELECT * FROM `CART` AS `CART` WHERE `CART`.`UserID` = :userId",
+        "params": lambda ctx: {"userId": ctx["user_id"]},
+    },
+    {
+        "name": "lockqty_product",
+        "route": "GET /checkout/lockQty",
+        "sql": "SELECT * FROM `PRODUCTS` AS `PRODUCTS` WHERE `PRODUCTS`.`ProductID` = :productId",
+        "params": lambda ctx: {"productId": ctx["product_id"]},
+    },
+]
+
+
+class QueryPlanTester:
+    def __init__(self, database=DEFAULT_DATABASE, scale=1.0, tolerance=2.0, update_baselines=False):
+        self.database = database
+        self.scale = scale
+        self.tolerance = tolerance
+        self.update_baselines = update_baselines
+        self.conn = None
+        self.workdir = None
+        self.context = {}
+        self.row_counts = {}
+        self.measurements = {}
+        self.tests_run = 0
+        self.tests_passed = 0
+        self.test_results = []
+
+    def log_test(self, name, success, message):
+        """Log test results"""
+        self.tests_run += 1
+        if success:
+            self.tests_passed += 1
+            print(f"✅ {name}: {message}")
+        else:
+            print(f"❌ {name}: {message}")
+
+        self.test_results.append({'test': name, 'success': success, 'message': message})
+
+    def setup_database(self):
+        """Copy the database so the generated rows never touch the real one"""
+        if not os.path.exists(self.database):
+            self.log_test("Setup", False, f"Database not found: {self.database}")
+            return False
+
+        self.workdir = tempfile.mkdtemp(prefix="query_plan_")
+        copy = os.path.join(self.workdir, "database.sqlite")
+        shutil.copyfile(self.database, copy)
+        self.conn = sqlite3.connect(copy)
+        self.conn.row_factory = sqlite3.Row
+        self.log_test("Setup", True, f"Working on a copy of {os.path.relpath(self.database, ROOT)}")
+        return True
+
+    def apply_migrations(self):
+        """Bring the copy up to the migrated schema (columns and indexes the queries rely on)"""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(DISPUTE)")}
+        if "LastMessageID" not in columns:
+            self.conn.execute("ALTER TABLE DISPUTE ADD COLUMN LastMessageID INTEGER")
+        if "LastMessageAt" not in columns:
+            self.conn.execute("ALTER TABLE DISPUTE ADD COLUMN LastMessageAt DATETIME")
+
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(SELLER_INFO)")}
+        if "SubmittedAt" not in columns:
+            self.conn.execute("ALTER TABLE SELLER_INFO ADD COLUMN SubmittedAt DATETIME")
+
+        self.conn.executescript(SELLER_STATS_TABLES)
+
+        created = 0
+        for file in sorted(os.listdir(MIGRATIONS_DIR)):
+            if not file.endswith(".js"):
+                continue
+            with open(os.path.join(MIGRATIONS_DIR, file)) as f:
+                source = f.read()
+            for table, fields, name in MIGRATION_INDEX.findall(source):
+                columns = ", ".join(f'"{field}"' + (f" COLLATE {collate}" if collate else "")
+                                    for field, collate in INDEX_FIELD.findall(fields))
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns})')
+                created += 1
+        self.conn.commit()
+        self.log_test("Migrations", created > 0, f"{created} migration indexes present")
+        return created > 0
+
+    def generate_dataset(self):
+        """Fill the copy with a large, skewed dataset (fixed seed, so plans and timings are comparable)"""
+        rng = random.Random(42)
+        size = {table: max(1, int(count * self.scale)) for table, count in DATASET.items()}
+        now = datetime.now(timezone.utc)
+
+        def recent(days):
+            return sequelize_date(now - timedelta(seconds=rng.randint(0, days * 86400)))
+
+        start = time.perf_counter()
+        conn = self.conn
+
+        users = []
+        for i in range(size["USERS"]):
+            auth = rng.choices(["User", "Seller", "Admin"], weights=[80, 17, 3])[0]
+            users.append((f"plan_user_{i}", "x", f"Plan{i}", None, f"plan_user_{i}@example.com", "0100000000", auth))
+        conn.executemany(
+            "INSERT INTO USERS (Username, Password, FirstName, LastName, Email, ContactNo, UserAuth) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            users)
+        user_ids = [row[0] for row in conn.execute("SELECT UserID FROM USERS WHERE UserAuth = 'User'")]
+        seller_ids = [row[0] for row in conn.execute("SELECT UserID FROM USERS WHERE UserAuth = 'Seller'")]
+        admin_ids = [row[0] for row in conn.execute("SELECT UserID FROM USERS WHERE UserAuth IN ('Admin', 'SuperAdmin')")]
+
+        conn.executemany("INSERT OR IGNORE INTO CATEGORY (CategoryName, CategoryImage) VALUES (?, ?)",
+                         [(f"Plan category {i}", "default.jpg") for i in range(size["CATEGORY"])])
+        category_ids = [row[0] for row in conn.execute("SELECT CategoryID FROM CATEGORY")]
+
+        products = []
+        for i in range(size["PRODUCTS"]):
+            price = round(rng.uniform(1, 500), 2)
+            status = "Active" if rng.random() < 0.9 else "Inactive"
+            products.append((rng.choice(seller_ids), f"Plan product {i}", price, rng.randint(0, 500),
+                             "default.jpg", status, rng.choice(category_ids)))
+        conn.executemany(
+            "INSERT INTO PRODUCTS (UserID, ProductName, Price, AvailableQty, ProductImage, ProdStatus, CategoryID) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            products)
+        product_ids = [row[0] for row in conn.execute("SELECT ProductID FROM PRODUCTS")]
+
+        # Views follow a long tail: a few products get most of the traffic
+        views = []
+        for _ in range(size["PRODUCT_VIEWS"]):
+            product = product_ids[min(int(rng.paretovariate(1.2)) - 1, len(product_ids) - 1)] if rng.random() < 0.5 else rng.choice(product_ids)
+            viewer = rng.choice(user_ids) if rng.random() < 0.8 else None
+            views.append((product, viewer, recent(90), "query-plan"))
+        conn.executemany("INSERT INTO PRODUCT_VIEWS (ProductID, UserID, ViewedAt, UserAgent) VALUES (?, ?, ?, ?)", views)
+
+        disputes = []
+        for _ in range(size["DISPUTE"]):
+            handler = rng.choice(admin_ids) if rng.random() < 0.3 else None
+            disputes.append(("Plan conversation", "Generated", rng.choice(user_ids), rng.choice(seller_ids + admin_ids),
+                             handler, rng.choice(["Open", "Closed"]), recent(180)))
+        conn.executemany(
+            "INSERT INTO DISPUTE (Title, Description, LodgedBy, LodgedAgainst, HandledBy, Status, CreatedAt) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            disputes)
+        dispute_rows = conn.execute("SELECT DisputeID, LodgedBy, LodgedAgainst FROM DISPUTE").fetchall()
+
+        messages = []
+        for _ in range(size["DISPUTE_MSG"]):
+            dispute = rng.choice(dispute_rows)
+            sender = dispute["LodgedBy"] if rng.random() < 0.5 else dispute["LodgedAgainst"]
+            messages.append((dispute["DisputeID"], sender, "Generated message " * rng.randint(1, 10),
+                             recent(180), 1 if rng.random() < 0.7 else 0))
+        conn.executemany("INSERT INTO DISPUTE_MSG (DisputeID, SentBy, Message, MsgDate, IsRead) VALUES (?, ?, ?, ?, ?)", messages)
+        conn.execute("""
+            UPDATE DISPUTE SET LastMessageID = (
+                SELECT m.MessageID FROM DISPUTE_MSG m WHERE m.DisputeID = DISPUTE.DisputeID
+                ORDER BY m.MsgDate DESC, m.MessageID DESC LIMIT 1
+            )
+        """)
+        conn.execute("UPDATE DISPUTE SET LastMessageAt = (SELECT m.MsgDate FROM DISPUTE_MSG m WHERE m.MessageID = DISPUTE.LastMessageID)")
+
+        reports = []
+        dispute_ids = [row["DisputeID"] for row in dispute_rows]
+        for _ in range(size["REPORT"]):
+            reports.append((rng.choice(dispute_ids), rng.choice(user_ids), rng.choice(admin_ids), rng.choice(dispute_ids),
+                            "Generated", rng.choice(["Pending", "In Progress", "Resolved"]), recent(180)))
+        conn.executemany(
+            "INSERT INTO REPORT (ReportedConversationID, ReportedBy, AssignedAdminID, AdminConversationID, ReportDescription, Status, CreatedAt) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            reports)
+
+        transactions, deliveries, lines = [], [], []
+        first_delivery = (conn.execute("SELECT COALESCE(MAX(DeliveryID), 0) FROM DELIVERY_DETAILS").fetchone()[0]) + 1
+        for i in range(size["TRANSACTIONS"]):
+            state = rng.choices(["APPROVED", "PENDING", "FAILED"], weights=[60, 10, 30])[0]
+            delivery_id = first_delivery + i
+            deliveries.append((delivery_id, 5.0, rng.choice(["Processing", "Dropped off for shipping", "In transit", "Delivered"]), "Plan", "0100000000", "Generated address"))
+            transaction_id = f"plan-{i:08d}"
+            transactions.append((transaction_id, state, rng.choice(user_ids), delivery_id, recent(365)))
+            for product in rng.sample(product_ids, rng.randint(1, 4)):
+                lines.append((transaction_id, product, rng.randint(1, 5), round(rng.uniform(1, 500), 2)))
+        conn.executemany(
+            "INSERT INTO DELIVERY_DETAILS (DeliveryID, DeliveryFee, DeliveryStatus, FirstName, ContactNo, Address) VALUES (?, ?, ?, ?, ?, ?)",
+            deliveries)
+        conn.executemany("INSERT INTO TRANSACTIONS (TransactionID, TransactionState, UserID, DeliveryID, CreatedAt) VALUES (?, ?, ?, ?, ?)",
+                         transactions)
+        conn.executemany("INSERT INTO PRODUCT_TRANSACTION_INFO (TransactionID, ProductID, Quantity, SoldPrice) VALUES (?, ?, ?, ?)", lines)
+
+        # Dashboard aggregates, as the migration backfills them
+        for table, key in (("PRODUCT_DAILY_STATS", "pv.ProductID"), ("SELLER_DAILY_STATS", "p.UserID")):
+            product = table == "PRODUCT_DAILY_STATS"
+            conn.execute(f"""
+                INSERT INTO {table} ({'ProductID, ' if product else ''}StatDate, SellerID, Views)
+                SELECT {'pv.ProductID, ' if product else ''}substr(pv.ViewedAt, 1, 10), p.UserID, COUNT(*)
+                FROM PRODUCT_VIEWS pv JOIN PRODUCTS p ON p.ProductID = pv.ProductID
+                WHERE pv.ViewedAt IS NOT NULL
+                GROUP BY {key}, substr(pv.ViewedAt, 1, 10)
+            """)
+            conn.execute(f"""
+                INSERT INTO {table} ({'ProductID, ' if product else ''}StatDate, SellerID, UnitsSold, Revenue, Orders)
+                SELECT {'pti.ProductID, ' if product else ''}substr(t.CreatedAt, 1, 10), p.UserID,
+                       SUM(pti.Quantity), SUM(pti.Quantity * pti.SoldPrice), COUNT(DISTINCT pti.TransactionID)
+                FROM PRODUCT_TRANSACTION_INFO pti
+                JOIN TRANSACTIONS t ON t.TransactionID = pti.TransactionID
+                JOIN PRODUCTS p ON p.ProductID = pti.ProductID
+                WHERE t.TransactionState = 'APPROVED'
+                GROUP BY {'pti.ProductID' if product else 'p.UserID'}, substr(t.CreatedAt, 1, 10)
+                ON CONFLICT DO UPDATE SET UnitsSold = UnitsSold + excluded.UnitsSold,
+                    Revenue = Revenue + excluded.Revenue, Orders = Orders + excluded.Orders
+            """)
+
+        # every seller was approved; most users applied too, and most of those are still waiting
+        applications = [(seller, f"PLAN-{seller}", "Generated address", "Approved", recent(730)) for seller in seller_ids]
+        for user in user_ids:
+            if rng.random() < 0.6:
+                applications.append((user, f"PLAN-{user}", "Generated address",
+                                     rng.choices(["Pending", "Rejected"], weights=[80, 20])[0], recent(90)))
+        conn.executemany(
+            "INSERT OR IGNORE INTO SELLER_INFO (UserID, ComRegNum, ComAddress, IsVerified, SubmittedAt) VALUES (?, ?, ?, ?, ?)",
+            applications)
+
+        cart = {(rng.choice(user_ids), rng.choice(product_ids)) for _ in range(size["CART"])}
+        conn.executemany("INSERT OR IGNORE INTO CART (UserID, ProductID, Quantity) VALUES (?, ?, 1)", sorted(cart))
+        conn.commit()
+
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+        self.row_counts = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+        self.build_context(user_ids, seller_ids, admin_ids)
+
+        large = sorted(table for table, count in self.row_counts.items() if count >= LARGE_TABLE_ROWS)
+        self.log_test("Dataset", True, f"Generated in {time.perf_counter() - start:.1f}s, large tables: {', '.join(large)}")
+        return True
+
+    def build_context(self, user_ids, seller_ids, admin_ids):
+        """Pick the busiest user, seller and admin as query parameters (worst case for per-user queries)"""
+        conn = self.conn
+        user_id = conn.execute("SELECT UserID FROM PRODUCT_VIEWS WHERE UserID IS NOT NULL GROUP BY UserID ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+        seller_id = conn.execute("SELECT UserID FROM PRODUCTS GROUP BY UserID ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+        admin_id = conn.execute("SELECT AssignedAdminID FROM REPORT GROUP BY AssignedAdminID ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+        product_id = conn.execute("SELECT ProductID FROM PRODUCT_VIEWS GROUP BY ProductID ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+        viewed = [row[0] for row in conn.execute(
+            "SELECT ProductID FROM PRODUCT_VIEWS WHERE UserID = ? ORDER BY ViewedAt DESC LIMIT 10", (user_id,))]
+        disputes = [row[0] for row in conn.execute(
+            "SELECT DisputeID FROM DISPUTE WHERE LodgedBy = ? OR LodgedAgainst = ? OR HandledBy = ?", (user_id, user_id, user_id))]
+
+        # cursor in the middle of the seller's history, as a second page request would send
+        seller_transactions = conn.execute("""
+            SELECT DISTINCT t.CreatedAt, t.TransactionID FROM TRANSACTIONS t
+            JOIN PRODUCT_TRANSACTION_INFO pti ON pti.TransactionID = t.TransactionID
+            JOIN PRODUCTS p ON p.ProductID = pti.ProductID
+            WHERE p.UserID = ? AND t.TransactionState = 'APPROVED'
+            ORDER BY t.CreatedAt DESC, t.TransactionID DESC
+        """, (seller_id,)).fetchall()
+        middle = seller_transactions[len(seller_transactions) // 2] if seller_transactions else ("", "")
+
+        # cursor in the middle of the pending queue, as the next page request would send
+        pending = conn.execute(
+            "SELECT SubmittedAt, UserID FROM SELLER_INFO WHERE IsVerified = 'Pending' ORDER BY SubmittedAt, UserID").fetchall()
+        queue_middle = pending[len(pending) // 2] if pending else ("", 0)
+
+        self.context = {
+            "user_id": user_id,
+            "seller_id": seller_id,
+            "seller_cursor": (middle[0], middle[1]),
+            "application_cursor": (queue_middle[0], queue_middle[1]),
+            "seven_days_ago": sequelize_date(datetime.now(timezone.utc) - timedelta(days=7)),
+            "thirty_days_ago": sequelize_date(datetime.now(timezone.utc) - timedelta(days=30)),
+            "summary_from": (datetime.now(timezone.utc) - timedelta(days=29)).strftime("%Y-%m-%d"),
+            "admin_id": admin_id,
+            "product_id": product_id,
+            "viewed_ids": ",".join(str(i) for i in viewed) or "0",
+            "dispute_ids": ",".join(str(i) for i in disputes) or "0",
+        }
+
+    def resolve_sql(self, query):
+        sql = query["sql"]
+        return sql(self.context) if callable(sql) else sql
+
+    def table_aliases(self, sql):
+        """Map aliases (and table names) used in the SQL to table names"""
+        aliases = {}
+        for table, alias in TABLE_ALIAS.findall(sql):
+            aliases[table] = table
+            if alias and alias.upper() not in SQL_KEYWORDS:
+                aliases[alias] = table
+        return aliases
+
+    def explain(self, query):
+        sql = self.resolve_sql(query)
+        params = query["params"](self.context)
+        return [row["detail"] for row in self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def check_plan(self, query):
+        """Fail on full scans / automatic indexes on large tables and unexpected ORDER BY sorts"""
+        plan = self.explain(query)
+        aliases = self.table_aliases(self.resolve_sql(query))
+        allowed_scans = query.get("allow_scan", {})
+        problems = []
+
+        for detail in plan:
+            for pattern, label in ((SCAN, "full scan"), (AUTOMATIC_INDEX, "automatic index")):
+                match = pattern.match(detail)
+                if not match:
+                    continue
+                name = match.group(2) or match.group(1)
+                table = aliases.get(name, name)
+                if self.row_counts.get(table, 0) >= LARGE_TABLE_ROWS and table not in allowed_scans:
+                    problems.append(f"{label} of {table} ({self.row_counts[table]} rows): {detail}")
+            if "TEMP B-TREE FOR" in detail and "ORDER BY" in detail and not query.get("allow_sort"):
+                problems.append(f"sort without an index: {detail}")
+
+        self.measurements.setdefault(query["name"], {})["plan"] = plan
+        if problems:
+            self.log_test(f"Plan {query['name']}", False, f"{query['route']} - " + "; ".join(problems))
+        else:
+            self.log_test(f"Plan {query['name']}", True, " | ".join(plan))
+        return not problems
+
+    def time_query(self, query, baseline):
+        """Median time over a few runs, compared with the stored baseline"""
+        sql = self.resolve_sql(query)
+        params = query["params"](self.context)
+        # every run is rolled back, so timed UPDATE / DELETE statements leave the dataset as it was
+        def run():
+            self.conn.execute("SAVEPOINT timing")
+            start = time.perf_counter()
+            self.conn.execute(sql, params).fetchall()
+            elapsed = (time.perf_counter() - start) * 1000
+            self.conn.execute("ROLLBACK TO timing")
+            self.conn.execute("RELEASE timing")
+            return elapsed
+
+        run()     # warm the page cache
+        samples = [run() for _ in range(TIMING_RUNS)]
+        median = round(statistics.median(samples), 3)
+        self.measurements.setdefault(query["name"], {})["median_ms"] = median
+
+        if self.update_baselines or baseline is None:
+            self.log_test(f"Timing {query['name']}", True, f"{median}ms (no baseline compared)")
+            return True
+
+        # small absolute slack so sub-millisecond queries do not fail on timer noise
+        limit = baseline["median_ms"] * self.tolerance + 1.0
+        success = median <= limit
+        self.log_test(f"Timing {query['name']}", success,
+                      f"{median}ms (baseline {baseline['median_ms']}ms, limit {limit:.3f}ms)")
+        return success
+
+    def load_baselines(self):
+        if not os.path.exists(BASELINES_FILE):
+            return {}
+        with open(BASELINES_FILE) as f:
+            data = json.load(f)
+        if data.get("scale") != self.scale:
+            print(f"⚠️ Baselines were recorded at scale {data.get('scale')}, timings are not compared")
+            return {}
+        return data.get("queries", {})
+
+    def save_baselines(self):
+        data = {
+            "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "sqlite_version": sqlite3.sqlite_version,
+            "scale": self.scale,
+            "row_counts": self.row_counts,
+            "queries": self.measurements,
+        }
+        with open(BASELINES_FILE, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        print(f"💾 Baselines written to {os.path.relpath(BASELINES_FILE, ROOT)}")
+
+    def cleanup(self):
+        if self.conn is not None:
+            self.conn.close()
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def run_all_tests(self):
+        """Run the plan and timing checks for every hot query"""
+        print("🚀 Starting Query Plan Regression Tests")
+        print(f"🗄️ Database: {self.database} (SQLite {sqlite3.sqlite_version}, scale {self.scale})")
+        print("=" * 80)
+
+        try:
+            if not self.setup_database() or not self.apply_migrations():
+                return False
+            self.generate_dataset()
+
+            baselines = self.load_baselines()
+            for query in QUERIES:
+                self.check_plan(query)
+                self.time_query(query, baselines.get(query["name"]))
+
+            if self.update_baselines:
+                self.save_baselines()
+        finally:
+            self.cleanup()
+
+        print("\n" + "=" * 80)
+        print(f"📊 Query Plan Test Results: {self.tests_passed}/{self.tests_run} tests passed")
+
+        failed_tests = [r for r in self.test_results if not r['success']]
+        if failed_tests:
+            print("\n❌ Failed Tests:")
+            for test in failed_tests:
+                print(f"   - {test['test']}: {test['message']}")
+        else:
+            print("\n🎉 All query plan tests passed!")
+
+        return len(failed_tests) == 0
+
+
+def main():
+    """Main test execution for the query plan regression suite"""
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN and timing checks for the hot SQL")
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="SQLite database to copy (default: server/database.sqlite)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the generated row counts")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="allowed slowdown factor against the baselines")
+    parser.add_argument("--update-baselines", action="store_true", help="record the current timings and plans as baselines")
+    args = parser.parse_args()
+
+    tester = QueryPlanTester(args.database, args.scale, args.tolerance, args.update_baselines)
+
+    try:
+        success = tester.run_all_tests()
+        return 0 if success else 1
+    except KeyboardInterrupt:
+        print("\n⚠️ Tests interrupted by user")
+        return 1
+    except Exception as e:
+        print(f"\n💥 Unexpected error: {str(e)}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
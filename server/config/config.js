@@ -12,5 +12,24 @@ module.exports = {
     production: {
         use_env_variable: 'MONGO_URL',
         dialect: "mongodb"
+    },
+    // Single-node deployment on SQLite (NODE_ENV=production_sqlite)
+    production_sqlite: {
+        dialect: "sqlite",
+        storage: process.env.SQLITE_STORAGE || "./database.sqlite",
+        logging: false,
+        transactionType: "IMMEDIATE", // take the write lock at BEGIN instead of failing on upgrade
+        pragmas: {
+            journal_mode: "WAL",
+            synchronous: "NORMAL",
+            busy_timeout: 5000,
+            mmap_size: 268435456, // 256MB
+            cache_size: -65536, // 64MB
+            temp_store: "MEMORY"
+        },
+        writeQueue: {
+            waitTimeoutMs: 5000,
+            leaseMs: 30000
+        }
     }
   };
\ No newline at end of file
@@ -0,0 +1,43 @@
+// Account state - suspending an account takes the seller's listings down with it
+// Every change is a handful of set-based statements, whatever the number of accounts, products or carts.
+const { Op } = require('sequelize');
+const { USERS, PRODUCTS, CART, sequelize } = require('../models');
+
+/**
+ * Set the AccountState of several users and cascade it to their products.
+ * Suspending moves their Active products to 'Suspended' and removes those products from every cart;
+ * reactivating lists the Suspended ones again (products the seller had set Inactive stay Inactive).
+ * @param {Array} userIds - UserIDs to change
+ * @param {string} state - 'Active' or 'Suspended'
+ * @param {Object} options - { transaction }
+ * @returns {Object} - Rows changed: { users, products, cartItems }
+ */
+const applyAccountState = async (userIds, state, { transaction } = {}) => {
+    if (userIds.length === 0) return { users: 0, products: 0, cartItems: 0 };
+    const owners = { [Op.in]: userIds };
+
+    const [users] = await USERS.update({ AccountState: state }, { where: { UserID: owners }, transaction });
+
+    if (state !== 'Suspended') {
+        const [products] = await PRODUCTS.update(
+            { ProdStatus: 'Active' },
+            { where: { UserID: owners, ProdStatus: 'Suspended' }, transaction }
+        );
+        return { users, products, cartItems: 0 };
+    }
+
+    const [products] = await PRODUCTS.update(
+        { ProdStatus: 'Suspended' },
+        { where: { UserID: owners, ProdStatus: 'Active' }, transaction }
+    );
+    const suspendedProducts = sequelize.literal(
+        `(SELECT ProductID FROM PRODUCTS WHERE ProdStatus = 'Suspended' AND UserID IN (${userIds.map(id => sequelize.escape(id)).join(', ')}))`
+    );
+    const cartItems = await CART.destroy({ where: { ProductID: { [Op.in]: suspendedProducts } }, transaction });
+
+    return { users, products, cartItems };
+};
+
+module.exports = {
+    applyAccountState
+};
@@ -0,0 +1,187 @@
+// Admin workload index - tracks active report counts per admin for report assignment
+const { USERS, REPORT, sequelize } = require('../models');
+const { Op } = require('sequelize');
+const { onRemoteTableWrite } = require('./tableVersions');
+
+const ADMIN_ROLES = ['Admin', 'SuperAdmin'];
+const ACTIVE_REPORT_STATUSES = ['Pending', 'Under Review'];
+
+// Min-heap of { admin, workload }, ordered by workload then UserID.
+// positions maps UserID -> index in the heap so single admins can be re-keyed in O(log n).
+let heap = [];
+let positions = new Map();
+let ready = false;
+let stale = false;
+let changes = 0;        // bumped by markStale, so a rebuild can tell whether it missed a change
+let rebuilding = null;
+
+const isActiveStatus = (status) => ACTIVE_REPORT_STATUSES.includes(status);
+
+const lessThan = (a, b) => {
+    if (a.workload !== b.workload) return a.workload < b.workload;
+    return a.admin.UserID < b.admin.UserID;
+};
+
+const swap = (i, j) => {
+    [heap[i], heap[j]] = [heap[j], heap[i]];
+    positions.set(heap[i].admin.UserID, i);
+    positions.set(heap[j].admin.UserID, j);
+};
+
+const siftUp = (i) => {
+    while (i > 0) {
+        const parent = (i - 1) >> 1;
+        if (!lessThan(heap[i], heap[parent])) break;
+        swap(i, parent);
+        i = parent;
+    }
+};
+
+const siftDown = (i) => {
+    for (;;) {
+        const left = 2 * i + 1;
+        const right = left + 1;
+        let smallest = i;
+        if (left < heap.length && lessThan(heap[left], heap[smallest])) smallest = left;
+        if (right < heap.length && lessThan(heap[right], heap[smallest])) smallest = right;
+        if (smallest === i) break;
+        swap(i, smallest);
+        i = smallest;
+    }
+};
+
+/**
+ * Rebuild the heap from the database: one query for the admins, one grouped count for their reports
+ */
+const rebuildWorkloadIndex = async () => {
+    const startChanges = changes;
+    const [admins, counts] = await Promise.all([
+        USERS.findAll({
+            where: { UserAuth: { [Op.in]: ADMIN_ROLES } },
+            attributes: ['UserID', 'Username', 'FirstName', 'LastName', 'UserAuth'],
+            raw: true
+        }),
+        REPORT.findAll({
+            attributes: ['AssignedAdminID', [sequelize.fn('COUNT', sequelize.col('ReportID')), 'activeReports']],
+            where: { Status: { [Op.in]: ACTIVE_REPORT_STATUSES } },
+            group: ['AssignedAdminID'],
+            raw: true
+        })
+    ]);
+
+    const workloadByAdmin = new Map(counts.map(row => [row.AssignedAdminID, parseInt(row.activeReports)]));
+
+    heap = admins.map(admin => ({ admin, workload: workloadByAdmin.get(admin.UserID) || 0 }));
+    positions = new Map(heap.map((entry, index) => [entry.admin.UserID, index]));
+    for (let i = (heap.length >> 1) - 1; i >= 0; i--) {
+        siftDown(i);
+    }
+
+    ready = true;
+    // a change made while the queries ran may be missing from their results - ensureReady goes round again
+    stale = changes !== startChanges;
+};
+
+const ensureReady = async () => {
+    while (!ready || stale) {
+        if (!rebuilding) {
+            rebuilding = rebuildWorkloadIndex().finally(() => { rebuilding = null; });
+        }
+        await rebuilding;
+    }
+};
+
+const markStale = () => {
+    stale = true;
+    changes++;
+};
+
+const adjustWorkload = (adminId, delta) => {
+    if (!ready || rebuilding) {
+        // a rebuild in flight may or may not have seen this change - recount on next use
+        markStale();
+        return;
+    }
+    const index = positions.get(adminId);
+    if (index === undefined) {
+        markStale();
+        return;
+    }
+    heap[index].workload = Math.max(0, heap[index].workload + delta);
+    siftUp(index);
+    siftDown(positions.get(adminId));
+};
+
+/**
+ * Get the admin with the lowest number of active reports
+ * @returns {Object} - { UserID, Username, FirstName, LastName, UserAuth }
+ */
+const pickLeastLoadedAdmin = async () => {
+    await ensureReady();
+    if (heap.length === 0) {
+        throw new Error('No available admins found');
+    }
+    return heap[0].admin;
+};
+
+/**
+ * Get the active report count of every admin, ordered by UserID
+ * @returns {Array} - [{ admin, activeReports }]
+ */
+const getWorkloadSnapshot = async () => {
+    await ensureReady();
+    return heap
+        .map(entry => ({ admin: { ...entry.admin }, activeReports: entry.workload }))
+        .sort((a, b) => a.admin.UserID - b.admin.UserID);
+};
+
+// Keep the index current as reports are created, reassigned, change status or are removed
+REPORT.addHook('afterCreate', 'adminWorkload', (report) => {
+    if (isActiveStatus(report.Status)) adjustWorkload(report.AssignedAdminID, 1);
+});
+
+REPORT.addHook('beforeUpdate', 'adminWorkload', (report, options) => {
+    options.adminWorkloadBefore = {
+        adminId: report.previous('AssignedAdminID'),
+        active: isActiveStatus(report.previous('Status'))
+    };
+});
+
+REPORT.addHook('afterUpdate', 'adminWorkload', (report, options) => {
+    const before = options.adminWorkloadBefore;
+    if (!before) return markStale();
+    if (before.active) adjustWorkload(before.adminId, -1);
+    if (isActiveStatus(report.Status)) adjustWorkload(report.AssignedAdminID, 1);
+});
+
+REPORT.addHook('afterDestroy', 'adminWorkload', (report) => {
+    if (isActiveStatus(report.Status)) adjustWorkload(report.AssignedAdminID, -1);
+});
+
+REPORT.addHook('afterBulkCreate', 'adminWorkload', markStale);
+REPORT.addHook('afterBulkUpdate', 'adminWorkload', markStale);
+REPORT.addHook('afterBulkDestroy', 'adminWorkload', markStale);
+
+// Admin accounts being added, promoted or changed invalidate the admin set
+const onUserChange = (user) => {
+    if (!ready || ADMIN_ROLES.includes(user.UserAuth) || positions.has(user.UserID)) markStale();
+};
+
+USERS.addHook('afterCreate', 'adminWorkload', onUserChange);
+USERS.addHook('afterUpdate', 'adminWorkload', onUserChange);
+USERS.addHook('afterDestroy', 'adminWorkload', onUserChange);
+USERS.addHook('afterBulkUpdate', 'adminWorkload', markStale);
+USERS.addHook('afterBulkDestroy', 'adminWorkload', markStale);
+
+// Other cluster workers assign and close reports too; their writes only say which table changed
+onRemoteTableWrite(table => {
+    if (table === 'REPORT' || table === 'USERS') markStale();
+});
+
+module.exports = {
+    pickLeastLoadedAdmin,
+    getWorkloadSnapshot,
+    rebuildWorkloadIndex,
+    ADMIN_ROLES,
+    ACTIVE_REPORT_STATUSES
+};
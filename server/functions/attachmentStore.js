@@ -0,0 +1,214 @@
+// Report attachment store - content-addressed, sharded storage for files uploaded with reports
+const crypto = require('crypto');
+const fs = require('fs');
+const fsp = require('fs/promises');
+const path = require('path');
+const { Transform } = require('stream');
+const { pipeline } = require('stream/promises');
+const { REPORT } = require('../models');
+const { Op } = require('sequelize');
+
+const ATTACHMENTS_ROOT = path.join(__dirname, '..', 'uploads', 'reports');
+const TEMP_DIR = path.join(ATTACHMENTS_ROOT, 'tmp');
+const ATTACHMENT_CACHE_CONTROL = 'private, max-age=31536000, immutable';
+
+// Files younger than this are never removed, so an upload is safe until its report row exists
+const CLEANUP_GRACE_MS = 24 * 60 * 60 * 1000;
+
+// <sha256><ext> for content-addressed files, anything else is a legacy flat file (report_<time>-<rand><ext>)
+const HASHED_NAME = /^([a-f0-9]{64})(\.[a-z0-9]{1,10})?$/;
+const SAFE_NAME = /^[\w-]+(\.[\w]{1,10})?$/;
+
+fs.mkdirSync(TEMP_DIR, { recursive: true });
+
+const safeExtension = (originalname) => {
+    const ext = path.extname(originalname || '').toLowerCase();
+    return /^\.[a-z0-9]{1,10}$/.test(ext) ? ext : '';
+};
+
+/**
+ * Resolve a stored attachment name to its path on disk
+ * @param {string} filename - Name as stored in REPORT.ReportAttachments
+ * @returns {Object|null} - { filePath, hash } (hash is null for legacy files), or null for invalid names
+ */
+const resolveAttachment = (filename) => {
+    const hashed = HASHED_NAME.exec(filename);
+    if (hashed) {
+        const hash = hashed[1];
+        return {
+            filePath: path.join(ATTACHMENTS_ROOT, hash.slice(0, 2), hash.slice(2, 4), filename),
+            hash
+        };
+    }
+    if (SAFE_NAME.test(filename)) {
+        return { filePath: path.join(ATTACHMENTS_ROOT, filename), hash: null };
+    }
+    return null;
+};
+
+/**
+ * Multer storage engine: streams the upload through sha256 into a temp file, then moves it to
+ * uploads/reports/<ab>/<cd>/<hash><ext>. Identical files resolve to the same name and are stored once.
+ */
+const reportAttachmentStorage = {
+    _handleFile(req, file, cb) {
+        const tempPath = path.join(TEMP_DIR, `${process.pid}-${Date.now()}-${crypto.randomBytes(6).toString('hex')}`);
+        const hash = crypto.createHash('sha256');
+        let size = 0;
+
+        const hasher = new Transform({
+            transform(chunk, encoding, callback) {
+                hash.update(chunk);
+                size += chunk.length;
+                callback(null, chunk);
+            }
+        });
+
+        (async () => {
+            try {
+                await pipeline(file.stream, hasher, fs.createWriteStream(tempPath));
+
+                const digest = hash.digest('hex');
+                const filename = `${digest}${safeExtension(file.originalname)}`;
+                const { filePath } = resolveAttachment(filename);
+
+                let deduplicated = false;
+                try {
+                    // already stored - drop the copy and refresh the mtime so cleanup keeps it
+                    const now = new Date();
+                    await fsp.utimes(filePath, now, now);
+                    await fsp.unlink(tempPath);
+                    deduplicated = true;
+                } catch (err) {
+                    if (err.code !== 'ENOENT') throw err;
+                    await fsp.mkdir(path.dirname(filePath), { recursive: true });
+                    await fsp.rename(tempPath, filePath);
+                }
+
+                cb(null, { destination: path.dirname(filePath), filename, path: filePath, size, hash: digest, deduplicated });
+            } catch (err) {
+                fsp.unlink(tempPath).catch(() => {});
+                cb(err);
+            }
+        })();
+    },
+
+    // Stored files may be shared with other reports; unreferenced ones are removed by the cleanup job
+    _removeFile(req, file, cb) {
+        cb(null);
+    }
+};
+
+// Stored names referenced by each report row
+const parseAttachments = (value) => {
+    try {
+        const parsed = JSON.parse(value || '[]');
+        return Array.isArray(parsed) ? parsed.filter(name => typeof name === 'string') : [];
+    } catch (err) {
+        return [];
+    }
+};
+
+const isPastGrace = async (filePath) => {
+    const stats = await fsp.stat(filePath);
+    return Date.now() - stats.mtimeMs > CLEANUP_GRACE_MS;
+};
+
+/**
+ * Remove the files of a deleted report that no other report still references
+ * @param {Array} filenames - Stored names from the deleted report
+ * @returns {number} - Number of files removed
+ */
+const releaseAttachments = async (filenames) => {
+    let removed = 0;
+    for (const filename of new Set(filenames)) {
+        const resolved = resolveAttachment(filename);
+        if (!resolved) continue;
+
+        const references = await REPORT.count({
+            where: { ReportAttachments: { [Op.like]: `%"${filename}"%` } }
+        });
+        if (references > 0) continue;
+
+        try {
+            if (!(await isPastGrace(resolved.filePath))) continue;
+            await fsp.unlink(resolved.filePath);
+            removed++;
+        } catch (err) {
+            if (err.code !== 'ENOENT') throw err;
+        }
+    }
+    return removed;
+};
+
+const listFiles = async (dir) => {
+    const files = [];
+    let entries;
+    try {
+        entries = await fsp.readdir(dir, { withFileTypes: true });
+    } catch (err) {
+        if (err.code === 'ENOENT') return files;
+        throw err;
+    }
+    for (const entry of entries) {
+        if (entry.name.startsWith('.')) continue;
+        const fullPath = path.join(dir, entry.name);
+        if (entry.isDirectory()) files.push(...await listFiles(fullPath));
+        else if (entry.isFile()) files.push(fullPath);
+    }
+    return files;
+};
+
+/**
+ * Reference-counted sweep: counts references from every report and removes stored files
+ * (and abandoned temp files) that have none and are older than the grace period
+ * @returns {Object} - { scanned, removed }
+ */
+const sweepUnreferencedAttachments = async () => {
+    const reports = await REPORT.findAll({
+        attributes: ['ReportAttachments'],
+        where: { ReportAttachments: { [Op.ne]: null } },
+        raw: true
+    });
+
+    const referenceCounts = new Map();
+    for (const report of reports) {
+        for (const filename of parseAttachments(report.ReportAttachments)) {
+            referenceCounts.set(filename, (referenceCounts.get(filename) || 0) + 1);
+        }
+    }
+
+    const files = await listFiles(ATTACHMENTS_ROOT);
+    let removed = 0;
+    for (const filePath of files) {
+        const inTemp = path.dirname(filePath) === TEMP_DIR;
+        if (!inTemp && referenceCounts.has(path.basename(filePath))) continue;
+        try {
+            if (!(await isPastGrace(filePath))) continue;
+            await fsp.unlink(filePath);
+            removed++;
+        } catch (err) {
+            if (err.code !== 'ENOENT') throw err;
+        }
+    }
+
+    return { scanned: files.length, removed };
+};
+
+// Deleting a single report releases its files straight away; bulk deletes are left to the nightly sweep
+REPORT.addHook('afterDestroy', 'attachmentStore', async (report) => {
+    try {
+        await releaseAttachments(parseAttachments(report.ReportAttachments));
+    } catch (err) {
+        console.error('Error releasing report attachments:', err);
+    }
+});
+
+module.exports = {
+    reportAttachmentStorage,
+    resolveAttachment,
+    releaseAttachments,
+    sweepUnreferencedAttachments,
+    ATTACHMENTS_ROOT,
+    ATTACHMENT_CACHE_CONTROL
+};
@@ -0,0 +1,249 @@
+// Catalog snapshot - optional in-memory copy of products, sellers and categories for the hot read routes
+// Enabled with CATALOG_SNAPSHOT=true. Routes fall back to the database whenever the snapshot is not ready.
+const { PRODUCTS, USERS, CATEGORY } = require('../models');
+const { onRemoteTableWrite } = require('./tableVersions');
+
+const ENABLED = process.env.CATALOG_SNAPSHOT === 'true';
+const CATALOG_TABLES = ['PRODUCTS', 'USERS', 'CATEGORY'];
+const REMOTE_RELOAD_DELAY_MS = 100;
+const SELLER_ATTRIBUTES = ['UserID', 'Username', 'FirstName', 'LastName', 'UserAuth'];
+
+let productsById = new Map();   // ProductID -> plain product row
+let byCategory = new Map();     // CategoryID -> products sorted by ProductID
+let bySeller = new Map();       // UserID -> products sorted by ProductID
+let sellers = new Map();        // UserID -> { UserID, Username, FirstName, LastName, UserAuth }
+let categories = [];
+let ready = false;
+let loading = null;
+let reloadAgain = false;        // a write landed while loading; the loaded data may predate it
+
+const refreshSequence = new Map();  // ProductID -> latest refresh started, so slower older reads are discarded
+
+// Insert into / remove from a list kept sorted by ProductID (same order as an unordered SQLite scan)
+const insertSorted = (index, key, product) => {
+    if (!index.has(key)) index.set(key, []);
+    const list = index.get(key);
+    let lo = 0;
+    let hi = list.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (list[mid].ProductID < product.ProductID) lo = mid + 1;
+        else hi = mid;
+    }
+    list.splice(lo, 0, product);
+};
+
+const removeSorted = (index, key, productId) => {
+    const list = index.get(key);
+    if (!list) return;
+    const position = list.findIndex(product => product.ProductID === productId);
+    if (position !== -1) list.splice(position, 1);
+    if (list.length === 0) index.delete(key);
+};
+
+const addProduct = (product) => {
+    productsById.set(product.ProductID, product);
+    insertSorted(byCategory, product.CategoryID, product);
+    insertSorted(bySeller, product.UserID, product);
+};
+
+const removeProduct = (productId) => {
+    const product = productsById.get(productId);
+    if (!product) return;
+    productsById.delete(productId);
+    removeSorted(byCategory, product.CategoryID, productId);
+    removeSorted(bySeller, product.UserID, productId);
+};
+
+/**
+ * Load the whole catalog (three queries)
+ */
+const loadCatalogSnapshot = async () => {
+    const [productRows, sellerRows, categoryRows] = await Promise.all([
+        PRODUCTS.findAll({ order: [['ProductID', 'ASC']] }),
+        USERS.findAll({ attributes: SELLER_ATTRIBUTES }),
+        CATEGORY.findAll()
+    ]);
+
+    productsById = new Map();
+    byCategory = new Map();
+    bySeller = new Map();
+    for (const row of productRows) {
+        addProduct(row.get({ plain: true }));
+    }
+    sellers = new Map(sellerRows.map(row => [row.UserID, row.get({ plain: true })]));
+    categories = categoryRows.map(row => row.get({ plain: true }));
+
+    ready = !reloadAgain;
+    console.log(`Catalog snapshot loaded: ${productRows.length} products, ${categoryRows.length} categories`);
+};
+
+const reload = () => {
+    ready = false;
+    if (loading) {
+        reloadAgain = true;
+        return loading;
+    }
+    loading = loadCatalogSnapshot()
+        .catch(err => console.error('Error loading catalog snapshot:', err))
+        .finally(() => {
+            loading = null;
+            if (reloadAgain) {
+                reloadAgain = false;
+                reload();
+            }
+        });
+    return loading;
+};
+
+// Writes before the first load are picked up by it; writes during a load trigger another one
+const skipWrite = () => {
+    if (loading) {
+        reloadAgain = true;
+        return true;
+    }
+    return !ready;
+};
+
+const refreshProduct = async (productId) => {
+    const sequence = (refreshSequence.get(productId) || 0) + 1;
+    refreshSequence.set(productId, sequence);
+
+    const row = await PRODUCTS.findOne({ where: { ProductID: productId } });
+    if (refreshSequence.get(productId) !== sequence) return;
+    refreshSequence.delete(productId);
+
+    removeProduct(productId);
+    if (row) addProduct(row.get({ plain: true }));
+};
+
+const refreshSeller = async (userId) => {
+    const row = await USERS.findOne({ where: { UserID: userId }, attributes: SELLER_ATTRIBUTES });
+    if (row) sellers.set(userId, row.get({ plain: true }));
+    else sellers.delete(userId);
+};
+
+const refreshCategories = async () => {
+    const rows = await CATEGORY.findAll();
+    categories = rows.map(row => row.get({ plain: true }));
+};
+
+// Re-read the written row once it is committed; the instance itself may have been loaded with partial attributes
+const afterWrite = (refresh) => (instance, options) => {
+    if (skipWrite()) return;
+    const run = () => refresh(instance).catch(err => {
+        console.error('Error updating catalog snapshot:', err);
+        reload();
+    });
+    if (options && options.transaction) {
+        options.transaction.afterCommit(run);
+        return;
+    }
+    return run();
+};
+
+const afterBulkWrite = (options) => {
+    if (skipWrite()) return;
+    if (options && options.transaction) {
+        options.transaction.afterCommit(() => reload());
+        return;
+    }
+    reload();
+};
+
+if (ENABLED) {
+    const productWrite = afterWrite(product => refreshProduct(product.ProductID));
+    PRODUCTS.addHook('afterCreate', 'catalogSnapshot', productWrite);
+    PRODUCTS.addHook('afterUpdate', 'catalogSnapshot', productWrite);
+    PRODUCTS.addHook('afterDestroy', 'catalogSnapshot', productWrite);
+    PRODUCTS.addHook('afterBulkCreate', 'catalogSnapshot', (instances, options) => afterBulkWrite(options));
+    PRODUCTS.addHook('afterBulkUpdate', 'catalogSnapshot', afterBulkWrite);
+    PRODUCTS.addHook('afterBulkDestroy', 'catalogSnapshot', afterBulkWrite);
+
+    const userWrite = afterWrite(user => refreshSeller(user.UserID));
+    USERS.addHook('afterCreate', 'catalogSnapshot', userWrite);
+    USERS.addHook('afterUpdate', 'catalogSnapshot', userWrite);
+    USERS.addHook('afterDestroy', 'catalogSnapshot', userWrite);
+    USERS.addHook('afterBulkUpdate', 'catalogSnapshot', afterBulkWrite);
+    USERS.addHook('afterBulkDestroy', 'catalogSnapshot', afterBulkWrite);
+
+    const categoryWrite = afterWrite(() => refreshCategories());
+    CATEGORY.addHook('afterCreate', 'catalogSnapshot', categoryWrite);
+    CATEGORY.addHook('afterUpdate', 'catalogSnapshot', categoryWrite);
+    CATEGORY.addHook('afterDestroy', 'catalogSnapshot', categoryWrite);
+    CATEGORY.addHook('afterBulkCreate', 'catalogSnapshot', (instances, options) => categoryWrite(null, options));
+    CATEGORY.addHook('afterBulkUpdate', 'catalogSnapshot', (options) => categoryWrite(null, options));
+    CATEGORY.addHook('afterBulkDestroy', 'catalogSnapshot', (options) => categoryWrite(null, options));
+
+    // Writes from other cluster workers only say which table changed: reload, batching bursts of writes
+    let remoteReload = null;
+    onRemoteTableWrite(table => {
+        if (!CATALOG_TABLES.includes(table) || skipWrite() || remoteReload) return;
+        ready = false;  // serve from the database until the reload finishes
+        remoteReload = setTimeout(() => {
+            remoteReload = null;
+            reload();
+        }, REMOTE_RELOAD_DELAY_MS);
+    });
+}
+
+/**
+ * Whether the snapshot is enabled and loaded; callers query the database otherwise
+ * @returns {boolean}
+ */
+const isCatalogReady = () => ENABLED && ready;
+
+/**
+ * Load the snapshot at startup when CATALOG_SNAPSHOT=true
+ */
+const startCatalogSnapshot = async () => {
+    if (ENABLED) await reload();
+};
+
+/**
+ * Products of a category, same rows as PRODUCTS.findAll({ where: { CategoryID } })
+ * @param {number|string} categoryId - Category ID
+ * @returns {Array|null} - null when the snapshot is not ready
+ */
+const getProductsByCategory = (categoryId) => {
+    if (!isCatalogReady()) return null;
+    return byCategory.get(Number(categoryId)) || [];
+};
+
+/**
+ * Products of a seller, same rows as PRODUCTS.findAll({ where: { UserID } })
+ * @param {number|string} userId - Seller's UserID
+ * @returns {Array|null} - null when the snapshot is not ready
+ */
+const getProductsBySeller = (userId) => {
+    if (!isCatalogReady()) return null;
+    return bySeller.get(Number(userId)) || [];
+};
+
+/**
+ * A single product with its seller, in the shape returned by /products/product/:id
+ * @param {number|string} productId - Product ID
+ * @returns {Object|null|undefined} - undefined when the snapshot is not ready, null when the product does not exist
+ */
+const getProductWithSeller = (productId) => {
+    if (!isCatalogReady()) return undefined;
+    const product = productsById.get(Number(productId));
+    if (!product) return null;
+    const seller = sellers.get(product.UserID) || null;
+    return { ...product, USER: seller ? { ...seller } : null, Seller: seller ? { ...seller } : null };
+};
+
+/**
+ * All categories, same rows as CATEGORY.findAll()
+ * @returns {Array|null} - null when the snapshot is not ready
+ */
+const getCategories = () => (isCatalogReady() ? categories : null);
+
+module.exports = {
+    startCatalogSnapshot,
+    isCatalogReady,
+    getProductsByCategory,
+    getProductsBySeller,
+    getProductWithSeller,
+    getCategories
+};
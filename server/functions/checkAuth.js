@@ -1,4 +1,5 @@
 const { verifyToken } = require('../functions/verifyToken');
+const { USERS } = require('../models');
 
 function checkAuth(acceptedAuth) {
     return async (req, res, next) => {
@@ -33,4 +34,21 @@ function checkAuth(acceptedAuth) {
 
 }
 
-module.exports = { checkAuth };
\ No newline at end of file
+// Tokens outlive a suspension, so routes that change listings also check the account is still active
+// (use after checkAuth)
+async function checkActiveAccount(req, res, next) {
+    try {
+        const account = await USERS.findByPk(req.user.id, { attributes: ['AccountState'], raw: true });
+
+        if (!account || account.AccountState === 'Suspended') {
+            return res.status(403).json({ status: 403, message: 'Account is suspended' });
+        }
+
+        next();
+    } catch (err) {
+        console.log('Error checking account state:', err);
+        return res.status(500).json({ status: 500, message: `Error checking account state: ${err}` });
+    }
+}
+
+module.exports = { checkAuth, checkActiveAccount };
\ No newline at end of file
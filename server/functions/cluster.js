@@ -0,0 +1,80 @@
+// Cluster mode - CLUSTER_WORKERS=n runs n server processes sharing the port
+// The primary only forks and restarts workers, relays their broadcasts and merges their metrics.
+// Caches and the image job status follow other workers through those broadcasts. The SQLite writer queue
+// (sqliteProfile.js) is per process: across workers writers are serialized by SQLite's busy_timeout only.
+const cluster = require('cluster');
+const { counter, gauge, handlePrimaryMessage } = require('./metrics');
+
+const CLUSTER_WORKERS = parseInt(process.env.CLUSTER_WORKERS) || 0;
+const RESTART_DELAY_MS = 1000;
+
+// Shared ETag epoch (see tableVersions.js), replaced whenever a worker is restarted
+const newEpoch = () => Date.now().toString(36);
+
+/**
+ * Whether this process is the cluster primary (it prepares the database but serves no requests)
+ * @returns {boolean}
+ */
+const isClusterPrimary = () => CLUSTER_WORKERS > 0 && cluster.isPrimary;
+
+/**
+ * Whether this process runs the cron jobs: the single server process, or one designated worker
+ * @returns {boolean}
+ */
+const runsScheduledTasks = () => (cluster.isWorker
+    ? process.env.RUN_SCHEDULED_TASKS === 'true'
+    : !isClusterPrimary());
+
+/**
+ * Fork the workers and keep them running. The first worker (and whichever replaces it) runs the cron jobs.
+ * @param {number} count - Number of workers, CLUSTER_WORKERS by default
+ */
+const startClusterPrimary = (count = CLUSTER_WORKERS) => {
+    const restarts = counter('cluster_worker_restarts_total', 'Workers restarted after exiting');
+    const workersAlive = gauge('cluster_workers', 'Live worker processes', { aggregate: 'max' });
+    const scheduler = new WeakSet();
+    let epoch = newEpoch();
+
+    const fork = (runsTasks) => {
+        const worker = cluster.fork({ RUN_SCHEDULED_TASKS: runsTasks ? 'true' : 'false', TABLE_VERSIONS_EPOCH: epoch });
+        if (runsTasks) scheduler.add(worker);
+        workersAlive.set({}, Object.keys(cluster.workers).length);
+    };
+
+    cluster.on('message', (worker, message) => {
+        // { broadcast: true } messages go to every other worker (cache invalidation)
+        if (message && message.broadcast) {
+            for (const other of Object.values(cluster.workers)) {
+                if (other && other !== worker && other.isConnected()) other.send(message);
+            }
+            return;
+        }
+        handlePrimaryMessage(worker, message);
+    });
+
+    cluster.on('exit', (worker, code, signal) => {
+        workersAlive.set({}, Object.keys(cluster.workers).length);
+        if (worker.exitedAfterDisconnect) return;   // shut down on purpose
+        console.error(`Worker ${worker.process.pid} exited (${signal || code}), restarting`);
+        restarts.inc();
+        setTimeout(() => {
+            // the new worker counts writes from zero: move every worker to a new epoch with it
+            epoch = newEpoch();
+            for (const other of Object.values(cluster.workers)) {
+                if (other && other.isConnected()) other.send({ type: 'tableVersions:epoch', epoch });
+            }
+            fork(scheduler.has(worker));
+        }, RESTART_DELAY_MS);
+    });
+
+    for (let i = 0; i < count; i++) {
+        fork(i === 0);
+    }
+    console.log(`Cluster primary ${process.pid} started ${count} workers`);
+};
+
+module.exports = {
+    isClusterPrimary,
+    runsScheduledTasks,
+    startClusterPrimary
+};
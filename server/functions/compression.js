@@ -0,0 +1,68 @@
+// Response compression - negotiated brotli/gzip for JSON and text bodies sent with res.send/res.json
+const zlib = require('zlib');
+
+const DEFAULT_THRESHOLD = 1024;     // bytes; smaller bodies are not worth the CPU or the extra headers
+const COMPRESSIBLE_TYPE = /^(application\/(json|javascript|xml)|text\/|image\/svg\+xml)/i;
+
+// Brotli's default quality (11) is far too slow for dynamic responses; 4 still beats gzip on size
+const BROTLI_OPTIONS = { params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 4 } };
+const GZIP_OPTIONS = { level: 6 };
+
+/**
+ * Middleware that compresses res.send/res.json bodies above a size threshold.
+ * Streamed responses (res.sendFile, pipes) are left untouched.
+ * @param {Object} options - { threshold: number } minimum body size in bytes
+ * @returns {Function} - Express middleware
+ */
+const compressResponses = ({ threshold = DEFAULT_THRESHOLD } = {}) => (req, res, next) => {
+    const send = res.send;
+
+    res.send = function (body) {
+        const isText = typeof body === 'string';
+        if ((!isText && !Buffer.isBuffer(body)) || req.method === 'HEAD' || res.getHeader('Content-Encoding')) {
+            return send.call(this, body);
+        }
+
+        // same default as res.send, so the type check below sees the final Content-Type
+        if (isText && !res.getHeader('Content-Type')) {
+            res.type('html');
+        }
+
+        const contentType = String(res.getHeader('Content-Type') || '');
+        if (!COMPRESSIBLE_TYPE.test(contentType)) {
+            return send.call(this, body);
+        }
+
+        res.vary('Accept-Encoding');
+
+        const buffer = isText ? Buffer.from(body, 'utf8') : body;
+        const encoding = buffer.length >= threshold && req.acceptsEncodings(['br', 'gzip', 'identity']);
+        if (encoding !== 'br' && encoding !== 'gzip') {
+            return send.call(this, body);
+        }
+
+        if (isText && !/charset=/i.test(contentType)) {
+            res.setHeader('Content-Type', `${contentType}; charset=utf-8`);
+        }
+
+        const compress = encoding === 'br'
+            ? (callback) => zlib.brotliCompress(buffer, BROTLI_OPTIONS, callback)
+            : (callback) => zlib.gzip(buffer, GZIP_OPTIONS, callback);
+
+        compress((err, compressed) => {
+            if (err) {
+                console.error('Error compressing response:', err);
+                return send.call(res, body);
+            }
+            res.setHeader('Content-Encoding', encoding);
+            send.call(res, compressed);
+        });
+        return this;
+    };
+
+    next();
+};
+
+module.exports = {
+    compressResponses
+};
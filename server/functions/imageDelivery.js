@@ -0,0 +1,220 @@
+// Image delivery - cached lookups, conditional GET and resized variants for product/category images
+const fsp = require('fs/promises');
+const path = require('path');
+const { onRemoteTableWrite } = require('./tableVersions');
+
+// Widths served for the size= query parameter; anything else gets the original file
+const SIZE_PRESETS = { thumb: 200, small: 400, medium: 800 };
+const VARIANT_DIR = 'variants';
+const IMAGE_CACHE_CONTROL = 'public, max-age=300, must-revalidate';
+
+const RECORD_CACHE_SIZE = 5000;
+const STAT_CACHE_SIZE = 5000;
+const STAT_CACHE_TTL_MS = 10 * 1000;
+
+// sharp is an optionalDependency (installed by default, skipped where its native build is unavailable);
+// without it every size is served from the original file
+let sharp = null;
+try {
+    sharp = require('sharp');
+} catch (err) {
+    console.warn('sharp could not be loaded - image size variants disabled, originals will be served (run npm install)');
+}
+
+const statCache = new Map();    // absolute path -> { stats, checkedAt }, insertion ordered as an LRU
+const inFlightVariants = new Map();
+
+const boundedSet = (cache, key, value, limit) => {
+    cache.delete(key);
+    cache.set(key, value);
+    while (cache.size > limit) {
+        cache.delete(cache.keys().next().value);
+    }
+};
+
+/**
+ * Stat a file through the metadata cache
+ * @param {string} filePath - Absolute path
+ * @returns {Object|null} - { size, mtimeMs, etag, lastModified } or null when the file is missing
+ */
+const statImage = async (filePath) => {
+    const cached = statCache.get(filePath);
+    if (cached && Date.now() - cached.checkedAt < STAT_CACHE_TTL_MS) {
+        return cached.stats;
+    }
+
+    let stats = null;
+    try {
+        const fileStats = await fsp.stat(filePath);
+        if (fileStats.isFile()) {
+            stats = {
+                size: fileStats.size,
+                mtimeMs: fileStats.mtimeMs,
+                etag: `"${fileStats.size.toString(16)}-${Math.floor(fileStats.mtimeMs).toString(16)}"`,
+                lastModified: fileStats.mtime.toUTCString()
+            };
+        }
+    } catch (err) {
+        if (err.code !== 'ENOENT') throw err;
+    }
+
+    boundedSet(statCache, filePath, { stats, checkedAt: Date.now() }, STAT_CACHE_SIZE);
+    return stats;
+};
+
+const variantPath = (folder, file, width, format) => {
+    const base = path.basename(file, path.extname(file));
+    return path.join(folder, VARIANT_DIR, `${base}_${width}.${format}`);
+};
+
+/**
+ * Forget cached metadata for an image and its variants (call after replacing a file in place)
+ * @param {string} folder - Image folder
+ * @param {string} file - File name inside the folder
+ */
+const invalidateImage = (folder, file) => {
+    statCache.delete(path.join(folder, file));
+    for (const width of Object.values(SIZE_PRESETS)) {
+        for (const format of ['webp', 'jpeg']) {
+            statCache.delete(variantPath(folder, file, width, format));
+        }
+    }
+};
+
+// Resize the original into the variant folder; concurrent requests for the same variant share one job
+const buildVariant = (sourcePath, targetPath, width, format) => {
+    if (inFlightVariants.has(targetPath)) return inFlightVariants.get(targetPath);
+
+    const job = (async () => {
+        await fsp.mkdir(path.dirname(targetPath), { recursive: true });
+        const tempPath = `${targetPath}.${process.pid}.tmp`;
+        const pipeline = sharp(sourcePath).rotate().resize({ width, withoutEnlargement: true });
+        await (format === 'webp' ? pipeline.webp({ quality: 80 }) : pipeline.jpeg({ quality: 82, mozjpeg: true }))
+            .toFile(tempPath);
+        await fsp.rename(tempPath, targetPath);
+        statCache.delete(targetPath);
+    })().finally(() => inFlightVariants.delete(targetPath));
+
+    inFlightVariants.set(targetPath, job);
+    return job;
+};
+
+/**
+ * Pre-generate every size variant of an image (both WebP and JPEG)
+ * @param {string} folder - Image folder
+ * @param {string} file - File name inside the folder
+ * @returns {boolean} - false when variants are unavailable (no sharp, SVG, or missing file)
+ */
+const generateImageVariants = async (folder, file) => {
+    const sourcePath = path.join(folder, file);
+    if (!sharp || path.extname(file).toLowerCase() === '.svg') return false;
+    if (!(await statImage(sourcePath))) return false;
+
+    invalidateImage(folder, file);
+    for (const width of Object.values(SIZE_PRESETS)) {
+        await buildVariant(sourcePath, variantPath(folder, file, width, 'webp'), width, 'webp');
+        await buildVariant(sourcePath, variantPath(folder, file, width, 'jpeg'), width, 'jpeg');
+    }
+    return true;
+};
+
+// Pick the file to send for a request: the original, or a (possibly freshly built) variant
+const resolveFile = async (req, folder, file, sourceStats) => {
+    const sourcePath = path.join(folder, file);
+    const width = SIZE_PRESETS[req.query.size];
+    if (!width || !sharp || path.extname(file).toLowerCase() === '.svg') {
+        return { filePath: sourcePath, stats: sourceStats };
+    }
+
+    const format = req.accepts(['image/webp', 'image/jpeg']) === 'image/webp' ? 'webp' : 'jpeg';
+    const targetPath = variantPath(folder, file, width, format);
+    let stats = await statImage(targetPath);
+
+    if (!stats || stats.mtimeMs < sourceStats.mtimeMs) {
+        try {
+            await buildVariant(sourcePath, targetPath, width, format);
+            stats = await statImage(targetPath);
+        } catch (err) {
+            console.error('Error generating image variant:', err);
+            stats = null;
+        }
+    }
+
+    return stats ? { filePath: targetPath, stats } : { filePath: sourcePath, stats: sourceStats };
+};
+
+/**
+ * Build a GET /image/:id handler for a model with an image file column
+ * @param {Object} options - { model, keyField, imageField, folder, label, fallbackToDefault }
+ * @returns {Function} - Express route handler
+ */
+const createImageRoute = ({ model, keyField, imageField, folder, label, fallbackToDefault = false }) => {
+    // id -> image file name, so warm requests skip the database entirely
+    const recordCache = new Map();
+    const clearRecords = () => recordCache.clear();
+    const forgetRecord = (instance) => recordCache.delete(String(instance[keyField]));
+
+    model.addHook('afterUpdate', 'imageDelivery', forgetRecord);
+    model.addHook('afterDestroy', 'imageDelivery', forgetRecord);
+    model.addHook('afterBulkUpdate', 'imageDelivery', clearRecords);
+    model.addHook('afterBulkDestroy', 'imageDelivery', clearRecords);
+    onRemoteTableWrite(table => {
+        if (table === model.name) clearRecords();
+    });
+
+    const lookupFile = async (id) => {
+        if (recordCache.has(id)) return recordCache.get(id);
+        const record = await model.findOne({ where: { [keyField]: id }, attributes: [keyField, imageField], raw: true });
+        const file = record ? (record[imageField] || 'default.jpg') : null;
+        if (record) boundedSet(recordCache, id, file, RECORD_CACHE_SIZE);
+        return file;
+    };
+
+    return async (req, res) => {
+        try {
+            let file = await lookupFile(String(req.params.id));
+            if (file === null) {
+                return res.status(401).json({ status: 401, message: `Invalid ${label} id` });
+            }
+
+            let stats = await statImage(path.join(folder, file));
+            if (!stats && fallbackToDefault && file !== 'default.jpg') {
+                file = 'default.jpg';
+                stats = await statImage(path.join(folder, file));
+            }
+            if (!stats) {
+                return res.status(402).json({ status: 402, message: 'Image does not exist in server. Please upload new image.' });
+            }
+
+            const selected = await resolveFile(req, folder, file, stats);
+
+            res.set({
+                'ETag': selected.stats.etag,
+                'Last-Modified': selected.stats.lastModified,
+                'Cache-Control': IMAGE_CACHE_CONTROL,
+                'Vary': 'Accept'
+            });
+            if (req.fresh) {
+                return res.status(304).end();
+            }
+
+            // sendFile streams with range support and sets Content-Type from the extension
+            res.sendFile(selected.filePath, (err) => {
+                if (!err || res.headersSent) return;
+                statCache.delete(selected.filePath);
+                console.error(`Error sending ${label} image: `, err);
+                res.status(403).json({ status: 403, message: `Error fetching ${label} image` });
+            });
+        } catch (err) {
+            console.error(`Error fetching ${label} image: `, err);
+            res.status(403).json({ status: 403, message: `Error fetching ${label} image` });
+        }
+    };
+};
+
+module.exports = {
+    createImageRoute,
+    generateImageVariants,
+    invalidateImage,
+    SIZE_PRESETS
+};
@@ -0,0 +1,210 @@
+// Image processing queue - product image ingestion runs in the background with bounded concurrency
+const fsp = require('fs/promises');
+const path = require('path');
+const cluster = require('cluster');
+const { PRODUCTS } = require('../models');
+const { generateProductImage } = require('./imageService');
+const { generateImageVariants, invalidateImage } = require('./imageDelivery');
+
+const PRODUCT_IMAGE_FOLDER = path.join(__dirname, '..', 'images', 'products');
+const CONCURRENCY = Math.max(parseInt(process.env.IMAGE_QUEUE_CONCURRENCY) || 2, 1);
+const MAX_SOURCE_WIDTH = 1600;
+const STATUS_TTL_MS = 60 * 60 * 1000;
+
+// sharp is an optionalDependency (see imageDelivery.js): without it uploads are stored as received
+let sharp = null;
+try {
+    sharp = require('sharp');
+} catch (err) {
+    sharp = null;
+}
+
+const waiting = [];
+const jobStatus = new Map();    // ProductID -> { status, error, updatedAt }
+let running = 0;
+
+const recordStatus = (productId, entry) => {
+    if (entry) jobStatus.set(productId, entry);
+    else jobStatus.delete(productId);
+
+    // finished entries are only kept long enough for the seller's page to pick them up
+    for (const [id, { status, updatedAt }] of jobStatus) {
+        if (status !== 'pending' && status !== 'processing' && Date.now() - updatedAt > STATUS_TTL_MS) {
+            jobStatus.delete(id);
+        }
+    }
+};
+
+// Jobs run on the worker that accepted the upload, but the status request can reach any worker:
+// every change is relayed to the other workers by the cluster primary
+const shareStatus = (productId, entry) => {
+    recordStatus(productId, entry);
+    if (cluster.isWorker && process.connected) {
+        process.send({ type: 'imageQueue:status', broadcast: true, productId, entry });
+    }
+};
+
+if (cluster.isWorker) {
+    process.on('message', (message) => {
+        if (message && message.type === 'imageQueue:status') recordStatus(message.productId, message.entry);
+    });
+}
+
+const setStatus = (productId, status, error = null) => {
+    shareStatus(productId, { status, error, updatedAt: Date.now() });
+};
+
+// Files that belong to a single product and can be removed when it moves to a new image.
+// Unsplash photos (unsplash_<photoId>.jpg, see imageService.js) are stored once and shared between products.
+const isOwnedImage = (file) => file && file !== 'default.jpg' && !file.startsWith('unsplash_');
+
+const removeQuietly = async (filePath) => {
+    try {
+        await fsp.unlink(filePath);
+    } catch (err) {
+        if (err.code !== 'ENOENT') console.error('Error removing image file:', err);
+    }
+};
+
+// Normalize an uploaded file (orientation, size, format) and move it into place under its final name
+const storeUpload = async (productId, tempFile, extension) => {
+    const tempPath = path.join(PRODUCT_IMAGE_FOLDER, tempFile);
+    const normalize = sharp && extension !== '.svg';
+    const finalName = normalize ? `${productId}.jpg` : `${productId}${extension}`;
+    const finalPath = path.join(PRODUCT_IMAGE_FOLDER, finalName);
+
+    if (normalize) {
+        const stagedPath = `${finalPath}.${process.pid}.tmp`;
+        await sharp(tempPath)
+            .rotate()
+            .resize({ width: MAX_SOURCE_WIDTH, withoutEnlargement: true })
+            .jpeg({ quality: 85, mozjpeg: true })
+            .toFile(stagedPath);
+        await fsp.rename(stagedPath, finalPath);
+        await removeQuietly(tempPath);
+        return finalName;
+    }
+
+    // rename within the folder is atomic - readers see the old file or the new one, never a partial write
+    await fsp.rename(tempPath, finalPath);
+    return finalName;
+};
+
+const runJob = async (job) => {
+    const { productId } = job;
+    setStatus(productId, 'processing');
+
+    try {
+        let fileName;
+        if (job.type === 'upload') {
+            fileName = await storeUpload(productId, job.tempFile, job.extension);
+        } else {
+            const imageResult = await generateProductImage(job.productName, job.categoryName);
+            if (!imageResult.success) {
+                setStatus(productId, 'failed', imageResult.error);
+                return;
+            }
+            fileName = imageResult.imagePath;
+        }
+
+        invalidateImage(PRODUCT_IMAGE_FOLDER, fileName);
+        try {
+            await generateImageVariants(PRODUCT_IMAGE_FOLDER, fileName);
+        } catch (err) {
+            // variants are rebuilt on demand, the original is enough to finish the job
+            console.error(`Error generating variants for product ${productId}:`, err);
+        }
+
+        const product = await PRODUCTS.findOne({ where: { ProductID: productId } });
+        if (!product) {
+            // product removed while the job was queued
+            if (isOwnedImage(fileName)) await removeQuietly(path.join(PRODUCT_IMAGE_FOLDER, fileName));
+            shareStatus(productId, null);
+            return;
+        }
+
+        const previousImage = product.ProductImage;
+        product.ProductImage = fileName;
+        await product.save();
+
+        if (previousImage !== fileName && isOwnedImage(previousImage)) {
+            await removeQuietly(path.join(PRODUCT_IMAGE_FOLDER, previousImage));
+        }
+
+        setStatus(productId, 'done');
+        console.log(`Image ready for product ${productId}: ${fileName}`);
+    } catch (err) {
+        console.error(`Error processing image for product ${productId}:`, err);
+        if (job.type === 'upload') await removeQuietly(path.join(PRODUCT_IMAGE_FOLDER, job.tempFile));
+        setStatus(productId, 'failed', err.message);
+    }
+};
+
+const drain = () => {
+    while (running < CONCURRENCY && waiting.length > 0) {
+        const job = waiting.shift();
+        running++;
+        runJob(job).finally(() => {
+            running--;
+            drain();
+        });
+    }
+};
+
+const enqueue = (job) => {
+    // a newer job for the same product supersedes one that has not started yet
+    const queuedIndex = waiting.findIndex(queued => queued.productId === job.productId);
+    if (queuedIndex !== -1) {
+        const [superseded] = waiting.splice(queuedIndex, 1);
+        if (superseded.type === 'upload') removeQuietly(path.join(PRODUCT_IMAGE_FOLDER, superseded.tempFile));
+    }
+
+    waiting.push(job);
+    setStatus(job.productId, 'pending');
+    setImmediate(drain);
+    return 'pending';
+};
+
+/**
+ * Queue an uploaded file (already saved in images/products by multer) as a product's image
+ * @param {number} productId - Product to update
+ * @param {Object} file - Multer file ({ filename, originalname })
+ * @returns {string} - Job status ('pending')
+ */
+const enqueueUploadedImage = (productId, file) => enqueue({
+    type: 'upload',
+    productId,
+    tempFile: file.filename,
+    extension: path.extname(file.originalname).toLowerCase()
+});
+
+/**
+ * Queue an Unsplash image search and download for a product
+ * @param {number} productId - Product to update
+ * @param {string} productName - Product name used for the search
+ * @param {string} categoryName - Category name used for the search
+ * @returns {string} - Job status ('pending')
+ */
+const enqueueAutoImage = (productId, productName, categoryName) => enqueue({
+    type: 'auto',
+    productId,
+    productName,
+    categoryName
+});
+
+/**
+ * Image processing state of a product
+ * @param {number} productId - Product ID
+ * @returns {Object|null} - { status: 'pending'|'processing'|'done'|'failed', error } or null if no recent job
+ */
+const getImageStatus = (productId) => {
+    const entry = jobStatus.get(productId);
+    return entry ? { status: entry.status, error: entry.error } : null;
+};
+
+module.exports = {
+    enqueueUploadedImage,
+    enqueueAutoImage,
+    getImageStatus,
+    PRODUCT_IMAGE_FOLDER
+};
@@ -2,6 +2,7 @@
 const { createApi } = require('unsplash-js');
 const axios = require('axios');
 const fs = require('fs');
+const fsp = require('fs/promises');
 const path = require('path');
 
 // Initialize Unsplash API
@@ -9,6 +10,168 @@ const unsplash = createApi({
   accessKey: process.env.UNSPLASH_ACCESS_KEY,
 });
 
+const PRODUCT_IMAGES_DIR = path.join(__dirname, '..', 'images', 'products');
+
+// Search results are cached on disk by normalized query so repeated searches do not use API quota
+const SEARCH_CACHE_FILE = path.join(__dirname, '..', 'cache', 'unsplashSearchCache.json');
+const SEARCH_CACHE_TTL_MS = (parseInt(process.env.UNSPLASH_CACHE_TTL_HOURS) || 72) * 60 * 60 * 1000;
+const EMPTY_RESULT_TTL_MS = 60 * 60 * 1000;
+const SEARCH_CACHE_MAX_ENTRIES = 1000;
+const SEARCH_PAGE_SIZE = 10;        // every search fetches a full page so smaller requests are served from it
+const SEARCH_CACHE_SAVE_DELAY_MS = 2000;
+
+let searchCache = null;             // normalized query -> { photos, expiresAt }, insertion ordered as an LRU
+let saveTimer = null;
+const inFlightSearches = new Map();
+const inFlightDownloads = new Map();
+
+const loadSearchCache = () => {
+    searchCache = new Map();
+    try {
+        const saved = JSON.parse(fs.readFileSync(SEARCH_CACHE_FILE, 'utf8'));
+        const now = Date.now();
+        for (const [key, entry] of saved.entries || []) {
+            if (entry.expiresAt > now) searchCache.set(key, entry);
+        }
+    } catch (error) {
+        if (error.code !== 'ENOENT') console.error('Error loading Unsplash search cache:', error);
+    }
+};
+
+const saveSearchCache = () => {
+    if (saveTimer) return;
+    saveTimer = setTimeout(async () => {
+        saveTimer = null;
+        try {
+            await fsp.mkdir(path.dirname(SEARCH_CACHE_FILE), { recursive: true });
+            const tempFile = `${SEARCH_CACHE_FILE}.${process.pid}.tmp`;
+            await fsp.writeFile(tempFile, JSON.stringify({ entries: [...searchCache] }));
+            await fsp.rename(tempFile, SEARCH_CACHE_FILE);
+        } catch (error) {
+            console.error('Error saving Unsplash search cache:', error);
+        }
+    }, SEARCH_CACHE_SAVE_DELAY_MS);
+    saveTimer.unref();
+};
+
+// "Fresh Red Apples Fruits fresh agricultural food" and "fresh red apples fruits agricultural food" share an entry.
+// Letters and digits of any script count as words, so Malay or Chinese names keep keys of their own.
+const normalizeQuery = (query) => {
+    const words = String(query || '').toLowerCase().replace(/[^\p{L}\p{N}]+/gu, ' ').trim().split(' ');
+    return [...new Set(words.filter(Boolean))].join(' ');
+};
+
+// Only the fields used by this service are kept, in the same shape as the Unsplash response
+const compactPhoto = (photo) => ({
+    id: photo.id,
+    urls: { small: photo.urls.small, regular: photo.urls.regular },
+    description: photo.description,
+    alt_description: photo.alt_description,
+    user: { name: photo.user.name, links: { html: photo.user.links.html } },
+    links: { download_location: photo.links.download_location }
+});
+
+/**
+ * Search Unsplash through the persistent query cache
+ * @param {string} query - Search query
+ * @returns {Object} - {photos: Array, errors: Array|undefined}
+ */
+const searchPhotos = async (query) => {
+    if (!searchCache) loadSearchCache();
+
+    const key = normalizeQuery(query);
+    const cached = searchCache.get(key);
+    if (cached && cached.expiresAt > Date.now()) {
+        searchCache.delete(key);
+        searchCache.set(key, cached);
+        return { photos: cached.photos };
+    }
+
+    if (inFlightSearches.has(key)) return inFlightSearches.get(key);
+
+    const search = (async () => {
+        const result = await unsplash.search.getPhotos({
+            query: key,
+            page: 1,
+            perPage: SEARCH_PAGE_SIZE,
+            orientation: 'landscape', // Better for product display
+        });
+
+        // errors are not cached so the next call retries
+        if (result.errors) {
+            return { photos: [], errors: result.errors };
+        }
+
+        const photos = (result.response?.results || []).map(compactPhoto);
+        searchCache.delete(key);
+        searchCache.set(key, {
+            photos,
+            expiresAt: Date.now() + (photos.length > 0 ? SEARCH_CACHE_TTL_MS : EMPTY_RESULT_TTL_MS)
+        });
+        while (searchCache.size > SEARCH_CACHE_MAX_ENTRIES) {
+            searchCache.delete(searchCache.keys().next().value);
+        }
+        saveSearchCache();
+
+        return { photos };
+    })().finally(() => inFlightSearches.delete(key));
+
+    inFlightSearches.set(key, search);
+    return search;
+};
+
+/**
+ * Download an Unsplash photo once into images/products as unsplash_<photoId>.jpg
+ * The file is shared by every product that uses the photo.
+ * @param {Object} photo - Photo from searchPhotos
+ * @returns {string|null} - Filename of the stored image or null if failed
+ */
+const downloadPhoto = async (photo) => {
+    const filename = `unsplash_${String(photo.id).replace(/[^a-zA-Z0-9_-]/g, '')}.jpg`;
+    const filepath = path.join(PRODUCT_IMAGES_DIR, filename);
+
+    try {
+        await fsp.access(filepath);
+        return filename;
+    } catch (error) {
+        // not stored yet
+    }
+
+    if (inFlightDownloads.has(filename)) return inFlightDownloads.get(filename);
+
+    const download = (async () => {
+        const tempPath = `${filepath}.${process.pid}.tmp`;
+        try {
+            await fsp.mkdir(PRODUCT_IMAGES_DIR, { recursive: true });
+
+            const response = await axios({
+                method: 'GET',
+                url: photo.urls.regular,
+                responseType: 'stream'
+            });
+
+            await new Promise((resolve, reject) => {
+                const writer = fs.createWriteStream(tempPath);
+                response.data.on('error', reject);
+                writer.on('finish', resolve);
+                writer.on('error', reject);
+                response.data.pipe(writer);
+            });
+            await fsp.rename(tempPath, filepath);
+
+            console.log(`Image saved successfully: ${filename}`);
+            return filename;
+        } catch (error) {
+            console.error('Error downloading image:', error);
+            fsp.unlink(tempPath).catch(() => {});
+            return null;
+        }
+    })().finally(() => inFlightDownloads.delete(filename));
+
+    inFlightDownloads.set(filename, download);
+    return download;
+};
+
 /**
  * Generate image for product using Unsplash API
  * @param {string} productName - Name of the product to search for
@@ -22,13 +185,8 @@ const generateProductImage = async (productName, category = '') => {
         
         console.log(`Searching Unsplash for: ${searchQuery}`);
 
-        // Search for images on Unsplash
-        const result = await unsplash.search.getPhotos({
-            query: searchQuery,
-            page: 1,
-            perPage: 10,
-            orientation: 'landscape', // Better for product display
-        });
+        // Search for images on Unsplash (served from the query cache when possible)
+        const result = await searchPhotos(searchQuery);
 
         if (result.errors) {
             console.error('Unsplash API errors:', result.errors);
@@ -38,34 +196,28 @@ const generateProductImage = async (productName, category = '') => {
             };
         }
 
-        if (!result.response?.results || result.response.results.length === 0) {
+        let photos = result.photos;
+        if (photos.length === 0) {
             console.log('No images found, using fallback search');
             // Fallback search with just the category
-            const fallbackResult = await unsplash.search.getPhotos({
-                query: category || 'fresh vegetables fruits',
-                page: 1,
-                perPage: 5,
-                orientation: 'landscape',
-            });
-            
-            if (!fallbackResult.response?.results || fallbackResult.response.results.length === 0) {
+            const fallbackResult = await searchPhotos(category || 'fresh vegetables fruits');
+            photos = fallbackResult.photos.slice(0, 5);
+
+            if (photos.length === 0) {
                 return {
                     success: false,
                     error: 'No suitable images found for this product'
                 };
             }
-            
-            result.response.results = fallbackResult.response.results;
         }
 
         // Select the first image (usually the most relevant)
-        const selectedImage = result.response.results[0];
-        const imageUrl = selectedImage.urls.regular; // Good quality for products
+        const selectedImage = photos[0];
         
         console.log(`Selected image from: ${selectedImage.user.name}`);
 
-        // Download and save the image
-        const imagePath = await downloadImage(imageUrl, productName);
+        // Download and save the image (reused if this photo was downloaded before)
+        const imagePath = await downloadPhoto(selectedImage);
         
         if (imagePath) {
             return {
@@ -93,55 +245,6 @@ const generateProductImage = async (productName, category = '') => {
     }
 };
 
-/**
- * Download image from URL and save to local storage
- * @param {string} imageUrl - URL of the image to download
- * @param {string} productName - Name of the product (for filename)
- * @returns {string|null} - Filename of saved image or null if failed
- */
-const downloadImage = async (imageUrl, productName) => {
-    try {
-        // Create filename from product name
-        const sanitizedProductName = productName.replace(/[^a-zA-Z0-9]/g, '_').toLowerCase();
-        const timestamp = Date.now();
-        const filename = `auto_${sanitizedProductName}_${timestamp}.jpg`;
-        
-        // Ensure images directory exists
-        const imagesDir = path.join(__dirname, '..', 'images', 'products');
-        if (!fs.existsSync(imagesDir)) {
-            fs.mkdirSync(imagesDir, { recursive: true });
-        }
-        
-        const filepath = path.join(imagesDir, filename);
-
-        // Download image
-        const response = await axios({
-            method: 'GET',
-            url: imageUrl,
-            responseType: 'stream'
-        });
-
-        // Save image to file
-        const writer = fs.createWriteStream(filepath);
-        response.data.pipe(writer);
-
-        return new Promise((resolve, reject) => {
-            writer.on('finish', () => {
-                console.log(`Image saved successfully: ${filename}`);
-                resolve(filename);
-            });
-            writer.on('error', (error) => {
-                console.error('Error saving image:', error);
-                reject(null);
-            });
-        });
-
-    } catch (error) {
-        console.error('Error downloading image:', error);
-        return null;
-    }
-};
-
 /**
  * Get multiple image options for a product
  * @param {string} productName - Name of the product
@@ -153,18 +256,13 @@ const getImageOptions = async (productName, category = '', count = 5) => {
     try {
         const searchQuery = `${productName} ${category} fresh agricultural food`.trim();
         
-        const result = await unsplash.search.getPhotos({
-            query: searchQuery,
-            page: 1,
-            perPage: Math.min(count, 10),
-            orientation: 'landscape',
-        });
+        const result = await searchPhotos(searchQuery);
 
-        if (result.errors || !result.response?.results) {
+        if (result.errors) {
             return [];
         }
 
-        return result.response.results.map(photo => ({
+        return result.photos.slice(0, Math.min(count, 10)).map(photo => ({
             id: photo.id,
             url: photo.urls.small,
             regularUrl: photo.urls.regular,
@@ -182,5 +280,6 @@ const getImageOptions = async (productName, category = '', count = 5) => {
 module.exports = {
     generateProductImage,
     getImageOptions,
-    downloadImage
+    downloadPhoto,
+    searchPhotos
 };
\ No newline at end of file
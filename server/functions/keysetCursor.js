@@ -0,0 +1,31 @@
+// Keyset cursors - the sort key of the last row of a page, opaque to the client
+// A page then continues with WHERE (key) > / < (cursor), which stays an index range scan however deep it goes.
+
+/**
+ * Encode the sort key of the last row of a page
+ * @param {Array} values - Sort key values, in ORDER BY order
+ * @returns {string}
+ */
+const encodeCursor = (values) => Buffer.from(JSON.stringify(values)).toString('base64url');
+
+/**
+ * Decode a cursor made by encodeCursor
+ * @param {string} cursor - Cursor from the query string
+ * @param {Array} types - Expected typeof of each value, e.g. ['string', 'number']
+ * @returns {Array|null} - The values, or null when the cursor is malformed
+ */
+const decodeCursor = (cursor, types) => {
+    try {
+        const values = JSON.parse(Buffer.from(String(cursor), 'base64url').toString('utf8'));
+        return Array.isArray(values) && values.length === types.length && values.every((value, i) => typeof value === types[i])
+            ? values
+            : null;
+    } catch (err) {
+        return null;
+    }
+};
+
+module.exports = {
+    encodeCursor,
+    decodeCursor
+};
@@ -0,0 +1,362 @@
+// Metrics - Prometheus text exposition for requests, the event loop, memory, the database and cron jobs
+// In cluster mode every worker keeps its own registry; /metrics asks the primary to merge all of them.
+const cluster = require('cluster');
+const { monitorEventLoopDelay } = require('perf_hooks');
+const { sequelize } = require('../models');
+const { getWriterQueueStats } = require('./sqliteProfile');
+
+const METRICS_TOKEN = process.env.METRICS_TOKEN;
+const REQUEST_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];   // seconds
+const CRON_BUCKETS = [0.1, 0.5, 1, 5, 15, 60, 300];                                  // seconds
+const COLLECT_TIMEOUT_MS = 2000;
+
+const registry = new Map();     // name -> { name, type, help, aggregate, buckets, samples: Map(labelKey -> sample) }
+const collectors = [];          // refresh the sampled gauges before each snapshot
+
+const labelKey = (labels) => JSON.stringify(Object.keys(labels).sort().map(key => [key, labels[key]]));
+
+// aggregate: how workers' samples are merged - 'sum', 'max', or 'worker' (kept apart under a worker label)
+const defineMetric = (name, type, help, { aggregate = 'sum', buckets } = {}) => {
+    if (!registry.has(name)) {
+        registry.set(name, { name, type, help, aggregate, buckets, samples: new Map() });
+    }
+    return registry.get(name);
+};
+
+const sampleFor = (metric, labels, init) => {
+    const key = labelKey(labels);
+    let sample = metric.samples.get(key);
+    if (!sample) {
+        sample = { labels, ...init() };
+        metric.samples.set(key, sample);
+    }
+    return sample;
+};
+
+/**
+ * Define (or get) a counter
+ * @param {string} name - Metric name
+ * @param {string} help - Description
+ * @returns {Object} - { inc(labels, value) }
+ */
+const counter = (name, help) => {
+    const metric = defineMetric(name, 'counter', help);
+    return {
+        inc: (labels = {}, value = 1) => {
+            sampleFor(metric, labels, () => ({ value: 0 })).value += value;
+        }
+    };
+};
+
+/**
+ * Define (or get) a gauge
+ * @param {string} name - Metric name
+ * @param {string} help - Description
+ * @param {Object} options - { aggregate: 'sum' | 'max' | 'worker', type: exposed type, 'gauge' by default }
+ * @returns {Object} - { set(labels, value), inc(labels), dec(labels) }
+ */
+const gauge = (name, help, { aggregate = 'sum', type = 'gauge' } = {}) => {
+    const metric = defineMetric(name, type, help, { aggregate });
+    const sample = (labels) => sampleFor(metric, labels, () => ({ value: 0 }));
+    return {
+        set: (labels = {}, value) => { sample(labels).value = value; },
+        inc: (labels = {}) => { sample(labels).value++; },
+        dec: (labels = {}) => { sample(labels).value--; }
+    };
+};
+
+/**
+ * Define (or get) a histogram
+ * @param {string} name - Metric name
+ * @param {string} help - Description
+ * @param {Array} buckets - Upper bounds, ascending
+ * @returns {Object} - { observe(labels, value) }
+ */
+const histogram = (name, help, buckets) => {
+    const metric = defineMetric(name, 'histogram', help, { buckets });
+    return {
+        observe: (labels = {}, value) => {
+            const sample = sampleFor(metric, labels, () => ({ counts: new Array(buckets.length).fill(0), sum: 0, count: 0 }));
+            const bucket = buckets.findIndex(bound => value <= bound);
+            if (bucket !== -1) sample.counts[bucket]++;
+            sample.sum += value;
+            sample.count++;
+        }
+    };
+};
+
+//********************************************************************************************************************
+// PROCESS, DATABASE AND REQUEST METRICS
+
+const requestsTotal = counter('http_requests_total', 'HTTP requests by route and status code');
+const requestDuration = histogram('http_request_duration_seconds', 'HTTP request latency by route', REQUEST_BUCKETS);
+const requestsInFlight = gauge('http_requests_in_flight', 'HTTP requests being handled');
+
+const eventLoopDelay = monitorEventLoopDelay({ resolution: 20 });
+eventLoopDelay.enable();
+const eventLoopGauge = gauge('nodejs_eventloop_delay_seconds', 'Event loop delay since the last scrape', { aggregate: 'worker' });
+const heapUsed = gauge('nodejs_heap_used_bytes', 'V8 heap in use', { aggregate: 'worker' });
+const heapTotal = gauge('nodejs_heap_total_bytes', 'V8 heap allocated', { aggregate: 'worker' });
+const residentMemory = gauge('process_resident_memory_bytes', 'Resident set size', { aggregate: 'worker' });
+
+collectors.push(() => {
+    for (const quantile of [0.5, 0.9, 0.99]) {
+        eventLoopGauge.set({ quantile: String(quantile) }, eventLoopDelay.percentile(quantile * 100) / 1e9);
+    }
+    eventLoopGauge.set({ quantile: '1' }, eventLoopDelay.max / 1e9);
+    eventLoopDelay.reset();
+
+    const memory = process.memoryUsage();
+    heapUsed.set({}, memory.heapUsed);
+    heapTotal.set({}, memory.heapTotal);
+    residentMemory.set({}, memory.rss);
+});
+
+// SQLite has no connection pool: report the open connections and the writer queue instead
+const dbConnections = gauge('db_connections_open', 'Open database connections', { aggregate: 'worker' });
+const writerHeld = gauge('db_writer_queue_held', 'Whether the SQLite writer lock is held (1/0)', { aggregate: 'worker' });
+const writerWaiting = gauge('db_writer_queue_waiting', 'Writes waiting for the SQLite writer lock', { aggregate: 'worker' });
+const writerTimeouts = gauge('db_writer_queue_timeouts_total', 'Writes that gave up waiting for the writer lock', { aggregate: 'sum', type: 'counter' });
+
+collectors.push(() => {
+    const connections = sequelize.connectionManager && sequelize.connectionManager.connections;
+    if (connections) dbConnections.set({}, Object.keys(connections).length);
+
+    const writer = getWriterQueueStats();
+    if (writer) {
+        writerHeld.set({}, writer.held ? 1 : 0);
+        writerWaiting.set({}, writer.waiting);
+        writerTimeouts.set({}, writer.timeouts);
+    }
+});
+
+const cronDuration = histogram('cron_job_duration_seconds', 'Scheduled task run time', CRON_BUCKETS);
+const cronRuns = counter('cron_job_runs_total', 'Scheduled task runs by outcome');
+const cronLastSuccess = gauge('cron_job_last_success_timestamp_seconds', 'Last successful run of a scheduled task', { aggregate: 'max' });
+
+/**
+ * Run a scheduled task and record its duration and outcome
+ * @param {string} job - Job name (metric label)
+ * @param {Function} task - Async task
+ */
+const timeCronJob = async (job, task) => {
+    const start = process.hrtime.bigint();
+    try {
+        const result = await task();
+        cronRuns.inc({ job, outcome: 'success' });
+        cronLastSuccess.set({ job }, Math.floor(Date.now() / 1000));
+        return result;
+    } catch (err) {
+        cronRuns.inc({ job, outcome: 'error' });
+        throw err;
+    } finally {
+        cronDuration.observe({ job }, Number(process.hrtime.bigint() - start) / 1e9);
+    }
+};
+
+/**
+ * Middleware counting requests per route (the matched route pattern, never the raw URL) and status code
+ * @returns {Function} - Express middleware
+ */
+const metricsMiddleware = () => (req, res, next) => {
+    const start = process.hrtime.bigint();
+    requestsInFlight.inc();
+
+    let recorded = false;
+    const record = () => {
+        if (recorded) return;
+        recorded = true;
+        requestsInFlight.dec();
+
+        const route = req.route ? `${req.baseUrl}${req.route.path}` : 'unmatched';
+        const status = res.writableFinished ? String(res.statusCode) : '499';    // client closed the connection
+        requestsTotal.inc({ method: req.method, route, status });
+        requestDuration.observe({ method: req.method, route }, Number(process.hrtime.bigint() - start) / 1e9);
+    };
+    res.on('finish', record);
+    res.on('close', record);
+    next();
+};
+
+//********************************************************************************************************************
+// SNAPSHOTS, MERGING AND RENDERING
+
+const processName = () => (cluster.isWorker ? String(cluster.worker.id) : 'primary');
+
+const snapshot = () => {
+    for (const collect of collectors) {
+        try {
+            collect();
+        } catch (err) {
+            console.error('Error collecting metrics:', err);
+        }
+    }
+    return {
+        worker: processName(),
+        metrics: [...registry.values()].map(({ name, type, help, aggregate, buckets, samples }) => ({
+            name, type, help, aggregate, buckets, samples: [...samples.values()]
+        }))
+    };
+};
+
+const merge = (snapshots, labelWorkers) => {
+    const merged = new Map();
+    for (const { worker, metrics } of snapshots) {
+        for (const metric of metrics) {
+            if (!merged.has(metric.name)) merged.set(metric.name, { ...metric, samples: new Map() });
+            const target = merged.get(metric.name);
+
+            for (const sample of metric.samples) {
+                const labels = metric.aggregate === 'worker' && labelWorkers ? { ...sample.labels, worker } : sample.labels;
+                const key = labelKey(labels);
+                const existing = target.samples.get(key);
+                if (!existing) {
+                    target.samples.set(key, metric.type === 'histogram'
+                        ? { labels, counts: [...sample.counts], sum: sample.sum, count: sample.count }
+                        : { labels, value: sample.value });
+                } else if (metric.type === 'histogram') {
+                    sample.counts.forEach((count, i) => { existing.counts[i] += count; });
+                    existing.sum += sample.sum;
+                    existing.count += sample.count;
+                } else if (metric.aggregate === 'max') {
+                    existing.value = Math.max(existing.value, sample.value);
+                } else {
+                    existing.value += sample.value;
+                }
+            }
+        }
+    }
+    return merged;
+};
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+
+const formatLabels = (labels) => {
+    const entries = Object.entries(labels);
+    return entries.length === 0 ? '' : `{${entries.map(([key, value]) => `${key}="${escapeLabel(value)}"`).join(',')}}`;
+};
+
+const render = (merged) => {
+    const lines = [];
+    for (const metric of merged.values()) {
+        lines.push(`# HELP ${metric.name} ${metric.help}`);
+        lines.push(`# TYPE ${metric.name} ${metric.type}`);
+        for (const sample of metric.samples.values()) {
+            if (metric.type !== 'histogram') {
+                lines.push(`${metric.name}${formatLabels(sample.labels)} ${sample.value}`);
+                continue;
+            }
+            let cumulative = 0;
+            metric.buckets.forEach((bound, i) => {
+                cumulative += sample.counts[i];
+                lines.push(`${metric.name}_bucket${formatLabels({ ...sample.labels, le: String(bound) })} ${cumulative}`);
+            });
+            lines.push(`${metric.name}_bucket${formatLabels({ ...sample.labels, le: '+Inf' })} ${sample.count}`);
+            lines.push(`${metric.name}_sum${formatLabels(sample.labels)} ${sample.sum}`);
+            lines.push(`${metric.name}_count${formatLabels(sample.labels)} ${sample.count}`);
+        }
+    }
+    return lines.join('\n') + '\n';
+};
+
+//********************************************************************************************************************
+// CLUSTER AGGREGATION (worker -> primary -> every worker -> primary -> worker)
+
+const pendingResults = new Map();       // worker side: collection id -> resolve
+const primaryCollections = new Map();   // primary side: collection id -> { requester, requestId, snapshots, waiting, timer }
+let nextCollectionId = 0;
+
+const collectFromPrimary = () => new Promise((resolve) => {
+    const id = ++nextCollectionId;
+    const timer = setTimeout(() => {
+        pendingResults.delete(id);
+        resolve([snapshot()]);      // primary unavailable: report this worker alone
+    }, COLLECT_TIMEOUT_MS);
+    pendingResults.set(id, (snapshots) => {
+        clearTimeout(timer);
+        resolve(snapshots);
+    });
+    process.send({ type: 'metrics:collect', id });
+});
+
+if (cluster.isWorker) {
+    process.on('message', (message) => {
+        if (!message || typeof message !== 'object') return;
+        if (message.type === 'metrics:snapshot-request') {
+            process.send({ type: 'metrics:snapshot', id: message.id, snapshot: snapshot() });
+        } else if (message.type === 'metrics:result') {
+            const resolve = pendingResults.get(message.id);
+            if (resolve) {
+                pendingResults.delete(message.id);
+                resolve(message.snapshots);
+            }
+        }
+    });
+}
+
+const finishCollection = (id) => {
+    const collection = primaryCollections.get(id);
+    if (!collection) return;
+    primaryCollections.delete(id);
+    clearTimeout(collection.timer);
+    if (collection.requester.isConnected()) {
+        collection.requester.send({ type: 'metrics:result', id: collection.requestId, snapshots: collection.snapshots });
+    }
+};
+
+/**
+ * Primary side of the metrics protocol; call for every message received from a worker
+ * @param {Object} worker - cluster Worker that sent the message
+ * @param {Object} message - IPC message
+ */
+const handlePrimaryMessage = (worker, message) => {
+    if (!message || typeof message !== 'object') return;
+
+    if (message.type === 'metrics:collect') {
+        const id = `${worker.id}:${message.id}`;
+        const workers = Object.values(cluster.workers).filter(candidate => candidate && candidate.isConnected());
+        primaryCollections.set(id, {
+            requester: worker,
+            requestId: message.id,
+            snapshots: [snapshot()],
+            waiting: new Set(workers.map(candidate => candidate.id)),
+            timer: setTimeout(() => finishCollection(id), COLLECT_TIMEOUT_MS - 500)   // answer before the worker gives up
+        });
+        workers.forEach(candidate => candidate.send({ type: 'metrics:snapshot-request', id }));
+    } else if (message.type === 'metrics:snapshot') {
+        const collection = primaryCollections.get(message.id);
+        if (!collection) return;
+        collection.snapshots.push(message.snapshot);
+        collection.waiting.delete(worker.id);
+        if (collection.waiting.size === 0) finishCollection(message.id);
+    }
+};
+
+/**
+ * GET /metrics - Prometheus text format. Requires `Authorization: Bearer <METRICS_TOKEN>` when METRICS_TOKEN is set.
+ */
+const metricsHandler = async (req, res) => {
+    if (METRICS_TOKEN && req.headers['authorization'] !== `Bearer ${METRICS_TOKEN}`) {
+        return res.status(401).json({ status: 401, message: 'Unauthorized' });
+    }
+
+    try {
+        const snapshots = cluster.isWorker ? await collectFromPrimary() : [snapshot()];
+        res.set('Cache-Control', 'no-store');
+        res.type('text/plain; version=0.0.4; charset=utf-8');
+        res.send(render(merge(snapshots, cluster.isWorker)));
+    } catch (err) {
+        console.error('Error rendering metrics:', err);
+        res.status(500).json({ status: 500, message: 'Error collecting metrics' });
+    }
+};
+
+module.exports = {
+    counter,
+    gauge,
+    histogram,
+    timeCronJob,
+    metricsMiddleware,
+    metricsHandler,
+    handlePrimaryMessage
+};
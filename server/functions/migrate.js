@@ -0,0 +1,117 @@
+// Migrations - versioned schema changes in server/migrations, recorded in SequelizeMeta
+// Same file format and meta table as sequelize-cli, so `npx sequelize-cli db:migrate` and this runner agree.
+const fs = require('fs');
+const path = require('path');
+const Sequelize = require('sequelize');
+
+const MIGRATIONS_DIR = path.join(__dirname, '..', 'migrations');
+const META_TABLE = 'SequelizeMeta';
+
+const ensureMetaTable = async (queryInterface) => {
+    const tables = await queryInterface.showAllTables();
+    if (tables.includes(META_TABLE)) return;
+    await queryInterface.createTable(META_TABLE, {
+        name: {
+            type: Sequelize.STRING,
+            allowNull: false,
+            unique: true,
+            primaryKey: true
+        }
+    });
+};
+
+const listMigrations = () => fs.readdirSync(MIGRATIONS_DIR)
+    .filter(file => file.indexOf('.') !== 0 && file.slice(-3) === '.js')
+    .sort();
+
+/**
+ * Run every migration not yet recorded in SequelizeMeta, in filename order
+ * @param {Object} sequelize - Sequelize instance
+ * @returns {Array} - Names of the migrations that ran
+ */
+const runMigrations = async (sequelize) => {
+    const queryInterface = sequelize.getQueryInterface();
+    await ensureMetaTable(queryInterface);
+
+    const rows = await sequelize.query(`SELECT name FROM ${META_TABLE}`, { type: sequelize.QueryTypes.SELECT });
+    const executed = new Set(rows.map(row => row.name));
+
+    const ran = [];
+    for (const file of listMigrations()) {
+        if (executed.has(file)) continue;
+        console.log(`Running migration ${file}`);
+        const migration = require(path.join(MIGRATIONS_DIR, file));
+        await migration.up(queryInterface, Sequelize);
+        await queryInterface.bulkInsert(META_TABLE, [{ name: file }]);
+        ran.push(file);
+    }
+    return ran;
+};
+
+/**
+ * Run the models' afterSync hooks (default users and categories) without syncing.
+ * Production skips sync() at boot, so the seeds run from here instead.
+ * @param {Object} db - Loaded models (require('../models'))
+ */
+const runSeedHooks = async (db) => {
+    for (const model of Object.values(db)) {
+        if (model && typeof model.runHooks === 'function' && model.hasHook && model.hasHook('afterSync')) {
+            await model.runHooks('afterSync', {});
+        }
+    }
+};
+
+/**
+ * Create an index unless the table already has one with that name or one starting with the same columns
+ * (SQLite's automatic primary key/unique indexes included). Used by the migrations so they can be re-run.
+ * @param {Object} queryInterface - Sequelize QueryInterface
+ * @param {string} table - Table name
+ * @param {Array} fields - Indexed columns, in order ({ name, collate } entries are only matched by index name)
+ * @param {string} name - Index name
+ * @returns {boolean} - true when the index was created
+ */
+const addIndexIfMissing = async (queryInterface, table, fields, name) => {
+    const indexes = await queryInterface.showIndex(table);
+    const covered = indexes.some(index => {
+        if (index.name === name) return true;
+        const columns = (index.fields || []).map(field => field.attribute);
+        return fields.every((field, i) => columns[i] === field);
+    });
+    if (covered) return false;
+    await queryInterface.addIndex(table, fields, { name });
+    return true;
+};
+
+/**
+ * Drop an index if it exists (for migration down())
+ * @param {Object} queryInterface - Sequelize QueryInterface
+ * @param {string} table - Table name
+ * @param {string} name - Index name
+ */
+const removeIndexIfExists = async (queryInterface, table, name) => {
+    const indexes = await queryInterface.showIndex(table);
+    if (indexes.some(index => index.name === name)) {
+        await queryInterface.removeIndex(table, name);
+    }
+};
+
+// `npm run migrate` - apply pending migrations and exit
+if (require.main === module) {
+    const db = require('../models');
+    runMigrations(db.sequelize)
+        .then(ran => {
+            console.log(ran.length ? `Applied ${ran.length} migration(s)` : 'No pending migrations');
+            return db.sequelize.close();
+        })
+        .catch(err => {
+            console.error('Migration failed:', err);
+            process.exit(1);
+        });
+}
+
+module.exports = {
+    runMigrations,
+    runSeedHooks,
+    addIndexIfMissing,
+    removeIndexIfExists
+};
@@ -0,0 +1,341 @@
+// Product import - bulk listing of products from a streamed CSV or NDJSON upload
+// Rows are parsed as they arrive, verified in batches and inserted with chunked multi-row INSERTs, one transaction per batch.
+const { PRODUCTS, CATEGORY, sequelize } = require('../models');
+const { Op } = require('sequelize');
+const { verifyProductSuitability } = require('./categoryVerification');
+const { onRemoteTableWrite } = require('./tableVersions');
+
+const IMPORT_BATCH_SIZE = 200;      // rows verified and committed together
+const INSERT_CHUNK_SIZE = 100;      // rows per INSERT statement
+const MAX_IMPORT_ROWS = parseInt(process.env.MAX_IMPORT_ROWS) || 5000;
+const MAX_LINE_LENGTH = 64 * 1024;  // a single row may not exceed this (no unbounded buffering)
+
+// Accepted column names (case-insensitive), same fields as POST /products
+const COLUMNS = ['productName', 'price', 'MOQ', 'availableQty', 'description', 'category'];
+const COLUMN_BY_NAME = new Map(COLUMNS.map(column => [column.toLowerCase(), column]));
+
+// Problems with the file itself stop the import; they are told apart from database errors by their code
+const formatError = (message) => Object.assign(new Error(message), { code: 'IMPORT_FORMAT' });
+
+const FORMATS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson'
+};
+
+// Category IDs, loaded once and dropped whenever a category is written (here or in another worker)
+let categoryIds = null;
+const forgetCategories = () => { categoryIds = null; };
+for (const hook of ['afterCreate', 'afterUpdate', 'afterDestroy', 'afterBulkCreate', 'afterBulkUpdate', 'afterBulkDestroy']) {
+    CATEGORY.addHook(hook, 'productImport', forgetCategories);
+}
+onRemoteTableWrite(table => {
+    if (table === 'CATEGORY') forgetCategories();
+});
+
+const getCategoryIds = async () => {
+    if (!categoryIds) {
+        const rows = await CATEGORY.findAll({ attributes: ['CategoryID'], raw: true });
+        categoryIds = new Set(rows.map(row => row.CategoryID));
+    }
+    return categoryIds;
+};
+
+/**
+ * Import format for a request Content-Type
+ * @param {string} contentType - Content-Type header
+ * @returns {string|null} - 'csv', 'ndjson' or null when unsupported
+ */
+const importFormat = (contentType) => FORMATS[String(contentType || '').split(';')[0].trim().toLowerCase()] || null;
+
+/**
+ * Parse a CSV stream (RFC 4180: quoted fields, "" escapes, CRLF or LF) into records, one array of fields each
+ * @param {Object} stream - Readable stream of text
+ * @returns {AsyncGenerator} - { line, fields } per record
+ */
+async function* parseCsvRecords(stream) {
+    let field = '';
+    let fields = [];
+    let quoted = false;
+    let afterQuote = false;
+    let line = 1;
+    let recordLine = 1;
+    let length = 0;
+
+    for await (const chunk of stream) {
+        const text = typeof chunk === 'string' ? chunk : chunk.toString('utf8');
+        for (let i = 0; i < text.length; i++) {
+            const char = text[i];
+            if (++length > MAX_LINE_LENGTH) {
+                throw formatError(`Row starting on line ${recordLine} is longer than ${MAX_LINE_LENGTH} characters`);
+            }
+
+            if (quoted) {
+                if (char === '"') {
+                    quoted = false;
+                    afterQuote = true;
+                } else {
+                    if (char === '\n') line++;
+                    field += char;
+                }
+                continue;
+            }
+
+            if (char === '"') {
+                // "" inside a quoted field is an escaped quote
+                if (afterQuote) field += '"';
+                quoted = true;
+                afterQuote = false;
+            } else if (char === ',') {
+                fields.push(field);
+                field = '';
+                afterQuote = false;
+            } else if (char === '\n') {
+                fields.push(field.endsWith('\r') && !afterQuote ? field.slice(0, -1) : field);
+                if (fields.length > 1 || fields[0] !== '') yield { line: recordLine, fields };
+                field = '';
+                fields = [];
+                afterQuote = false;
+                line++;
+                recordLine = line;
+                length = 0;
+            } else if (char !== '\r' || !afterQuote) {
+                field += char;
+            }
+        }
+    }
+
+    if (quoted) throw formatError(`Unterminated quoted field starting on line ${recordLine}`);
+    fields.push(field);
+    if (fields.length > 1 || fields[0] !== '') yield { line: recordLine, fields };
+}
+
+/**
+ * Parse a CSV stream with a header row into row objects keyed by the COLUMNS names
+ * @param {Object} stream - Readable stream of text
+ * @returns {AsyncGenerator} - { line, data } per row, or { line, error }
+ */
+async function* parseCsvRows(stream) {
+    let header = null;
+    for await (const { line, fields } of parseCsvRecords(stream)) {
+        if (!header) {
+            header = fields.map(name => COLUMN_BY_NAME.get(name.trim().toLowerCase()) || null);
+            const missing = ['productName', 'price', 'category'].filter(column => !header.includes(column));
+            if (missing.length > 0) throw formatError(`CSV header is missing: ${missing.join(', ')}`);
+            continue;
+        }
+
+        const data = {};
+        header.forEach((column, i) => {
+            if (column && fields[i] !== undefined && fields[i].trim() !== '') data[column] = fields[i].trim();
+        });
+        yield { line, data };
+    }
+}
+
+/**
+ * Parse an NDJSON stream (one JSON object per line) into row objects
+ * @param {Object} stream - Readable stream of text
+ * @returns {AsyncGenerator} - { line, data } per row, or { line, error }
+ */
+async function* parseNdjsonRows(stream) {
+    let buffer = '';
+    let line = 0;
+
+    const parse = (text) => {
+        try {
+            const value = JSON.parse(text);
+            if (!value || typeof value !== 'object' || Array.isArray(value)) return { line, error: 'Row is not a JSON object' };
+            const data = {};
+            for (const [key, field] of Object.entries(value)) {
+                const column = COLUMN_BY_NAME.get(key.toLowerCase());
+                if (column && field !== null && field !== '') data[column] = field;
+            }
+            return { line, data };
+        } catch (err) {
+            return { line, error: 'Invalid JSON' };
+        }
+    };
+
+    for await (const chunk of stream) {
+        buffer += typeof chunk === 'string' ? chunk : chunk.toString('utf8');
+        let newline;
+        while ((newline = buffer.indexOf('\n')) !== -1) {
+            const text = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            line++;
+            if (text) yield parse(text);
+        }
+        if (buffer.length > MAX_LINE_LENGTH) {
+            throw formatError(`Line ${line + 1} is longer than ${MAX_LINE_LENGTH} characters`);
+        }
+    }
+
+    line++;
+    if (buffer.trim()) yield parse(buffer.trim());
+}
+
+// Same checks and defaults as POST /products
+const checkRow = (data, categories) => {
+    const errors = [];
+    const product = {
+        productName: data.productName !== undefined ? String(data.productName) : '',
+        price: Number(data.price),
+        MOQ: data.MOQ !== undefined ? Number(data.MOQ) : 1,
+        availableQty: data.availableQty !== undefined ? Number(data.availableQty) : 1,
+        description: data.description !== undefined ? String(data.description) : 'No description available',
+        category: Number(data.category)
+    };
+
+    if (!product.productName || data.price === undefined || data.category === undefined) {
+        errors.push('Required fields not provided');
+        return { product, errors };
+    }
+    if (!Number.isFinite(product.price) || product.price < 0) errors.push('Price cannot be negative');
+    if (!Number.isInteger(product.MOQ) || product.MOQ < 1) errors.push('Minimum Order Quantity cannot be less than 1');
+    if (!Number.isInteger(product.availableQty) || product.availableQty < 0) errors.push('Available Quantity cannot be negative');
+    if (!categories.has(product.category)) errors.push('Category does not exist');
+    return { product, errors };
+};
+
+// Verify one batch of parsed rows and insert the accepted ones in a single transaction
+const importBatch = async (sellerId, batch, seenNames) => {
+    const categories = await getCategoryIds();
+    const report = [];
+    const accepted = [];
+
+    const checked = batch.map(row => (row.error ? row : { ...row, ...checkRow(row.data, categories) }));
+
+    // names must be unique per seller: one lookup for the whole batch
+    const names = checked.filter(row => row.product && row.errors.length === 0).map(row => row.product.productName);
+    const existing = names.length === 0 ? [] : await PRODUCTS.findAll({
+        attributes: ['ProductName'],
+        where: { UserID: sellerId, ProductName: { [Op.in]: names } },
+        raw: true
+    });
+    const taken = new Set(existing.map(row => row.ProductName));
+
+    for (const row of checked) {
+        if (row.error) {
+            report.push({ line: row.line, status: 'rejected', errors: [row.error] });
+            continue;
+        }
+
+        const { product, errors } = row;
+        if (errors.length === 0 && (taken.has(product.productName) || seenNames.has(product.productName))) {
+            errors.push('You already have a product with this name');
+        }
+        if (errors.length === 0) {
+            const verification = await verifyProductSuitability(product.productName, product.description);
+            if (!verification.approved) errors.push(verification.message);
+            else if (verification.suggestedCategory && verification.suggestedCategory !== product.category && verification.confidence > 40) {
+                row.categoryWarning = `Our AI suggests this product might fit better in the ${verification.categoryName} category (${verification.confidence}% confidence)`;
+            }
+        }
+
+        if (errors.length > 0) {
+            report.push({ line: row.line, status: 'rejected', productName: product.productName || null, errors });
+            continue;
+        }
+
+        seenNames.add(product.productName);
+        accepted.push(row);
+    }
+
+    if (accepted.length > 0) {
+        const created = [];
+        try {
+            await sequelize.transaction(async (t) => {
+                for (let i = 0; i < accepted.length; i += INSERT_CHUNK_SIZE) {
+                    const chunk = accepted.slice(i, i + INSERT_CHUNK_SIZE);
+                    const products = await PRODUCTS.bulkCreate(chunk.map(({ product }) => ({
+                        UserID: sellerId,
+                        ProductName: product.productName,
+                        Price: product.price,
+                        MOQ: product.MOQ,
+                        AvailableQty: product.availableQty,
+                        ProductImage: 'default.jpg',
+                        Description: product.description,
+                        CategoryID: product.category
+                    })), { transaction: t });
+
+                    chunk.forEach((row, index) => {
+                        const entry = { line: row.line, status: 'created', productName: row.product.productName, productId: products[index].ProductID || null };
+                        if (row.categoryWarning) entry.categoryWarning = row.categoryWarning;
+                        created.push(entry);
+                    });
+                }
+            });
+            report.push(...created);
+        } catch (err) {
+            // the batch was rolled back as a whole (e.g. a product with the same name was created meanwhile)
+            console.error('Error importing products:', err);
+            for (const row of accepted) {
+                seenNames.delete(row.product.productName);
+                report.push({ line: row.line, status: 'rejected', productName: row.product.productName, errors: ['Could not be saved, please retry this row'] });
+            }
+        }
+    }
+
+    return report.sort((a, b) => a.line - b.line);
+};
+
+/**
+ * Import the products of a streamed upload for a seller
+ * @param {number} sellerId - Seller's UserID
+ * @param {Object} stream - Request (or any readable stream) carrying the rows
+ * @param {string} format - 'csv' or 'ndjson'
+ * @returns {Object} - { created, rejected, truncated, error (malformed file), rows: per-row report in file order }
+ */
+const importProducts = async (sellerId, stream, format) => {
+    // decode as a stream, so multi-byte characters split across chunks stay intact
+    if (typeof stream.setEncoding === 'function') stream.setEncoding('utf8');
+    const rows = format === 'csv' ? parseCsvRows(stream) : parseNdjsonRows(stream);
+    const seenNames = new Set();
+    const report = [];
+    let batch = [];
+    let count = 0;
+    let truncated = false;
+
+    const flush = async () => {
+        report.push(...await importBatch(sellerId, batch, seenNames));
+        batch = [];
+        // let other requests run between batches
+        await new Promise(resolve => setImmediate(resolve));
+    };
+
+    let error = null;
+
+    try {
+        for await (const row of rows) {
+            if (++count > MAX_IMPORT_ROWS) {
+                truncated = true;
+                break;
+            }
+            batch.push(row);
+            if (batch.length >= IMPORT_BATCH_SIZE) await flush();
+        }
+        if (batch.length > 0) await flush();
+    } catch (err) {
+        // malformed file: the rows of earlier batches stay imported, the unfinished batch is dropped
+        if (err.code !== 'IMPORT_FORMAT') throw err;
+        error = err.message;
+    }
+
+    return {
+        created: report.filter(row => row.status === 'created').length,
+        rejected: report.filter(row => row.status === 'rejected').length,
+        truncated,
+        error,
+        rows: report
+    };
+};
+
+module.exports = {
+    MAX_IMPORT_ROWS,
+    importFormat,
+    importProducts,
+    parseCsvRows,
+    parseNdjsonRows
+};
@@ -0,0 +1,112 @@
+// Query instrumentation - per-request database time and query counts, and a slow-query log
+// Every query is timed by Sequelize (benchmark) and attributed to the request it ran for through AsyncLocalStorage.
+const { AsyncLocalStorage } = require('async_hooks');
+
+const requestContext = new AsyncLocalStorage();
+
+const SLOW_QUERY_MS = parseInt(process.env.SLOW_QUERY_MS) || 200;
+const QUERY_COUNT_WARNING = parseInt(process.env.QUERY_COUNT_WARNING) || 50;
+const MAX_LOGGED_SQL = 2000;
+
+// String literals hold user data (names, emails, messages, password hashes); numbers and identifiers are kept
+const STRING_LITERAL = /'(?:[^']|'')*'/g;
+
+/**
+ * Replace string literals in a statement, so slow-query logs carry no user data
+ * @param {string} sql - SQL statement as logged by Sequelize
+ * @returns {string}
+ */
+const redactSql = (sql) => {
+    const redacted = String(sql).replace(STRING_LITERAL, "'?'");
+    return redacted.length > MAX_LOGGED_SQL ? `${redacted.slice(0, MAX_LOGGED_SQL)}...` : redacted;
+};
+
+const bindCount = (bind) => {
+    if (!bind) return 0;
+    return Array.isArray(bind) ? bind.length : Object.keys(bind).length;
+};
+
+/**
+ * Time every query on a Sequelize instance. The configured logger (if any) keeps receiving the statements.
+ * @param {Object} sequelize - Sequelize instance
+ * @param {Object} options - { slowQueryMs: number } statements at or above this duration are logged
+ */
+const instrumentQueries = (sequelize, { slowQueryMs = SLOW_QUERY_MS } = {}) => {
+    // Sequelize logs to console.log unless the environment config says otherwise
+    const logging = Object.prototype.hasOwnProperty.call(sequelize.options, 'logging')
+        ? sequelize.options.logging
+        : console.log;
+
+    sequelize.options.benchmark = true;
+    sequelize.options.logging = (message, elapsed, options) => {
+        if (typeof elapsed !== 'number') {
+            if (typeof logging === 'function') logging(message, elapsed, options);
+            return;
+        }
+
+        const store = requestContext.getStore();
+        if (store) {
+            store.queries++;
+            store.dbTime += elapsed;
+        }
+
+        if (elapsed >= slowQueryMs) {
+            const sql = String(message).replace(/^Executed \([^)]*\): /, '');
+            const binds = bindCount(options && options.bind);
+            console.warn(`Slow query (${elapsed}ms)${store ? ` [${store.route}]` : ''}: ${redactSql(sql)}` +
+                (binds ? ` [${binds} bind parameters redacted]` : ''));
+        }
+
+        if (typeof logging === 'function') {
+            // same output as Sequelize's own console logging with benchmark on
+            if (logging === console.log) console.log(`${message} Elapsed time: ${elapsed}ms`);
+            else logging(message, elapsed, options);
+        }
+    };
+};
+
+/**
+ * Middleware that counts the queries and database time of each request.
+ * With debugHeaders the totals are returned as X-DB-Queries / X-DB-Time response headers.
+ * Requests issuing more than QUERY_COUNT_WARNING queries are logged (N+1 loops).
+ * @param {Object} options - { debugHeaders: boolean }
+ * @returns {Function} - Express middleware
+ */
+const trackRequestQueries = ({ debugHeaders = false } = {}) => (req, res, next) => {
+    const store = { route: `${req.method} ${req.path}`, queries: 0, dbTime: 0 };
+
+    if (debugHeaders) {
+        const writeHead = res.writeHead;
+        res.writeHead = function (...args) {
+            if (!res.headersSent) {
+                res.setHeader('X-DB-Queries', String(store.queries));
+                res.setHeader('X-DB-Time', store.dbTime.toFixed(1));
+            }
+            return writeHead.apply(this, args);
+        };
+    }
+
+    res.on('finish', () => {
+        if (store.queries > QUERY_COUNT_WARNING) {
+            console.warn(`Request ${store.route} issued ${store.queries} queries (${store.dbTime}ms in the database)`);
+        }
+    });
+
+    requestContext.run(store, next);
+};
+
+/**
+ * Queries and database time of the current request so far
+ * @returns {Object|null} - { route, queries, dbTime } or null outside a request
+ */
+const getRequestQueryStats = () => {
+    const store = requestContext.getStore();
+    return store ? { ...store } : null;
+};
+
+module.exports = {
+    instrumentQueries,
+    trackRequestQueries,
+    getRequestQueryStats,
+    redactSql
+};
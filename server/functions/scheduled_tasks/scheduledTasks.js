@@ -2,13 +2,15 @@ require('dotenv').config();
 const cron = require('node-cron');
 const { promoValidation } = require('./subtasks/checkPromo');
 const { handleTransactionTimeout } = require('./subtasks/transactionTimeout');
+const { attachmentCleanup } = require('./subtasks/attachmentCleanup');
+const { timeCronJob } = require('../metrics');
 
 
 //first star is for seconds, then minutes, hours, day of month, month, day of week
 // validate promo validity every day at midnight
 cron.schedule('0 0 0 * * *', async () => {
     //this runs every day at midnight
-    await promoValidation();
+    await timeCronJob('promo_validation', promoValidation);
 });
 
 
@@ -17,5 +19,12 @@ cron.schedule('0 0 0 * * *', async () => {
 // handle transaction timeouts
 cron.schedule(`0 */${process.env.TRANSACTION_TTL} * * * *`, async () => {
     //this runs based on the transaction timeout set in the .env file
-    await handleTransactionTimeout();
+    await timeCronJob('transaction_timeout', handleTransactionTimeout);
+});
+
+
+
+// remove report attachments no longer referenced by any report every day at 3am
+cron.schedule('0 0 3 * * *', async () => {
+    await timeCronJob('attachment_cleanup', attachmentCleanup);
 });
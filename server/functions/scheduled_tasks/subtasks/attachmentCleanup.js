@@ -0,0 +1,16 @@
+const { sweepUnreferencedAttachments } = require('../../attachmentStore');
+
+async function attachmentCleanup(){
+
+    try{
+        const { scanned, removed } = await sweepUnreferencedAttachments();
+        console.log(`Attachment cleanup completed: ${removed} unreferenced file(s) removed out of ${scanned}`);
+        return;
+
+    } catch (err) {
+        console.error('Scheduled task error for attachment cleanup:', err);
+    }
+
+}
+
+module.exports = { attachmentCleanup };
@@ -0,0 +1,189 @@
+// Seller statistics - daily aggregates behind the seller dashboard summary
+// PRODUCT_DAILY_STATS / SELLER_DAILY_STATS are bumped when a view is tracked and when a payment is approved,
+// so the summary reads a few hundred aggregate rows instead of every view and order line.
+const { sequelize } = require('../models');
+const { bumpTableVersion } = require('./tableVersions');
+
+const LOW_STOCK_THRESHOLD = parseInt(process.env.LOW_STOCK_THRESHOLD) || 5;
+const TOP_PRODUCTS = 5;
+const LOW_STOCK_LIMIT = 20;
+
+// Selectable summary windows, in days (today included)
+const SUMMARY_WINDOWS = { '7d': 7, '30d': 30, '90d': 90, '365d': 365 };
+
+// Stats are kept per UTC day; DATE columns are stored as 'YYYY-MM-DD HH:MM:SS.sss +00:00'
+const toStatDate = (date) => date.toISOString().slice(0, 10);
+
+// Approved sales grouped per product or per seller and day. Sales are dated by the transaction's CreatedAt,
+// both when backfilling and when a payment is approved, so the two always agree.
+const salesUpsert = (level, transactionFilter) => {
+    const product = level === 'product';
+    const table = product ? 'PRODUCT_DAILY_STATS' : 'SELLER_DAILY_STATS';
+    const conflict = product ? 'ProductID, StatDate' : 'SellerID, StatDate';
+    return `
+        INSERT INTO ${table} (${product ? 'ProductID, ' : ''}StatDate, SellerID, UnitsSold, Revenue, Orders)
+        SELECT ${product ? 'pti.ProductID, ' : ''}substr(t.CreatedAt, 1, 10), p.UserID,
+            SUM(pti.Quantity), SUM(pti.Quantity * pti.SoldPrice), COUNT(DISTINCT pti.TransactionID)
+        FROM PRODUCT_TRANSACTION_INFO pti
+        JOIN TRANSACTIONS t ON t.TransactionID = pti.TransactionID
+        JOIN PRODUCTS p ON p.ProductID = pti.ProductID
+        WHERE t.TransactionState = 'APPROVED'${transactionFilter ? ` AND ${transactionFilter}` : ''}
+        GROUP BY ${product ? 'pti.ProductID' : 'p.UserID'}, substr(t.CreatedAt, 1, 10)
+        ON CONFLICT(${conflict}) DO UPDATE SET
+            UnitsSold = UnitsSold + excluded.UnitsSold,
+            Revenue = Revenue + excluded.Revenue,
+            Orders = Orders + excluded.Orders
+    `;
+};
+
+const viewsUpsert = (level) => {
+    const product = level === 'product';
+    const table = product ? 'PRODUCT_DAILY_STATS' : 'SELLER_DAILY_STATS';
+    const conflict = product ? 'ProductID, StatDate' : 'SellerID, StatDate';
+    return `
+        INSERT INTO ${table} (${product ? 'ProductID, ' : ''}StatDate, SellerID, Views)
+        VALUES (${product ? ':productId, ' : ''}:statDate, :sellerId, :views)
+        ON CONFLICT(${conflict}) DO UPDATE SET Views = Views + excluded.Views
+    `;
+};
+
+// Inside a caller's transaction the versions move on commit, so a summary read before then is not cached as current
+const bumpStats = (transaction) => {
+    if (transaction) return transaction.afterCommit(() => bumpStats());
+    bumpTableVersion('PRODUCT_DAILY_STATS');
+    bumpTableVersion('SELLER_DAILY_STATS');
+};
+
+/**
+ * Count one view of a product for today
+ * @param {Object} product - Product row (ProductID, UserID)
+ * @param {Object} options - { transaction }
+ */
+const recordProductView = async (product, { transaction } = {}) => {
+    const replacements = { productId: product.ProductID, sellerId: product.UserID, statDate: toStatDate(new Date()), views: 1 };
+    const run = async (t) => {
+        await sequelize.query(viewsUpsert('product'), { replacements, transaction: t });
+        await sequelize.query(viewsUpsert('seller'), { replacements, transaction: t });
+    };
+
+    if (transaction) await run(transaction);
+    else await sequelize.transaction(run);
+    bumpStats(transaction);
+};
+
+/**
+ * Add the order lines of a transaction that was just approved. Call it once, inside the approving transaction.
+ * @param {string} transactionId - TransactionID, already in the APPROVED state
+ * @param {Object} options - { transaction }
+ */
+const recordApprovedSale = async (transactionId, { transaction } = {}) => {
+    const replacements = { transactionId };
+    await sequelize.query(salesUpsert('product', 't.TransactionID = :transactionId'), { replacements, transaction });
+    await sequelize.query(salesUpsert('seller', 't.TransactionID = :transactionId'), { replacements, transaction });
+    bumpStats(transaction);
+};
+
+/**
+ * Recompute both aggregate tables from PRODUCT_VIEWS and the approved transactions (migration backfill)
+ */
+const rebuildSellerStats = async () => {
+    await sequelize.transaction(async (t) => {
+        for (const table of ['PRODUCT_DAILY_STATS', 'SELLER_DAILY_STATS']) {
+            await sequelize.query(`DELETE FROM ${table}`, { transaction: t });
+        }
+
+        for (const level of ['product', 'seller']) {
+            const product = level === 'product';
+            await sequelize.query(`
+                INSERT INTO ${product ? 'PRODUCT_DAILY_STATS' : 'SELLER_DAILY_STATS'} (${product ? 'ProductID, ' : ''}StatDate, SellerID, Views)
+                SELECT ${product ? 'pv.ProductID, ' : ''}substr(pv.ViewedAt, 1, 10), p.UserID, COUNT(*)
+                FROM PRODUCT_VIEWS pv
+                JOIN PRODUCTS p ON p.ProductID = pv.ProductID
+                WHERE pv.ViewedAt IS NOT NULL
+                GROUP BY ${product ? 'pv.ProductID' : 'p.UserID'}, substr(pv.ViewedAt, 1, 10)
+            `, { transaction: t });
+            await sequelize.query(salesUpsert(level), { transaction: t });
+        }
+    });
+    bumpStats();
+};
+
+const rate = (orders, views) => (views > 0 ? Math.round((orders / views) * 10000) / 10000 : null);
+
+/**
+ * Dashboard summary of a seller over a window ending today
+ * @param {number} sellerId - Seller's UserID
+ * @param {string} window - One of SUMMARY_WINDOWS
+ * @returns {Object} - { window, from, to, revenue, unitsSold, orders, views, conversionRate, products, topProducts, lowStock }
+ */
+const getSellerSummary = async (sellerId, window) => {
+    const to = new Date();
+    const from = new Date(to.getTime() - (SUMMARY_WINDOWS[window] - 1) * 24 * 60 * 60 * 1000);
+    const replacements = { sellerId, from: toStatDate(from), lowStock: LOW_STOCK_THRESHOLD };
+    const select = (sql) => sequelize.query(sql, { replacements, type: sequelize.QueryTypes.SELECT });
+
+    const [[totals], topProducts, lowStock, productCounts] = await Promise.all([
+        select(`
+            SELECT COALESCE(SUM(Revenue), 0) AS revenue, COALESCE(SUM(UnitsSold), 0) AS unitsSold,
+                COALESCE(SUM(Orders), 0) AS orders, COALESCE(SUM(Views), 0) AS views
+            FROM SELLER_DAILY_STATS
+            WHERE SellerID = :sellerId AND StatDate >= :from
+        `),
+        select(`
+            SELECT s.ProductID, p.ProductName, SUM(s.Revenue) AS revenue, SUM(s.UnitsSold) AS unitsSold,
+                SUM(s.Orders) AS orders, SUM(s.Views) AS views
+            FROM PRODUCT_DAILY_STATS s
+            JOIN PRODUCTS p ON p.ProductID = s.ProductID
+            WHERE s.SellerID = :sellerId AND s.StatDate >= :from
+            GROUP BY s.ProductID
+            HAVING SUM(s.UnitsSold) > 0
+            ORDER BY revenue DESC, unitsSold DESC, s.ProductID ASC
+            LIMIT ${TOP_PRODUCTS}
+        `),
+        select(`
+            SELECT ProductID, ProductName, AvailableQty
+            FROM PRODUCTS
+            WHERE UserID = :sellerId AND ProdStatus = 'Active' AND AvailableQty <= :lowStock
+            ORDER BY AvailableQty ASC, ProductID ASC
+            LIMIT ${LOW_STOCK_LIMIT}
+        `),
+        select(`
+            SELECT ProdStatus, COUNT(*) AS count
+            FROM PRODUCTS
+            WHERE UserID = :sellerId
+            GROUP BY ProdStatus
+        `)
+    ]);
+
+    const products = { total: 0, active: 0 };
+    for (const row of productCounts) {
+        products.total += row.count;
+        if (row.ProdStatus === 'Active') products.active = row.count;
+    }
+
+    return {
+        window,
+        from: toStatDate(from),
+        to: toStatDate(to),
+        revenue: Math.round(totals.revenue * 100) / 100,
+        unitsSold: totals.unitsSold,
+        orders: totals.orders,
+        views: totals.views,
+        conversionRate: rate(totals.orders, totals.views),
+        products,
+        topProducts: topProducts.map(row => ({
+            ...row,
+            revenue: Math.round(row.revenue * 100) / 100,
+            conversionRate: rate(row.orders, row.views)
+        })),
+        lowStock: { threshold: LOW_STOCK_THRESHOLD, products: lowStock }
+    };
+};
+
+module.exports = {
+    SUMMARY_WINDOWS,
+    recordProductView,
+    recordApprovedSale,
+    rebuildSellerStats,
+    getSellerSummary
+};
@@ -0,0 +1,152 @@
+// Response serializers - JSON writers compiled once per response shape for the large list endpoints
+// They read Sequelize dataValues directly instead of going through toJSON() and a generic JSON.stringify.
+
+const NEEDS_ESCAPE = /["\\\u0000-\u001f\ud800-\udfff]/;
+
+const stringifyAny = (value) => {
+    const json = JSON.stringify(value);
+    return json === undefined ? 'null' : json;
+};
+
+const quoteString = (value) => {
+    if (typeof value !== 'string') return stringifyAny(value);
+    return NEEDS_ESCAPE.test(value) ? JSON.stringify(value) : `"${value}"`;
+};
+
+// Expression that writes the value held in `x` for a property of the given type
+const valueExpression = (type, nestedIndex) => {
+    switch (type) {
+        case 'integer':
+        case 'number':
+            return `(typeof x === 'number' && isFinite(x) ? '' + x : j(x))`;
+        case 'string':
+            return `(x === null ? 'null' : s(x))`;
+        case 'boolean':
+            return `(x === true ? 'true' : x === false ? 'false' : j(x))`;
+        case 'object':
+        case 'array':
+            return `(x === null ? 'null' : n[${nestedIndex}](x))`;
+        default:
+            return 'j(x)';
+    }
+};
+
+/**
+ * Compile a schema into a serializer function
+ * @param {Object} schema - { type: 'object', properties: {...} } or { type: 'array', items: schema }
+ * @returns {Function} - (value) => JSON string
+ */
+const compileSerializer = (schema) => {
+    if (schema.type === 'array') {
+        const item = compileSerializer(schema.items);
+        return (list) => {
+            if (!Array.isArray(list)) return stringifyAny(list);
+            let out = '[';
+            for (let i = 0; i < list.length; i++) {
+                if (i > 0) out += ',';
+                out += list[i] === null || list[i] === undefined ? 'null' : item(list[i]);
+            }
+            return out + ']';
+        };
+    }
+
+    if (schema.type !== 'object') {
+        return schema.type === 'string' ? quoteString : stringifyAny;
+    }
+
+    // Properties missing from the instance (attributes not selected) are left out, as toJSON() does
+    const nested = [];
+    let body = 'const d = v.dataValues || v;\nlet out = "{";\nlet sep = "";\n';
+    for (const [key, property] of Object.entries(schema.properties)) {
+        let nestedIndex = null;
+        if (property.type === 'object' || property.type === 'array') {
+            nestedIndex = nested.push(compileSerializer(property)) - 1;
+        }
+        body += `{ const x = d[${JSON.stringify(key)}]; if (x !== undefined) { ` +
+            `out += sep + ${JSON.stringify(`${JSON.stringify(key)}:`)} + ${valueExpression(property.type, nestedIndex)}; sep = ","; } }\n`;
+    }
+    body += 'return out + "}";';
+
+    // eslint-disable-next-line no-new-func
+    return new Function('s', 'j', 'n', `return function serialize(v) {\n${body}\n};`)(quoteString, stringifyAny, nested);
+};
+
+const attributeType = (attribute) => {
+    switch (attribute.type.key) {
+        case 'INTEGER':
+        case 'BIGINT':
+        case 'SMALLINT':
+        case 'TINYINT':
+        case 'MEDIUMINT':
+            return 'integer';
+        case 'REAL':
+        case 'FLOAT':
+        case 'DOUBLE':
+        case 'DOUBLE PRECISION':
+            return 'number';
+        case 'STRING':
+        case 'TEXT':
+        case 'CHAR':
+        case 'ENUM':
+        case 'UUID':
+            return 'string';
+        case 'BOOLEAN':
+            return 'boolean';
+        default:
+            return 'any';   // dates, decimals, JSON - written with JSON.stringify
+    }
+};
+
+/**
+ * Build a schema for a model and its includes, in the same form as a findAll include tree
+ * @param {Object} model - Sequelize model
+ * @param {Object} options - { include: [{ model, as, include }] }
+ * @returns {Object} - Object schema covering every attribute of the model and the included associations
+ */
+const modelSchema = (model, { include = [] } = {}) => {
+    const properties = {};
+    for (const [name, attribute] of Object.entries(model.rawAttributes)) {
+        properties[name] = { type: attributeType(attribute) };
+    }
+
+    for (const child of include) {
+        const association = Object.values(model.associations)
+            .find(candidate => child.as ? candidate.as === child.as : candidate.target === child.model);
+        if (!association) {
+            throw new Error(`${model.name} has no association to ${child.as || child.model.name}`);
+        }
+        const childSchema = modelSchema(association.target, child);
+        properties[association.as] = association.isMultiAssociation
+            ? { type: 'array', items: childSchema }
+            : childSchema;
+    }
+
+    return { type: 'object', properties };
+};
+
+/**
+ * Send a serialized { status, message, data } envelope
+ * @param {Object} res - Express response
+ * @param {number} status - HTTP status, also written to the body
+ * @param {string} message - Response message
+ * @param {Function} serializer - Compiled serializer for data
+ * @param {*} data - Response data
+ * @param {Object} extra - Optional small fields added after data (e.g. pagination), written with JSON.stringify
+ */
+const sendSerialized = (res, status, message, serializer, data, extra = null) => {
+    let trailer = '';
+    if (extra) {
+        for (const [key, value] of Object.entries(extra)) {
+            trailer += `,${JSON.stringify(key)}:${stringifyAny(value)}`;
+        }
+    }
+    res.status(status)
+        .type('json')
+        .send(`{"status":${status},"message":${quoteString(message)},"data":${serializer(data)}${trailer}}`);
+};
+
+module.exports = {
+    compileSerializer,
+    modelSchema,
+    sendSerialized
+};
@@ -0,0 +1,179 @@
+// SQLite profile - per-connection pragmas and a single writer queue for the SQLite environments
+// Enabled from config/config.js: an environment with `pragmas` gets both (see production_sqlite).
+// The queue only orders the writers of one process. With CLUSTER_WORKERS each worker has its own queue,
+// and writers in different workers wait on each other through busy_timeout (SQLITE_BUSY past it).
+
+const WRITE_QUERY_TYPES = ['INSERT', 'UPDATE', 'BULKUPDATE', 'BULKDELETE', 'DELETE', 'UPSERT'];
+const WRITE_STATEMENT = /^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b/i;
+
+/**
+ * Mutex for writers. A writer that waits longer than waitTimeoutMs is rejected (code 'SQLITE_WRITER_TIMEOUT')
+ * rather than run beside the holder, so a write issued outside its transaction while that transaction holds
+ * the lock fails instead of deadlocking. A holder that passes onExpire has it called after leaseMs and is
+ * expected to end itself (the transaction wrapper rolls back); the lock passes on only once it has.
+ * @param {Object} options - { waitTimeoutMs, leaseMs }
+ * @returns {Object} - { acquire, stats }
+ */
+const createWriterQueue = ({ waitTimeoutMs = 5000, leaseMs = 30000 } = {}) => {
+    const waiters = [];
+    let held = false;
+    let timeouts = 0;
+
+    const grant = (onExpire) => {
+        held = true;
+        let released = false;
+        let lease = null;
+        const release = () => {
+            if (released) return;
+            released = true;
+            clearTimeout(lease);
+            next();
+        };
+        if (onExpire) {
+            lease = setTimeout(() => {
+                console.warn(`SQLite writer lock held for more than ${leaseMs}ms - ending its holder`);
+                onExpire();
+            }, leaseMs);
+            lease.unref();
+        }
+        return release;
+    };
+
+    const next = () => {
+        held = false;
+        const waiter = waiters.shift();
+        if (waiter) {
+            clearTimeout(waiter.timer);
+            waiter.resolve(grant(waiter.onExpire));
+        }
+    };
+
+    const acquire = (onExpire) => {
+        if (!held) return Promise.resolve(grant(onExpire));
+        return new Promise((resolve, reject) => {
+            const waiter = { resolve, onExpire };
+            waiter.timer = setTimeout(() => {
+                const position = waiters.indexOf(waiter);
+                if (position !== -1) waiters.splice(position, 1);
+                timeouts++;
+                reject(Object.assign(
+                    new Error(`Timed out after ${waitTimeoutMs}ms waiting for the SQLite writer lock`),
+                    { code: 'SQLITE_WRITER_TIMEOUT' }
+                ));
+            }, waitTimeoutMs);
+            waiters.push(waiter);
+        });
+    };
+
+    const stats = () => ({ held, waiting: waiters.length, timeouts });
+
+    return { acquire, stats };
+};
+
+const isWrite = (sql, options) => {
+    if (options && WRITE_QUERY_TYPES.includes(options.type)) return true;
+    if (options && options.type && options.type !== 'RAW') return false;
+    const text = typeof sql === 'string' ? sql : (sql && sql.query) || '';
+    return WRITE_STATEMENT.test(text);
+};
+
+let writerQueue = null;
+
+/**
+ * Apply the SQLite profile to a Sequelize instance
+ * @param {Object} sequelize - Sequelize instance (sqlite dialect)
+ * @param {Object} config - Environment config ({ pragmas, writeQueue })
+ */
+const applySqliteProfile = (sequelize, config) => {
+    const pragmas = Object.entries(config.pragmas || {})
+        .map(([name, value]) => `PRAGMA ${name} = ${value};`)
+        .join(' ');
+
+    // sqlite has no afterConnect hook; every connection (default and one per transaction) is configured on first use
+    const connectionManager = sequelize.connectionManager;
+    const getConnection = connectionManager.getConnection.bind(connectionManager);
+    const configured = new WeakSet();
+    connectionManager.getConnection = async (options) => {
+        const connection = await getConnection(options);
+        if (pragmas && !configured.has(connection)) {
+            configured.add(connection);
+            await new Promise((resolve, reject) => {
+                connection.exec(pragmas, err => (err ? reject(err) : resolve()));
+            });
+        }
+        return connection;
+    };
+
+    if (config.writeQueue === false) return;
+    writerQueue = createWriterQueue(config.writeQueue);
+
+    // Transactions hold the writer lock from BEGIN until commit/rollback. Taking it only at the first write
+    // would let a transaction read an old WAL snapshot and then fail with SQLITE_BUSY_SNAPSHOT when it writes,
+    // so only transactions opened with { readOnly: true } skip the queue.
+    const transaction = sequelize.transaction.bind(sequelize);
+    sequelize.transaction = async (options, autoCallback) => {
+        if (typeof options === 'function') {
+            autoCallback = options;
+            options = undefined;
+        }
+        if (options && options.readOnly) return transaction(options, autoCallback);
+
+        if (autoCallback) {
+            const release = await writerQueue.acquire();
+            try {
+                return await transaction(options, autoCallback);
+            } finally {
+                release();
+            }
+        }
+
+        // an unmanaged transaction that is never committed or rolled back is rolled back when its lease runs out
+        let t;
+        const release = await writerQueue.acquire(() => {
+            if (!t) return release();
+            t.rollback().catch(err => console.error('Error rolling back expired SQLite transaction:', err));
+        });
+        try {
+            t = await transaction(options);
+        } catch (err) {
+            release();
+            throw err;
+        }
+        for (const method of ['commit', 'rollback']) {
+            const original = t[method].bind(t);
+            t[method] = async (...args) => {
+                try {
+                    return await original(...args);
+                } finally {
+                    release();
+                }
+            };
+        }
+        return t;
+    };
+
+    // Writes outside a transaction queue behind the current writer; reads and transactional queries run directly
+    const query = sequelize.query.bind(sequelize);
+    sequelize.query = async (sql, options) => {
+        if ((options && options.transaction) || !isWrite(sql, options)) {
+            return query(sql, options);
+        }
+        const release = await writerQueue.acquire();
+        try {
+            return await query(sql, options);
+        } finally {
+            release();
+        }
+    };
+};
+
+/**
+ * Writer queue state, for monitoring
+ * @returns {Object|null} - { held, waiting, timeouts } or null when the queue is not enabled
+ */
+const getWriterQueueStats = () => (writerQueue ? writerQueue.stats() : null);
+
+module.exports = {
+    applySqliteProfile,
+    getWriterQueueStats
+};
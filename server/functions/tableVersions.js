@@ -0,0 +1,138 @@
+// Table versions - per-table write counters used as HTTP validators for cached reads
+const cluster = require('cluster');
+const crypto = require('crypto');
+const { sequelize } = require('../models');
+
+// Restarting the server (or editing the database while it is down) must never revalidate old ETags.
+// In cluster mode the primary hands every worker the same epoch, so any worker can answer a conditional GET:
+// the workers start together and count the same (relayed) writes. When a worker is restarted its counters
+// start again from zero, so the primary moves everyone to a new epoch and the workers reset their counters.
+let epoch = process.env.TABLE_VERSIONS_EPOCH || Date.now().toString(36);
+
+const versions = new Map();     // table name -> write counter
+const remoteWriteListeners = [];
+
+const increment = (table) => {
+    versions.set(table, (versions.get(table) || 0) + 1);
+};
+
+const tableNameOf = (modelOrInstance) => {
+    if (!modelOrInstance) return null;
+    const model = modelOrInstance.constructor && modelOrInstance.constructor.rawAttributes
+        ? modelOrInstance.constructor
+        : modelOrInstance;
+    return model.name || null;
+};
+
+/**
+ * Record a write to a table (call this after raw SQL writes, which do not run model hooks)
+ * @param {string} table - Model/table name, e.g. 'PRODUCTS'
+ */
+const bumpTableVersion = (table) => {
+    if (!table) return;
+    increment(table);
+    // other workers share the database, so they must see the write too (relayed by the primary)
+    if (cluster.isWorker && process.connected) {
+        process.send({ type: 'tableVersions:bump', broadcast: true, table });
+    }
+};
+
+if (cluster.isWorker) {
+    process.on('message', (message) => {
+        if (message && message.type === 'tableVersions:epoch') {
+            epoch = message.epoch;
+            versions.clear();
+            return;
+        }
+        if (!message || message.type !== 'tableVersions:bump') return;
+        increment(message.table);
+        for (const listener of remoteWriteListeners) {
+            listener(message.table);
+        }
+    });
+}
+
+/**
+ * Register a listener for writes made by other cluster workers (for in-process caches)
+ * @param {Function} listener - (table) => void
+ */
+const onRemoteTableWrite = (listener) => {
+    remoteWriteListeners.push(listener);
+};
+
+// Writes inside a transaction are bumped again on commit, so a read that ran between the
+// write and the commit (and cached the old rows under the new version) is invalidated
+const bumpAfterWrite = (table, options) => {
+    bumpTableVersion(table);
+    if (options && options.transaction && typeof options.transaction.afterCommit === 'function') {
+        options.transaction.afterCommit(() => bumpTableVersion(table));
+    }
+};
+
+// Universal hooks: they run for every model, including ones defined later
+for (const hook of ['afterCreate', 'afterUpdate', 'afterDestroy', 'afterUpsert']) {
+    sequelize.addHook(hook, 'tableVersions', (instance, options) => {
+        const target = Array.isArray(instance) ? instance[0] : instance;
+        bumpAfterWrite(tableNameOf(target) || tableNameOf(options && options.model), options);
+    });
+}
+sequelize.addHook('afterBulkCreate', 'tableVersions', (instances, options) => {
+    bumpAfterWrite(tableNameOf(options.model) || tableNameOf(instances[0]), options);
+});
+for (const hook of ['afterBulkUpdate', 'afterBulkDestroy']) {
+    sequelize.addHook(hook, 'tableVersions', (options) => {
+        bumpAfterWrite(tableNameOf(options.model), options);
+    });
+}
+
+/**
+ * Current version string for a set of tables
+ * @param {Array} tables - Table names
+ * @returns {string}
+ */
+const getTableVersions = (tables) => tables.map(table => `${table}:${versions.get(table) || 0}`).join(',');
+
+/**
+ * Middleware answering conditional GETs from table versions, before the route touches the database.
+ * The ETag covers the boot epoch, the versions of the tables the route reads, the URL and
+ * (for per-user responses) the Authorization header.
+ * @param {Object} options - { tables: Array, cacheControl: string, varyByAuth: boolean }
+ * @returns {Function} - Express middleware
+ */
+const versionedCache = ({ tables = [], cacheControl = 'no-cache', varyByAuth = false }) => (req, res, next) => {
+    if (req.method !== 'GET' && req.method !== 'HEAD') return next();
+
+    const authorization = varyByAuth ? (req.headers['authorization'] || '') : '';
+    const etag = '"' + crypto.createHash('sha1')
+        .update(`${epoch}|${getTableVersions(tables)}|${req.originalUrl}|${authorization}`)
+        .digest('base64url') + '"';
+
+    const ifNoneMatch = req.headers['if-none-match'];
+    if (ifNoneMatch && ifNoneMatch.split(',').some(tag => tag.trim().replace(/^W\//, '') === etag)) {
+        res.set({ 'ETag': etag, 'Cache-Control': cacheControl });
+        if (varyByAuth) res.vary('Authorization');
+        return res.status(304).end();
+    }
+
+    // Only successful responses carry the validator; errors must not be revalidated later
+    const writeHead = res.writeHead;
+    res.writeHead = function (...args) {
+        const statusCode = typeof args[0] === 'number' ? args[0] : res.statusCode;
+        if ((statusCode < 200 || statusCode >= 300) && statusCode !== 304) {
+            res.removeHeader('ETag');
+            res.setHeader('Cache-Control', 'no-store');
+        }
+        return writeHead.apply(this, args);
+    };
+
+    res.set({ 'ETag': etag, 'Cache-Control': cacheControl });
+    if (varyByAuth) res.vary('Authorization');
+    next();
+};
+
+module.exports = {
+    bumpTableVersion,
+    onRemoteTableWrite,
+    getTableVersions,
+    versionedCache
+};
@@ -0,0 +1,248 @@
+// Username search index - prefix and substring lookups for the contact dialogs
+const { USERS } = require('../models');
+const { onRemoteTableWrite } = require('./tableVersions');
+
+const RESULT_ATTRIBUTES = ['UserID', 'Username', 'FirstName', 'LastName', 'UserAuth'];
+const QUERY_CACHE_SIZE = 500;
+const QUERY_CACHE_TTL_MS = 30 * 1000;
+
+let usersById = new Map();      // UserID -> { UserID, Username, FirstName, LastName, UserAuth }
+let sortedNames = [];           // [{ key, id }] sorted by lower-cased username, for prefix range scans
+let trigrams = new Map();       // trigram -> Set of UserIDs, for substring lookups
+let ready = false;
+let stale = false;
+let building = null;
+let generation = 0;             // bumped on every change so cached queries never outlive the data
+
+const queryCache = new Map();   // insertion ordered, used as an LRU
+
+const normalize = (value) => String(value || '').trim().toLowerCase();
+
+const gramsOf = (key) => {
+    const grams = new Set();
+    for (let i = 0; i + 3 <= key.length; i++) {
+        grams.add(key.slice(i, i + 3));
+    }
+    return grams;
+};
+
+// Index of the first entry whose key is >= the given key
+const lowerBound = (key) => {
+    let lo = 0;
+    let hi = sortedNames.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (sortedNames[mid].key < key) lo = mid + 1;
+        else hi = mid;
+    }
+    return lo;
+};
+
+const addToIndex = (user) => {
+    const record = {};
+    for (const attribute of RESULT_ATTRIBUTES) record[attribute] = user[attribute];
+    const key = normalize(record.Username);
+
+    usersById.set(record.UserID, record);
+    sortedNames.splice(lowerBound(key), 0, { key, id: record.UserID });
+    for (const gram of gramsOf(key)) {
+        if (!trigrams.has(gram)) trigrams.set(gram, new Set());
+        trigrams.get(gram).add(record.UserID);
+    }
+};
+
+const removeFromIndex = (userId) => {
+    const record = usersById.get(userId);
+    if (!record) return;
+    const key = normalize(record.Username);
+
+    usersById.delete(userId);
+    for (let i = lowerBound(key); i < sortedNames.length && sortedNames[i].key === key; i++) {
+        if (sortedNames[i].id === userId) {
+            sortedNames.splice(i, 1);
+            break;
+        }
+    }
+    for (const gram of gramsOf(key)) {
+        const ids = trigrams.get(gram);
+        if (!ids) continue;
+        ids.delete(userId);
+        if (ids.size === 0) trigrams.delete(gram);
+    }
+};
+
+/**
+ * Load every user into the index (one query)
+ */
+const rebuildUserSearchIndex = async () => {
+    const startGeneration = generation;
+    const users = await USERS.findAll({ attributes: RESULT_ATTRIBUTES, raw: true });
+
+    usersById = new Map();
+    sortedNames = [];
+    trigrams = new Map();
+    for (const user of users) {
+        const key = normalize(user.Username);
+        usersById.set(user.UserID, user);
+        sortedNames.push({ key, id: user.UserID });
+        for (const gram of gramsOf(key)) {
+            if (!trigrams.has(gram)) trigrams.set(gram, new Set());
+            trigrams.get(gram).add(user.UserID);
+        }
+    }
+    sortedNames.sort((a, b) => (a.key < b.key ? -1 : a.key > b.key ? 1 : a.id - b.id));
+
+    // a change made while the query ran may be missing from its results - ensureReady goes round again
+    const changed = generation !== startGeneration;
+    generation++;
+    queryCache.clear();
+    ready = true;
+    stale = changed;
+};
+
+const ensureReady = async () => {
+    while (!ready || stale) {
+        if (!building) {
+            building = rebuildUserSearchIndex().finally(() => { building = null; });
+        }
+        await building;
+    }
+};
+
+const invalidate = () => {
+    generation++;
+    queryCache.clear();
+};
+
+// Candidate UserIDs whose username contains the term
+const substringCandidates = (term) => {
+    if (term.length < 3) {
+        // too short for trigrams - a scan of the in-memory name list is still cheap
+        return sortedNames.filter(entry => entry.key.includes(term)).map(entry => entry.id);
+    }
+    const postingLists = [...gramsOf(term)].map(gram => trigrams.get(gram));
+    if (postingLists.some(ids => !ids)) return [];
+    postingLists.sort((a, b) => a.size - b.size);
+    const [smallest, ...rest] = postingLists;
+    const candidates = [];
+    for (const id of smallest) {
+        if (rest.every(ids => ids.has(id)) && normalize(usersById.get(id).Username).includes(term)) {
+            candidates.push(id);
+        }
+    }
+    return candidates;
+};
+
+// Prefix matches first (alphabetical), then the remaining substring matches (alphabetical)
+const rankMatches = (ids, term) => {
+    return ids
+        .map(id => usersById.get(id))
+        .filter(Boolean)
+        .map(user => ({ user, key: normalize(user.Username) }))
+        .sort((a, b) => {
+            const aPrefix = a.key.startsWith(term);
+            const bPrefix = b.key.startsWith(term);
+            if (aPrefix !== bPrefix) return aPrefix ? -1 : 1;
+            return a.key < b.key ? -1 : a.key > b.key ? 1 : a.user.UserID - b.user.UserID;
+        })
+        .map(entry => entry.user);
+};
+
+const cacheGet = (key) => {
+    const entry = queryCache.get(key);
+    if (!entry) return null;
+    if (entry.expiresAt < Date.now()) {
+        queryCache.delete(key);
+        return null;
+    }
+    // refresh LRU position
+    queryCache.delete(key);
+    queryCache.set(key, entry);
+    return entry;
+};
+
+const cacheSet = (key, value) => {
+    queryCache.set(key, { ...value, expiresAt: Date.now() + QUERY_CACHE_TTL_MS });
+    while (queryCache.size > QUERY_CACHE_SIZE) {
+        queryCache.delete(queryCache.keys().next().value);
+    }
+};
+
+/**
+ * Search users by username (case-insensitive, prefix matches ranked first)
+ * @param {string} term - Search term typed by the user
+ * @param {Object} options - { allowedRoles: Array|null, excludeUserId: number, limit: number }
+ * @returns {Array} - Matching users ({ UserID, Username, FirstName, LastName, UserAuth })
+ */
+const searchUsers = async (term, { allowedRoles = null, excludeUserId = null, limit = 10 } = {}) => {
+    await ensureReady();
+
+    const normalizedTerm = normalize(term);
+    const scope = `${generation}|${allowedRoles ? allowedRoles.join(',') : '*'}|${excludeUserId}|${limit}`;
+
+    const cached = cacheGet(`${scope}|${normalizedTerm}`);
+    if (cached) return cached.users;
+
+    const accepts = (user) =>
+        user.UserID !== excludeUserId && (!allowedRoles || allowedRoles.includes(user.UserAuth));
+
+    // Typeahead: when a shorter prefix of this term already returned its complete result set,
+    // the matches for this term are a subset of it and can be filtered without touching the index.
+    let candidateIds = null;
+    for (let length = normalizedTerm.length - 1; length > 0; length--) {
+        const previous = cacheGet(`${scope}|${normalizedTerm.slice(0, length)}`);
+        if (previous && previous.complete) {
+            candidateIds = previous.users
+                .filter(user => normalize(user.Username).includes(normalizedTerm))
+                .map(user => user.UserID);
+            break;
+        }
+    }
+    if (!candidateIds) {
+        candidateIds = substringCandidates(normalizedTerm);
+    }
+
+    const matches = rankMatches(candidateIds, normalizedTerm).filter(accepts);
+    const users = matches.slice(0, limit).map(user => ({ ...user }));
+
+    cacheSet(`${scope}|${normalizedTerm}`, { users, complete: matches.length <= limit });
+    return users;
+};
+
+// Keep the index current on signup, profile changes and role changes
+const onUserSaved = (user) => {
+    if (building) return markStale();
+    if (!ready) return;
+    removeFromIndex(user.UserID);
+    addToIndex(user);
+    invalidate();
+};
+
+const onUserDestroyed = (user) => {
+    if (building) return markStale();
+    if (!ready) return;
+    removeFromIndex(user.UserID);
+    invalidate();
+};
+
+const markStale = () => {
+    stale = true;
+    invalidate();
+};
+
+USERS.addHook('afterCreate', 'userSearchIndex', onUserSaved);
+USERS.addHook('afterUpdate', 'userSearchIndex', onUserSaved);
+USERS.addHook('afterDestroy', 'userSearchIndex', onUserDestroyed);
+USERS.addHook('afterBulkCreate', 'userSearchIndex', markStale);
+USERS.addHook('afterBulkUpdate', 'userSearchIndex', markStale);
+USERS.addHook('afterBulkDestroy', 'userSearchIndex', markStale);
+
+// Signups and profile changes handled by other cluster workers
+onRemoteTableWrite(table => {
+    if (table === 'USERS') markStale();
+});
+
+module.exports = {
+    searchUsers,
+    rebuildUserSearchIndex
+};
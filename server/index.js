@@ -2,7 +2,11 @@
 require('dotenv').config();
 const express = require('express');
 const app = express();
+const cluster = require('cluster');
 const cors = require('cors');
+const { compressResponses } = require('./functions/compression');
+const { metricsMiddleware, metricsHandler } = require('./functions/metrics');
+const { isClusterPrimary, runsScheduledTasks, startClusterPrimary } = require('./functions/cluster');
 
 
 const port = process.env.PORT;
@@ -11,10 +15,18 @@ const frontend_ip = process.env.FRONTEND_IP;
 const server_ip = process.env.BACKEND_IP;
 
 const db = require('./models');
+const { runMigrations, runSeedHooks } = require('./functions/migrate');
+const { startCatalogSnapshot } = require('./functions/catalogSnapshot');
+const { instrumentQueries, trackRequestQueries } = require('./functions/queryInstrumentation');
 
+// Time every query: slow statements are logged (SLOW_QUERY_MS, default 200) with string literals redacted
+instrumentQueries(db.sequelize);
 
-// Import scheduled tasks
-require('./functions/scheduled_tasks/scheduledTasks');
+
+// Import scheduled tasks (in cluster mode only one worker runs them)
+if (runsScheduledTasks()) {
+  require('./functions/scheduled_tasks/scheduledTasks');
+}
 
 
 // Import Routes
@@ -30,6 +42,14 @@ const webhookRoute = require('./routes/webhook');
 const profileRoute = require('./routes/profile');
 const promoRoute = require('./routes/promo');
 const communicationRoute = require('./routes/communication');
+const sellersRoute = require('./routes/sellers');
+
+// Request counts, latency and in-flight requests per route, exposed on GET /metrics
+app.use(metricsMiddleware());
+app.get('/metrics', metricsHandler);
+
+// Attribute queries to the request that issued them; DB_DEBUG_HEADERS=true adds X-DB-Queries / X-DB-Time
+app.use(trackRequestQueries({ debugHeaders: process.env.DB_DEBUG_HEADERS === 'true' }));
 
 // Middleware to parse incoming JSON requests
 app.use(express.json({
@@ -45,6 +65,9 @@ app.use(cors({
   credentials: true // Enable credentials to be passed along (optional)
 }));
 
+// Compress JSON/text responses above 1KB (gzip or brotli, negotiated per request)
+app.use(compressResponses({ threshold: 1024 }));
+
 // Use imported route middlewares
 app.use('/signup', signupRoute);
 app.use('/login', loginRoute);
@@ -58,6 +81,7 @@ app.use('/webhook', webhookRoute);
 app.use('/profile', profileRoute);
 app.use('/promo', promoRoute);
 app.use('/communication', communicationRoute);
+app.use('/sellers', sellersRoute);
 
 
 // Handle unknown routes
@@ -67,8 +91,23 @@ app.use((req, res) => {
 
 
 
-// Start the server with error handling
-db.sequelize.sync().then(() => {
+// Schema: production applies the versioned migrations only (no sync() introspection of every table
+// at boot) and then runs the seed hooks; other environments keep sync() for new models, then migrate.
+const env = process.env.NODE_ENV || 'test';
+const prepareDatabase = async () => {
+  if (env.startsWith('production')) {
+    await runMigrations(db.sequelize);
+    await runSeedHooks(db);
+  } else {
+    await db.sequelize.sync();
+    await runMigrations(db.sequelize);
+  }
+};
+
+const startServer = async () => {
+
+  // Optional in-memory catalog for the product/category reads (CATALOG_SNAPSHOT=true)
+  await startCatalogSnapshot();
 
   app.listen(port, server_ip, (err) => {
     if (err) {
@@ -78,5 +117,21 @@ db.sequelize.sync().then(() => {
     }
   });
 
+};
+
+// Start the server with error handling. In cluster mode (CLUSTER_WORKERS=n) the primary prepares
+// the database once and forks the workers; the workers go straight to serving requests.
+let startup;
+if (isClusterPrimary()) {
+  startup = prepareDatabase().then(() => startClusterPrimary());
+} else if (cluster.isWorker) {
+  startup = startServer();
+} else {
+  startup = prepareDatabase().then(startServer);
+}
+
+startup.catch(err => {
+  console.error('Failed to prepare the database:', err);
+  process.exit(1);
 });
 
@@ -0,0 +1,28 @@
+'use strict';
+
+// Baseline: create any table that does not exist yet from the model definitions.
+// Databases created by the old sync() at boot already have every table and are left as they are.
+// Later schema changes go into their own migrations.
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface) {
+    const db = require('../models');
+    const existing = await queryInterface.showAllTables();
+
+    // forEachModel visits models in foreign key order (referenced tables first)
+    const models = [];
+    db.sequelize.modelManager.forEachModel(model => models.push(model));
+
+    for (const model of models) {
+      if (!existing.includes(model.getTableName())) {
+        // seed hooks run separately once all migrations have been applied
+        await model.sync({ hooks: false });
+      }
+    }
+  },
+
+  async down() {
+    // the baseline is not reversible; dropping it would drop every table
+  }
+};
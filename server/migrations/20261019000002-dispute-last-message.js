@@ -0,0 +1,36 @@
+'use strict';
+
+// DISPUTE.LastMessageID / LastMessageAt, maintained by the DISPUTE_MSG afterCreate hook for the inbox listing
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface, Sequelize) {
+    const columns = await queryInterface.describeTable('DISPUTE');
+    if (!columns.LastMessageID) {
+      await queryInterface.addColumn('DISPUTE', 'LastMessageID', { type: Sequelize.INTEGER, allowNull: true });
+    }
+    if (!columns.LastMessageAt) {
+      await queryInterface.addColumn('DISPUTE', 'LastMessageAt', { type: Sequelize.DATE, allowNull: true });
+    }
+
+    // Backfill from the messages already stored
+    await queryInterface.sequelize.query(`
+      UPDATE DISPUTE SET LastMessageID = (
+        SELECT m.MessageID FROM DISPUTE_MSG m
+        WHERE m.DisputeID = DISPUTE.DisputeID
+        ORDER BY m.MsgDate DESC, m.MessageID DESC
+        LIMIT 1
+      )
+    `);
+    await queryInterface.sequelize.query(`
+      UPDATE DISPUTE SET LastMessageAt = (
+        SELECT m.MsgDate FROM DISPUTE_MSG m WHERE m.MessageID = DISPUTE.LastMessageID
+      )
+    `);
+  },
+
+  async down(queryInterface) {
+    await queryInterface.removeColumn('DISPUTE', 'LastMessageAt');
+    await queryInterface.removeColumn('DISPUTE', 'LastMessageID');
+  }
+};
@@ -0,0 +1,33 @@
+'use strict';
+
+const { addIndexIfMissing, removeIndexIfExists } = require('../functions/migrate');
+
+// Secondary indexes for the hot queries. Indexes already covered by an existing one with the same
+// leading columns are skipped - CART(UserID, ProductID) is the table's primary key, for instance.
+const INDEXES = [
+  { table: 'PRODUCT_VIEWS', fields: ['ProductID', 'ViewedAt'], name: 'idx_product_views_product_viewed' },  // view stats, popular products
+  { table: 'PRODUCT_VIEWS', fields: ['UserID'], name: 'idx_product_views_user' },                           // recommendations
+  { table: 'CART', fields: ['UserID', 'ProductID'], name: 'idx_cart_user_product' },                        // cart by user
+  { table: 'TRANSACTIONS', fields: ['UserID', 'TransactionState'], name: 'idx_transactions_user_state' },   // orders by user and state
+  { table: 'DISPUTE_MSG', fields: ['DisputeID', 'MsgDate'], name: 'idx_dispute_msg_dispute_date' },         // conversation messages, unread counts
+  { table: 'DISPUTE', fields: ['LodgedBy'], name: 'idx_dispute_lodged_by' },
+  { table: 'DISPUTE', fields: ['LodgedAgainst'], name: 'idx_dispute_lodged_against' },
+  { table: 'DISPUTE', fields: ['HandledBy'], name: 'idx_dispute_handled_by' },
+  { table: 'REPORT', fields: ['AssignedAdminID', 'Status'], name: 'idx_report_admin_status' },              // admin report queue
+  { table: 'PRODUCTS', fields: ['CategoryID', 'ProdStatus'], name: 'idx_products_category_status' }         // category listings
+];
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface) {
+    for (const { table, fields, name } of INDEXES) {
+      await addIndexIfMissing(queryInterface, table, fields, name);
+    }
+  },
+
+  async down(queryInterface) {
+    for (const { table, name } of INDEXES) {
+      await removeIndexIfExists(queryInterface, table, name);
+    }
+  }
+};
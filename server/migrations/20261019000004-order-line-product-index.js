@@ -0,0 +1,24 @@
+'use strict';
+
+const { addIndexIfMissing, removeIndexIfExists } = require('../functions/migrate');
+
+// Seller orders join order lines to the seller's products; without this index
+// the query plan check finds a full scan of PRODUCT_TRANSACTION_INFO
+const INDEXES = [
+  { table: 'PRODUCT_TRANSACTION_INFO', fields: ['ProductID'], name: 'idx_product_transaction_info_product' }
+];
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface) {
+    for (const { table, fields, name } of INDEXES) {
+      await addIndexIfMissing(queryInterface, table, fields, name);
+    }
+  },
+
+  async down(queryInterface) {
+    for (const { table, name } of INDEXES) {
+      await removeIndexIfExists(queryInterface, table, name);
+    }
+  }
+};
@@ -0,0 +1,28 @@
+'use strict';
+
+// PRODUCT_DAILY_STATS / SELLER_DAILY_STATS for the seller dashboard summary, backfilled from the
+// views and approved transactions already stored. From here on functions/sellerStats.js keeps them up to date.
+
+const { addIndexIfMissing } = require('../functions/migrate');
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface) {
+    const db = require('../models');
+    const existing = await queryInterface.showAllTables();
+
+    for (const model of [db.PRODUCT_DAILY_STATS, db.SELLER_DAILY_STATS]) {
+      if (!existing.includes(model.getTableName())) {
+        await model.sync({ hooks: false });
+      }
+    }
+    await addIndexIfMissing(queryInterface, 'PRODUCT_DAILY_STATS', ['SellerID', 'StatDate'], 'idx_product_daily_stats_seller_date');
+
+    await require('../functions/sellerStats').rebuildSellerStats();
+  },
+
+  async down(queryInterface) {
+    await queryInterface.dropTable('SELLER_DAILY_STATS');
+    await queryInterface.dropTable('PRODUCT_DAILY_STATS');
+  }
+};
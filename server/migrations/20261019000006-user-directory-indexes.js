@@ -0,0 +1,27 @@
+'use strict';
+
+const { addIndexIfMissing, removeIndexIfExists } = require('../functions/migrate');
+
+// Admin user directory. The UNIQUE indexes on Username and Email use the default (BINARY) collation, which
+// SQLite cannot use for a case-insensitive LIKE 'prefix%'; NOCASE copies of them turn the search into a range scan.
+// (UserAuth, AccountState) answers the role / state filters and the total count from the index alone.
+const INDEXES = [
+  { table: 'USERS', fields: [{ name: 'Username', collate: 'NOCASE' }], name: 'idx_users_username_nocase' },
+  { table: 'USERS', fields: [{ name: 'Email', collate: 'NOCASE' }], name: 'idx_users_email_nocase' },
+  { table: 'USERS', fields: ['UserAuth', 'AccountState'], name: 'idx_users_auth_state' }
+];
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface) {
+    for (const { table, fields, name } of INDEXES) {
+      await addIndexIfMissing(queryInterface, table, fields, name);
+    }
+  },
+
+  async down(queryInterface) {
+    for (const { table, name } of INDEXES) {
+      await removeIndexIfExists(queryInterface, table, name);
+    }
+  }
+};
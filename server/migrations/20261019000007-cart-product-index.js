@@ -0,0 +1,24 @@
+'use strict';
+
+const { addIndexIfMissing, removeIndexIfExists } = require('../functions/migrate');
+
+// Suspending an account (and deactivating products) removes the products from every cart;
+// CART's primary key starts with UserID, so without this index each of those deletes scans CART
+const INDEXES = [
+  { table: 'CART', fields: ['ProductID'], name: 'idx_cart_product' }
+];
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface) {
+    for (const { table, fields, name } of INDEXES) {
+      await addIndexIfMissing(queryInterface, table, fields, name);
+    }
+  },
+
+  async down(queryInterface) {
+    for (const { table, name } of INDEXES) {
+      await removeIndexIfExists(queryInterface, table, name);
+    }
+  }
+};
@@ -0,0 +1,35 @@
+'use strict';
+
+const { addIndexIfMissing, removeIndexIfExists } = require('../functions/migrate');
+
+// SELLER_INFO.SubmittedAt for the admin review queue. Applications stored before it existed get the
+// migration time; the queue breaks ties on UserID, so they keep their sign-up order.
+// With UserID as the rowid, (IsVerified, SubmittedAt) holds each status' queue already in order.
+const INDEXES = [
+  { table: 'SELLER_INFO', fields: ['IsVerified', 'SubmittedAt'], name: 'idx_seller_info_status_submitted' }
+];
+
+/** @type {import('sequelize-cli').Migration} */
+module.exports = {
+  async up(queryInterface, Sequelize) {
+    const columns = await queryInterface.describeTable('SELLER_INFO');
+    if (!columns.SubmittedAt) {
+      await queryInterface.addColumn('SELLER_INFO', 'SubmittedAt', { type: Sequelize.DATE, allowNull: true });
+    }
+
+    await queryInterface.sequelize.query('UPDATE SELLER_INFO SET SubmittedAt = :now WHERE SubmittedAt IS NULL', {
+      replacements: { now: new Date().toISOString().replace('T', ' ').replace('Z', ' +00:00') }
+    });
+
+    for (const { table, fields, name } of INDEXES) {
+      await addIndexIfMissing(queryInterface, table, fields, name);
+    }
+  },
+
+  async down(queryInterface) {
+    for (const { table, name } of INDEXES) {
+      await removeIndexIfExists(queryInterface, table, name);
+    }
+    await queryInterface.removeColumn('SELLER_INFO', 'SubmittedAt');
+  }
+};
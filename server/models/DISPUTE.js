@@ -63,6 +63,17 @@ module.exports = (sequelize, DataTypes) => {
         ResolvedAt: {
             type: DataTypes.DATE,
             allowNull: true,
+        },
+
+        // Maintained by DISPUTE_MSG afterCreate so inbox listings need no per-thread lookups
+        LastMessageID: {
+            type: DataTypes.INTEGER,
+            allowNull: true,
+        },
+
+        LastMessageAt: {
+            type: DataTypes.DATE,
+            allowNull: true,
         }
 
     }, {freezeTableName: true, timestamps: false});
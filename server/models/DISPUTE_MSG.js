@@ -1,5 +1,4 @@
-
-
+const { Op } = require('sequelize');
 
 module.exports = (sequelize, DataTypes) => {
 
@@ -45,7 +44,28 @@ module.exports = (sequelize, DataTypes) => {
             defaultValue: false
         }
 
-    }, {freezeTableName: true, timestamps: false});
+    }, {freezeTableName: true,
+        timestamps: false,
+        hooks: {
+                    afterCreate: async (message, options) => {
+                        // keep the thread's last-message pointer current for the inbox
+                        const { DISPUTE } = sequelize.models;
+                        await DISPUTE.update(
+                            { LastMessageID: message.MessageID, LastMessageAt: message.MsgDate },
+                            {
+                                where: {
+                                    DisputeID: message.DisputeID,
+                                    [Op.or]: [
+                                        { LastMessageAt: null },
+                                        { LastMessageAt: { [Op.lte]: message.MsgDate } }
+                                    ]
+                                },
+                                transaction: options.transaction
+                            }
+                        );
+                    }
+                }
+        });
     
 
     DISPUTE_MSG.associate = models => {
@@ -0,0 +1,60 @@
+// PRODUCT_DAILY_STATS model - Views and approved sales per product per day (UTC), for the seller dashboard
+// Maintained incrementally by functions/sellerStats.js; SELLER_DAILY_STATS holds the per-seller totals.
+module.exports = (sequelize, DataTypes) => {
+
+    const PRODUCT_DAILY_STATS = sequelize.define('PRODUCT_DAILY_STATS', {
+
+        ProductID: {
+            type: DataTypes.INTEGER,
+            primaryKey: true,
+            allowNull: false,
+        },
+
+        StatDate: {
+            type: DataTypes.DATEONLY,
+            primaryKey: true,
+            allowNull: false,
+        },
+
+        SellerID: {
+            type: DataTypes.INTEGER,
+            allowNull: false,
+        },
+
+        Views: {
+            type: DataTypes.INTEGER,
+            allowNull: false,
+            defaultValue: 0,
+        },
+
+        UnitsSold: {
+            type: DataTypes.INTEGER,
+            allowNull: false,
+            defaultValue: 0,
+        },
+
+        Revenue: {
+            type: DataTypes.REAL,
+            allowNull: false,
+            defaultValue: 0,
+        },
+
+        // approved transactions containing the product
+        Orders: {
+            type: DataTypes.INTEGER,
+            allowNull: false,
+            defaultValue: 0,
+        }
+
+    }, {indexes: [{name: 'idx_product_daily_stats_seller_date', fields: ['SellerID', 'StatDate']}], freezeTableName: true, timestamps: false});
+
+    PRODUCT_DAILY_STATS.associate = models => {
+
+        PRODUCT_DAILY_STATS.belongsTo(models.PRODUCTS, {
+            targetKey: 'ProductID',
+            foreignKey: 'ProductID'
+        });
+    };
+
+    return PRODUCT_DAILY_STATS;
+};
@@ -0,0 +1,54 @@
+// SELLER_DAILY_STATS model - Views and approved sales per seller per day (UTC), for the seller dashboard
+// Orders counts each transaction once even when it holds several of the seller's products.
+module.exports = (sequelize, DataTypes) => {
+
+    const SELLER_DAILY_STATS = sequelize.define('SELLER_DAILY_STATS', {
+
+        SellerID: {
+            type: DataTypes.INTEGER,
+            primaryKey: true,
+            allowNull: false,
+        },
+
+        StatDate: {
+            type: DataTypes.DATEONLY,
+            primaryKey: true,
+            allowNull: false,
+        },
+
+        Views: {
+            type: DataTypes.INTEGER,
+            allowNull: false,
+            defaultValue: 0,
+        },
+
+        UnitsSold: {
+            type: DataTypes.INTEGER,
+            allowNull: false,
+            defaultValue: 0,
+        },
+
+        Revenue: {
+            type: DataTypes.REAL,
+            allowNull: false,
+            defaultValue: 0,
+        },
+
+        Orders: {
+            type: DataTypes.INTEGER,
+            allowNull: false,
+            defaultValue: 0,
+        }
+
+    }, {freezeTableName: true, timestamps: false});
+
+    SELLER_DAILY_STATS.associate = models => {
+
+        SELLER_DAILY_STATS.belongsTo(models.USERS, {
+            targetKey: 'UserID',
+            foreignKey: 'SellerID'
+        });
+    };
+
+    return SELLER_DAILY_STATS;
+};
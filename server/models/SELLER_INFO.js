@@ -29,6 +29,13 @@ module.exports = (sequelize, DataTypes) => {
             defaultValue: 'Pending',
         },
 
+        // Orders the admin review queue (oldest application first)
+        SubmittedAt: {
+            type: DataTypes.DATE,
+            allowNull: true,
+            defaultValue: DataTypes.NOW,
+        },
+
 
     }, {freezeTableName: true, timestamps: false});
     
@@ -16,6 +16,11 @@ if (config.use_env_variable) {
   sequelize = new Sequelize(config.database, config.username, config.password, config);
 }
 
+// WAL/pragmas on every connection and a single writer queue for SQLite profiles that define pragmas
+if (config.dialect === 'sqlite' && config.pragmas) {
+  require('../functions/sqliteProfile').applySqliteProfile(sequelize, config);
+}
+
 fs
   .readdirSync(__dirname)
   .filter(file => {
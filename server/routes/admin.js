@@ -2,14 +2,37 @@
 const express = require('express');
 const router = express.Router();
 
-const { USERS, SELLER_INFO } = require('../models');
+const { USERS, SELLER_INFO, sequelize } = require('../models');
 const { Op, where } = require('sequelize');
 const bcrypt = require('bcrypt');
 const { checkAuth } = require('../functions/checkAuth');
+const { applyAccountState } = require('../functions/accountState');
+const { encodeCursor, decodeCursor } = require('../functions/keysetCursor');
+const { compileSerializer, modelSchema, sendSerialized } = require('../functions/serializers');
 
+const serializeUserList = compileSerializer({
+  type: 'array',
+  items: modelSchema(USERS, { include: [{ model: SELLER_INFO }] })
+});
+
+
+
+const USERS_PAGE_SIZE = 25;
+const ACCOUNT_STATES = USERS.rawAttributes.AccountState.values;
+const SELLER_STATUSES = [...SELLER_INFO.rawAttributes.IsVerified.values, 'None'];
+const USER_SORTS = {
+  id: (direction) => `u.UserID ${direction}`,
+  username: (direction) => `u.Username COLLATE NOCASE ${direction}, u.UserID ${direction}`
+};
+
+// LIKE pattern matching values that start with the given text; % and _ typed by the admin match literally
+const prefixPattern = (text) => text.replace(/[\\%_]/g, '\\$&') + '%';
 
 
 // GET route to fetch user and seller accounts (admin/superAdmin only)
+// One page at a time, with the total number of matching accounts.
+// Query: page (default 1), limit (default 25, max 100), search (username or email prefix, case-insensitive),
+// accountState, userAuth, sellerStatus (Pending / Approved / Rejected / None), sort (id / username), order (asc / desc)
 router.get('/users', checkAuth(['SuperAdmin', 'Admin']), async (req, res) => {
   
   const loggedInUser = req.user;
@@ -23,21 +46,72 @@ router.get('/users', checkAuth(['SuperAdmin', 'Admin']), async (req, res) => {
       returnUserAuth = ['User', 'Seller'];
     }
 
-    const users = await USERS.findAll({
-      attributes: ['UserID', 'Username', 'Email', 'FirstName', 'LastName', 'ContactNo', 'UserAuth', 'AccountState'],
-      include: [{
-        model: SELLER_INFO,
-        attributes: ['IsVerified'], // Get seller status
-        required: false // Left join, in case not all users applied as sellers
-    }],
-      where: { UserAuth: {[Op.in]: returnUserAuth} } // Fetch only User and Seller accounts
-    });
+    const page = Math.max(parseInt(req.query.page) || 1, 1);
+    const limit = Math.min(Math.max(parseInt(req.query.limit) || USERS_PAGE_SIZE, 1), 100);
+    const search = String(req.query.search || '').trim();
+    const { accountState, userAuth, sellerStatus, sort = 'id', order = 'asc' } = req.query;
 
-    if (users.length === 0) {
-      return res.status(200).json({ status: 200, message: users });
+    if (accountState && !ACCOUNT_STATES.includes(accountState)) {
+      return res.status(400).json({ status: 400, message: 'Invalid account state' });
+    }
+    if (userAuth && !returnUserAuth.includes(userAuth)) {
+      return res.status(400).json({ status: 400, message: 'Invalid user role' });
+    }
+    if (sellerStatus && !SELLER_STATUSES.includes(sellerStatus)) {
+      return res.status(400).json({ status: 400, message: 'Invalid seller status' });
+    }
+    if (!USER_SORTS[sort] || (order !== 'asc' && order !== 'desc')) {
+      return res.status(400).json({ status: 400, message: 'Invalid sort' });
     }
 
-    res.status(200).json({ status: 200, message: 'Users fetched successfully', data: users });
+    // prefix searches are range scans on the NOCASE indexes of Username and Email
+    const filters = [];
+    if (search) filters.push("(u.Username LIKE :search ESCAPE '\\' OR u.Email LIKE :search ESCAPE '\\')");
+    if (accountState) filters.push('u.AccountState = :accountState');
+    if (sellerStatus === 'None') filters.push('s.UserID IS NULL');
+    else if (sellerStatus) filters.push('s.IsVerified = :sellerStatus');
+
+    // Most accounts are Users, so the role filter narrows little: the unary + keeps SQLite walking UserID or
+    // the name indexes for a page. Only the count without a search reads idx_users_auth_state (covering).
+    const where = (roleIndexed) => [`${roleIndexed ? '' : '+'}u.UserAuth IN (:userAuth)`, ...filters].join(' AND ');
+    const direction = order === 'desc' ? 'DESC' : 'ASC';
+    const replacements = {
+      userAuth: userAuth ? [userAuth] : returnUserAuth,
+      search: prefixPattern(search),
+      accountState: accountState || null,
+      sellerStatus: sellerStatus || null,
+      limit,
+      offset: (page - 1) * limit
+    };
+
+    // the count only joins SELLER_INFO when it filters on it
+    const [rows, [{ total }]] = await Promise.all([
+      sequelize.query(`
+        SELECT u.UserID, u.Username, u.Email, u.FirstName, u.LastName, u.ContactNo, u.UserAuth, u.AccountState,
+               s.UserID AS SellerUserID, s.IsVerified
+        FROM USERS u
+        LEFT JOIN SELLER_INFO s ON s.UserID = u.UserID
+        WHERE ${where(false)}
+        ORDER BY ${USER_SORTS[sort](direction)}
+        LIMIT :limit OFFSET :offset
+      `, { replacements, type: sequelize.QueryTypes.SELECT }),
+      sequelize.query(`
+        SELECT COUNT(*) AS total
+        FROM USERS u
+        ${sellerStatus ? 'LEFT JOIN SELLER_INFO s ON s.UserID = u.UserID' : ''}
+        WHERE ${where(!search)}
+      `, { replacements, type: sequelize.QueryTypes.SELECT })
+    ]);
+
+    // same shape as the USERS + SELLER_INFO include the page was built on
+    const users = rows.map(({ SellerUserID, IsVerified, ...user }) => ({
+      ...user,
+      SELLER_INFO: SellerUserID === null ? null : { IsVerified }
+    }));
+
+    sendSerialized(res, 200, 'Users fetched successfully', serializeUserList, users, {
+      pagination: { page, limit, total, totalPages: Math.ceil(total / limit) }
+    });
   } catch (err) {
     console.log('Error fetching users:', err);
     res.status(400).json({ status: 400, message: `Error fetching users: ${err}` });
@@ -46,6 +120,68 @@ router.get('/users', checkAuth(['SuperAdmin', 'Admin']), async (req, res) => {
 
 
 
+const APPLICATIONS_PAGE_SIZE = 50;
+const MAX_BATCH_APPLICATIONS = 500;
+
+// GET /seller-applications - Seller application review queue (admin/superAdmin only)
+// Oldest application first, keyset-paginated over (SubmittedAt, UserID).
+// Query: status (default Pending), limit (default 50, max 200), cursor (pagination.nextCursor of the previous page)
+router.get('/seller-applications', checkAuth(['SuperAdmin', 'Admin']), async (req, res) => {
+
+  try {
+    const status = req.query.status || 'Pending';
+    const limit = Math.min(Math.max(parseInt(req.query.limit) || APPLICATIONS_PAGE_SIZE, 1), 200);
+
+    if (!SELLER_INFO.rawAttributes.IsVerified.values.includes(status)) {
+      return res.status(400).json({ status: 400, message: 'Invalid application status' });
+    }
+
+    const cursor = req.query.cursor ? decodeCursor(req.query.cursor, ['string', 'number']) : null;
+    if (req.query.cursor && !cursor) {
+      return res.status(400).json({ status: 400, message: 'Invalid cursor' });
+    }
+
+    const rows = await sequelize.query(`
+      SELECT s.UserID, s.ComRegNum, s.ComAddress, s.IsVerified, s.SubmittedAt,
+             u.Username, u.Email, u.FirstName, u.LastName, u.ContactNo, u.UserAuth, u.AccountState
+      FROM SELLER_INFO s
+      JOIN USERS u ON u.UserID = s.UserID
+      WHERE s.IsVerified = :status
+        ${cursor ? 'AND (s.SubmittedAt > :cursorSubmittedAt OR (s.SubmittedAt = :cursorSubmittedAt AND s.UserID > :cursorId))' : ''}
+      ORDER BY s.SubmittedAt ASC, s.UserID ASC
+      LIMIT :limit
+    `, {
+      replacements: {
+        status,
+        limit: limit + 1,
+        cursorSubmittedAt: cursor && cursor[0],
+        cursorId: cursor && cursor[1]
+      },
+      type: sequelize.QueryTypes.SELECT
+    });
+
+    const hasMore = rows.length > limit;
+    const page = hasMore ? rows.slice(0, limit) : rows;
+    const last = page[page.length - 1];
+
+    return res.status(200).json({
+      status: 200,
+      message: 'Seller applications fetched successfully',
+      data: page,
+      pagination: {
+        limit,
+        hasMore,
+        nextCursor: hasMore ? encodeCursor([last.SubmittedAt, last.UserID]) : null
+      }
+    });
+  } catch (err) {
+    console.log('Error fetching seller applications:', err);
+    res.status(401).json({ status: 401, message: `Error fetching seller applications: ${err}` });
+  }
+});
+
+
+
 // GET route to fetch all seller applications info (admin/superAdmin only)
 router.get('/seller_application/:id', checkAuth(['SuperAdmin', 'Admin']), async (req, res) => {
   
@@ -83,6 +219,10 @@ router.patch('/changeAccountStatus', checkAuth(['SuperAdmin', 'Admin']), async (
       return res.status(400).json({ message: 'User ID is required' });
   }
 
+  if (!ACCOUNT_STATES.includes(state)) {
+      return res.status(400).json({ status: 400, message: 'Invalid account state' });
+  }
+
   try {
       const user = await USERS.findOne({ where: { UserID: id } });
 
@@ -98,8 +238,8 @@ router.patch('/changeAccountStatus', checkAuth(['SuperAdmin', 'Admin']), async (
           return res.status(403).json({ status: 403, message: 'Admins cannot suspend other Admin accounts' });
       }
 
-      user.AccountState = state;
-      await user.save();
+      // products and carts follow the account (see functions/accountState.js)
+      await sequelize.transaction(t => applyAccountState([user.UserID], state, { transaction: t }));
 
       if (state === 'Suspended') {
         returnMessage = 'User suspended successfully';
@@ -120,6 +260,76 @@ router.patch('/changeAccountStatus', checkAuth(['SuperAdmin', 'Admin']), async (
 
 
 
+const MAX_BULK_ACCOUNTS = 500;
+
+// PATCH /changeAccountStatus/bulk - Suspend or reactivate many accounts at once (spam waves)
+// body: { ids: [UserID, ...], state: 'Active' | 'Suspended' }
+// One read of the accounts, then set-based updates of USERS, their products and the carts holding those
+// products, all in one transaction. data.results has one entry per ID: updated, unchanged or failed.
+router.patch('/changeAccountStatus/bulk', checkAuth(['SuperAdmin', 'Admin']), async (req, res) => {
+  const { ids, state } = req.body;
+  const adminUser = req.user;
+
+  if (!ACCOUNT_STATES.includes(state)) {
+    return res.status(400).json({ status: 400, message: 'Invalid account state' });
+  }
+  if (!Array.isArray(ids) || ids.length === 0) {
+    return res.status(400).json({ status: 400, message: 'ids must be a non-empty array of user IDs' });
+  }
+  if (ids.length > MAX_BULK_ACCOUNTS) {
+    return res.status(400).json({ status: 400, message: `At most ${MAX_BULK_ACCOUNTS} accounts can be changed at once` });
+  }
+
+  const t = await sequelize.transaction();
+
+  try {
+    const userIDs = new Map(ids.map(id => [String(id), id]));
+    const found = await USERS.findAll({
+      attributes: ['UserID', 'UserAuth', 'AccountState'],
+      where: { UserID: { [Op.in]: [...userIDs.keys()] } },
+      raw: true,
+      transaction: t
+    });
+    const userByID = new Map(found.map(user => [String(user.UserID), user]));
+
+    const results = [];
+    const changeable = [];
+    for (const [key, id] of userIDs) {
+      const user = userByID.get(key);
+      if (!user) {
+        results.push({ userID: id, result: 'failed', message: 'Invalid user ID' });
+      } else if (user.UserID === adminUser.id) {
+        results.push({ userID: id, result: 'failed', message: 'Cannot change the state of your own account' });
+      } else if (user.UserAuth === 'SuperAdmin') {
+        results.push({ userID: id, result: 'failed', message: 'Cannot suspend SuperAdmin accounts' });
+      } else if (adminUser.userAuth === 'Admin' && user.UserAuth === 'Admin') {
+        results.push({ userID: id, result: 'failed', message: 'Admins cannot suspend other Admin accounts' });
+      } else if (user.AccountState === state) {
+        results.push({ userID: id, result: 'unchanged', message: `Account is already ${state}` });
+      } else {
+        results.push({ userID: id, result: 'updated' });
+        changeable.push(user.UserID);
+      }
+    }
+
+    const changed = await applyAccountState(changeable, state, { transaction: t });
+
+    await t.commit();
+
+    return res.status(200).json({
+      status: 200,
+      message: "Account states updated. Please check data to see if any changes failed.",
+      data: { results, products: changed.products, cartItems: changed.cartItems }
+    });
+  } catch (err) {
+    await t.rollback();
+    console.error('Error changing account states:', err);
+    return res.status(404).json({ status: 404, message: `Error changing account states: ${err}` });
+  }
+});
+
+
+
 // PATCH /approve-seller - Approve a seller registration
 router.patch('/approve-seller', checkAuth(['SuperAdmin', 'Admin']), async (req, res) => {
   
@@ -187,6 +397,81 @@ router.patch('/reject-seller', checkAuth(['SuperAdmin', 'Admin']), async (req, r
 
 
 
+// Batch review: one read of the applications, then one SELLER_INFO update and (when approving) one USERS update,
+// in one transaction. Approving accepts Pending and Rejected applications like /approve-seller; rejecting only
+// Pending ones, so an approved seller is never left with a Rejected application.
+// body: { ids: [UserID, ...] }. data has one entry per ID: updated, unchanged or failed.
+const reviewSellerApplications = (decision) => async (req, res) => {
+  const { ids } = req.body;
+
+  if (!Array.isArray(ids) || ids.length === 0) {
+    return res.status(400).json({ status: 400, message: 'ids must be a non-empty array of user IDs' });
+  }
+  if (ids.length > MAX_BATCH_APPLICATIONS) {
+    return res.status(400).json({ status: 400, message: `At most ${MAX_BATCH_APPLICATIONS} applications can be processed at once` });
+  }
+
+  const t = await sequelize.transaction();
+
+  try {
+    const userIDs = new Map(ids.map(id => [String(id), id]));
+    const applications = await sequelize.query(`
+      SELECT s.UserID, s.IsVerified, u.UserID IS NOT NULL AS HasUser
+      FROM SELLER_INFO s
+      LEFT JOIN USERS u ON u.UserID = s.UserID
+      WHERE s.UserID IN (:ids)
+    `, { replacements: { ids: [...userIDs.keys()] }, type: sequelize.QueryTypes.SELECT, transaction: t });
+    const applicationByID = new Map(applications.map(application => [String(application.UserID), application]));
+
+    const results = [];
+    const reviewable = [];
+    for (const [key, id] of userIDs) {
+      const application = applicationByID.get(key);
+      if (!application) {
+        results.push({ userID: id, result: 'failed', message: 'ID not associated with a seller application' });
+      } else if (application.IsVerified === decision) {
+        results.push({ userID: id, result: 'unchanged', message: 'Seller application is already processed' });
+      } else if (decision === 'Rejected' && application.IsVerified !== 'Pending') {
+        results.push({ userID: id, result: 'failed', message: 'Only pending applications can be rejected' });
+      } else if (!application.HasUser) {
+        results.push({ userID: id, result: 'failed', message: 'Database entries inconsistent' });
+      } else {
+        results.push({ userID: id, result: 'updated' });
+        reviewable.push(application.UserID);
+      }
+    }
+
+    if (reviewable.length > 0) {
+      await SELLER_INFO.update({ IsVerified: decision }, { where: { UserID: { [Op.in]: reviewable } }, transaction: t });
+
+      if (decision === 'Approved') {
+        // only plain users become sellers; an admin who applied keeps their role
+        await USERS.update({ UserAuth: 'Seller' }, { where: { UserID: { [Op.in]: reviewable }, UserAuth: 'User' }, transaction: t });
+      }
+    }
+
+    await t.commit();
+
+    return res.status(200).json({
+      status: 200,
+      message: `Seller applications ${decision === 'Approved' ? 'approved' : 'rejected'}. Please check data to see if any failed.`,
+      data: results
+    });
+  } catch (err) {
+    await t.rollback();
+    console.error('Error reviewing seller applications:', err);
+    return res.status(403).json({ status: 403, message: `Error reviewing seller applications: ${err}` });
+  }
+};
+
+// PATCH /approve-sellers - Approve many seller applications at once
+router.patch('/approve-sellers', checkAuth(['SuperAdmin', 'Admin']), reviewSellerApplications('Approved'));
+
+// PATCH /reject-sellers - Reject many pending seller applications at once
+router.patch('/reject-sellers', checkAuth(['SuperAdmin', 'Admin']), reviewSellerApplications('Rejected'));
+
+
+
 // POST /add-admin - Add a new Admin account (SuperAdmin only)
 router.post('/add-admin', checkAuth(['SuperAdmin']), async (req, res) => {
 
@@ -1,7 +1,8 @@
 // server/routes/cart.js - Cart Endpoint
 const express = require('express');
 const router = express.Router();
-const { CART, PRODUCTS } = require('../models');
+const { CART, PRODUCTS, sequelize } = require('../models');
+const { Op } = require('sequelize');
 const { checkAuth } = require('../functions/checkAuth');
 
 
@@ -20,7 +21,7 @@ router.post('/add', checkAuth(['User','Seller']), async (req, res) => {
   try {
     // Find the product to check MOQ and AvailableQTY
     const product = await PRODUCTS.findOne({where: {ProductID: productId} });
-    if (!product || product.ProdStatus === 'Inactive') {
+    if (!product || product.ProdStatus !== 'Active') {
       return res.status(401).json({ status: 401, message: 'Product not found or is removed from listing' });
     }
 
@@ -105,22 +106,165 @@ router.put('/edit', checkAuth(['User','Seller']), async (req, res) => {
   }
 });
 
+const MAX_CART_OPERATIONS = 100;
+const CART_OPERATIONS = ['add', 'set', 'remove'];
+
+// Apply several cart changes at once (bundles, restoring a saved cart)
+// body: { operations: [{ op: 'add' | 'set' | 'remove', productId, quantity }] }, applied in order.
+// One read of the products and cart lines involved, then one bulk upsert and one DELETE ... IN, all in
+// one transaction: either every operation is applied or, when any of them fails, none is.
+router.patch('/items', checkAuth(['User','Seller']), async (req, res) => {
+  const { operations } = req.body;
+  const user = req.user;
+
+  if (!Array.isArray(operations) || operations.length === 0) {
+    return res.status(400).json({ status: 400, message: 'operations must be a non-empty array' });
+  }
+  if (operations.length > MAX_CART_OPERATIONS) {
+    return res.status(400).json({ status: 400, message: `At most ${MAX_CART_OPERATIONS} operations can be applied at once` });
+  }
+
+  const errors = [];
+  const parsed = operations.map((operation, index) => {
+    const { op, productId, quantity } = operation || {};
+    const productID = parseInt(productId);
+    const qty = parseInt(quantity);
+
+    if (!CART_OPERATIONS.includes(op)) {
+      errors.push({ index, productId, message: `op must be one of ${CART_OPERATIONS.join(', ')}` });
+    } else if (!Number.isInteger(productID) || productID <= 0) {
+      errors.push({ index, productId, message: 'Invalid product ID' });
+    } else if (op === 'add' && !(qty > 0)) {
+      errors.push({ index, productId, message: 'Quantity must be a positive integer' });
+    } else if (op === 'set' && !(qty >= 0)) {
+      errors.push({ index, productId, message: 'Quantity must be zero or a positive integer' });
+    }
+    return { index, op, productID, quantity: qty };
+  });
+
+  if (errors.length > 0) {
+    return res.status(400).json({ status: 400, message: 'Invalid cart operations, nothing was changed', data: errors });
+  }
+
+  const productIDs = [...new Set(parsed.map(operation => operation.productID))];
+  const t = await sequelize.transaction();
+
+  try {
+    const [products, cartEntries] = await Promise.all([
+      PRODUCTS.findAll({
+        attributes: ['ProductID', 'ProductName', 'MOQ', 'AvailableQty', 'ProdStatus'],
+        where: { ProductID: { [Op.in]: productIDs } },
+        raw: true,
+        transaction: t
+      }),
+      CART.findAll({
+        attributes: ['ProductID', 'Quantity'],
+        where: { UserID: user.id, ProductID: { [Op.in]: productIDs } },
+        raw: true,
+        transaction: t
+      })
+    ]);
+    const productByID = new Map(products.map(product => [product.ProductID, product]));
+
+    // resulting quantity of every product touched, 0 meaning not in the cart
+    const quantities = new Map(productIDs.map(productID => [productID, 0]));
+    for (const entry of cartEntries) {
+      quantities.set(entry.ProductID, entry.Quantity);
+    }
+    const lastOperation = new Map();
+    for (const operation of parsed) {
+      const current = quantities.get(operation.productID);
+      if (operation.op === 'add') quantities.set(operation.productID, current + operation.quantity);
+      else if (operation.op === 'set') quantities.set(operation.productID, operation.quantity);
+      else quantities.set(operation.productID, 0);
+      lastOperation.set(operation.productID, operation);
+    }
+
+    // only the final quantity has to satisfy MOQ and stock, so [remove, add] or [set 1, add 9] work as a whole
+    for (const [productID, { index }] of lastOperation) {
+      const quantity = quantities.get(productID);
+      if (quantity === 0) continue;
+      const product = productByID.get(productID);
+
+      if (!product || product.ProdStatus !== 'Active') {
+        errors.push({ index, productId: productID, message: 'Product not found or is removed from listing' });
+      } else if (quantity < product.MOQ) {
+        errors.push({ index, productId: productID, message: `Minimum order quantity for ${product.ProductName} is ${product.MOQ}` });
+      } else if (quantity > product.AvailableQty) {
+        errors.push({ index, productId: productID, message: `Insufficient stock for ${product.ProductName}. Available quantity: ${product.AvailableQty}` });
+      }
+    }
+
+    if (errors.length > 0) {
+      await t.rollback();
+      return res.status(400).json({ status: 400, message: 'Some cart operations failed, nothing was changed', data: errors });
+    }
+
+    const upserts = [];
+    const removals = [];
+    for (const [productID, quantity] of quantities) {
+      if (quantity > 0) upserts.push({ UserID: user.id, ProductID: productID, Quantity: quantity });
+      else removals.push(productID);
+    }
+
+    if (upserts.length > 0) {
+      await CART.bulkCreate(upserts, { updateOnDuplicate: ['Quantity'], transaction: t });
+    }
+    if (removals.length > 0) {
+      await CART.destroy({ where: { UserID: user.id, ProductID: { [Op.in]: removals } }, transaction: t });
+    }
+
+    await t.commit();
+
+    const data = [...quantities].map(([productID, quantity]) => ({ ProductID: productID, Quantity: quantity }));
+    res.status(200).json({ status: 200, message: 'Cart updated successfully', data });
+  } catch (err) {
+    await t.rollback();
+    console.error('Error updating cart items:', err);
+    res.status(400).json({ status: 400, message: `Error updating cart items: ${err}` });
+  }
+});
+
+const roundMoney = (value) => Math.round(value * 100) / 100;
+
 // View cart
+// One joined query: each line carries the live product data the cart page needs, priced like checkout
+// (DiscPrice while a promotion is active) and flagged when it can no longer be bought as it is
 router.get('/view', checkAuth(['User','Seller']), async (req, res) => {
   try {
 
-    user = req.user;
+    const user = req.user;
 
-    const cartItems = await CART.findAll({
-      where: { UserID: user.id },
-      include: [{ model: PRODUCTS, attributes: ['ProductName', 'Price', 'MOQ'] }]
-    });
+    const cartItems = await sequelize.query(`
+      SELECT c.UserID, c.ProductID, c.Quantity,
+             p.ProductName, p.Price, p.DiscPrice, p.PromoActive, p.MOQ, p.AvailableQty, p.ProdStatus,
+             CASE WHEN p.PromoActive THEN p.DiscPrice ELSE p.Price END AS EffectivePrice,
+             '/products/image/' || c.ProductID AS ImageURL
+      FROM CART c
+      JOIN PRODUCTS p ON p.ProductID = c.ProductID
+      WHERE c.UserID = :userId
+      ORDER BY c.ProductID ASC
+    `, { replacements: { userId: user.id }, type: sequelize.QueryTypes.SELECT });
 
     if (!cartItems.length) {
       return res.status(404).json({ status: 404, message: 'No items in cart' });
     }
 
-    res.status(200).json({ status: 200, message: 'Cart items fetched successfully', data: cartItems });
+    const totals = { items: cartItems.length, quantity: 0, subtotal: 0, purchasable: true };
+    for (const item of cartItems) {
+      item.PromoActive = Boolean(item.PromoActive);
+      item.LineTotal = roundMoney(item.EffectivePrice * item.Quantity);
+      item.Purchasable = item.ProdStatus === 'Active' && item.Quantity <= item.AvailableQty && item.Quantity >= item.MOQ;
+      // kept for clients reading the product fields from the nested object
+      item.PRODUCT = { ProductName: item.ProductName, Price: item.Price, MOQ: item.MOQ };
+
+      totals.quantity += item.Quantity;
+      totals.subtotal += item.LineTotal;
+      totals.purchasable = totals.purchasable && item.Purchasable;
+    }
+    totals.subtotal = roundMoney(totals.subtotal);
+
+    res.status(200).json({ status: 200, message: 'Cart items fetched successfully', data: cartItems, totals });
   } catch (err) {
     console.error('Error fetching cart items:', err);
     res.status(400).json({ status: 400, message: `Error fetching cart items: ${err}` });
@@ -7,14 +7,17 @@ const path = require('path');
 const fs = require('fs');
 
 const { CATEGORY } = require('../models');
+const { createImageRoute } = require('../functions/imageDelivery');
+const { versionedCache } = require('../functions/tableVersions');
+const { getCategories } = require('../functions/catalogSnapshot');
 
 const imageFolderPath = path.join(__dirname, '..', 'images/categories');
 
 //********************************************************************************************************************
 // GET route to fetch all category types
-router.get('/', async (req, res) => {
+router.get('/', versionedCache({ tables: ['CATEGORY'], cacheControl: 'public, max-age=300, must-revalidate' }), async (req, res) => {
   try {
-    const category = await CATEGORY.findAll();
+    const category = getCategories() || await CATEGORY.findAll();
     if (category.length === 0) {
       return res.status(401).json({ status: 401, message: 'Category table is empty in database' });
     }
@@ -32,33 +35,14 @@ router.get('/', async (req, res) => {
 });
 
 //********************************************************************************************************************
-// ROUTE TO FETCH IMAGES OF CATEGORIES (serve actual bytes)
-router.get('/image/:id', async (req, res) => {
-  try {
-    const category = await CATEGORY.findOne({ where: { CategoryID: req.params.id } });
-    if (!category) {
-      return res.status(401).json({ status: 401, message: 'Invalid category id' });
-    }
-
-    const file = category.CategoryImage || 'default.jpg';
-    const imagePath = path.join(imageFolderPath, file);
-    if (!fs.existsSync(imagePath)) {
-      return res.status(402).json({ status: 402, message: 'Image does not exist in server. Please upload new image.' });
-    }
-
-    const ext = path.extname(file).toLowerCase();
-    const mime =
-      ext === '.png' ? 'image/png' :
-      ext === '.svg' ? 'image/svg+xml' :
-      'image/jpeg';
-
-    res.setHeader('Content-Type', mime);
-    return fs.createReadStream(imagePath).pipe(res);
-  } catch (err) {
-    console.error('Error fetching category image: ', err);
-    res.status(403).json({ status: 403, message: 'Error fetching category image' });
-  }
-});
+// ROUTE TO FETCH IMAGES OF CATEGORIES (serve actual bytes, ?size=thumb|small|medium for resized variants)
+router.get('/image/:id', createImageRoute({
+  model: CATEGORY,
+  keyField: 'CategoryID',
+  imageField: 'CategoryImage',
+  folder: imageFolderPath,
+  label: 'category'
+}));
 
 //********************************************************************************************************************
 // POST route to create a new category (ADMIN ONLY!)
@@ -377,17 +377,19 @@ router.get('/cancelCheckoutSession', checkAuth(['User', 'Seller']), async (req,
 
   const user = req.user;
 
+  const t = await sequelize.transaction();  // Create a new transaction
   try{
-    const t = await sequelize.transaction();  // Create a new transaction
 
     const transaction = await TRANSACTIONS.findOne({ where: { UserID: user.id, TransactionState: 'PENDING' } });
 
     if (!transaction) {
+      await t.rollback();
       console.log('No pending transaction found');
       return res.status(440).json({ status: 440, message: 'No pending transaction found' });
     }
 
     if (transaction.PaymentID === null) {
+      await t.rollback();
       console.log('No checkout session found');
       return res.status(441).json({ status: 441, message: 'No checkout session found' });
     }
@@ -395,6 +397,7 @@ router.get('/cancelCheckoutSession', checkAuth(['User', 'Seller']), async (req,
     const session = await cancelCheckoutSession(transaction.PaymentID);
 
     if (!session) {
+      await t.rollback();
       console.log('Error cancelling checkout session');
       return res.status(442).json({ status: 442, message: 'Error cancelling checkout session' });
     }
@@ -408,6 +411,7 @@ router.get('/cancelCheckoutSession', checkAuth(['User', 'Seller']), async (req,
     return res.status(200).json({ status: 200, message: 'Checkout session cancelled successfully.' });
 
   } catch (error) {
+    await t.rollback();  // Rollback if something goes wrong
     console.log(error);
     return res.status(443).json({ status: 443, message: error });
   }
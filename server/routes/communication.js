@@ -1,31 +1,19 @@
 // Enhanced Communication/Messaging System with Reporting and Admin Assignment
 const express = require('express');
 const multer = require('multer');
-const path = require('path');
-const fs = require('fs');
 const router = express.Router();
 const { checkAuth } = require('../functions/checkAuth');
-const { DISPUTE, DISPUTE_MSG, USERS, REPORT } = require('../models');
+const { sequelize, DISPUTE, DISPUTE_MSG, USERS, REPORT } = require('../models');
 const { Op } = require('sequelize');
+const { pickLeastLoadedAdmin, getWorkloadSnapshot } = require('../functions/adminWorkload');
+const { searchUsers } = require('../functions/userSearchIndex');
+const { reportAttachmentStorage, resolveAttachment, ATTACHMENT_CACHE_CONTROL } = require('../functions/attachmentStore');
 
-// Setup multer for report attachments
-const reportAttachmentsPath = path.join(__dirname, '..', 'uploads', 'reports');
-if (!fs.existsSync(reportAttachmentsPath)) {
-    fs.mkdirSync(reportAttachmentsPath, { recursive: true });
-}
-
-const reportStorage = multer.diskStorage({
-    destination: (req, file, cb) => {
-        cb(null, reportAttachmentsPath);
-    },
-    filename: (req, file, cb) => {
-        const uniqueSuffix = Date.now() + '-' + Math.round(Math.random() * 1E9);
-        cb(null, `report_${uniqueSuffix}${path.extname(file.originalname)}`);
-    }
-});
+const INBOX_SNIPPET_LENGTH = 120;
 
+// Setup multer for report attachments (content-addressed, see functions/attachmentStore.js)
 const uploadReportAttachments = multer({ 
-    storage: reportStorage,
+    storage: reportAttachmentStorage,
     limits: { fileSize: 10 * 1024 * 1024 }, // 10MB limit
     fileFilter: (req, file, cb) => {
         // Allow images, documents, and text files
@@ -45,42 +33,8 @@ const uploadReportAttachments = multer({
 // Admin assignment helper function
 const assignAdminToReport = async () => {
     try {
-        // Get all available admins (Admin and SuperAdmin)
-        const admins = await USERS.findAll({
-            where: {
-                UserAuth: {
-                    [Op.in]: ['Admin', 'SuperAdmin']
-                },
-                // Add any additional criteria (active status, etc.)
-            },
-            attributes: ['UserID', 'Username', 'UserAuth']
-        });
-
-        if (admins.length === 0) {
-            throw new Error('No available admins found');
-        }
-
-        // Simple round-robin assignment based on report count
-        const adminWorkload = await Promise.all(
-            admins.map(async (admin) => {
-                const reportCount = await REPORT.count({
-                    where: {
-                        AssignedAdminID: admin.UserID,
-                        Status: {
-                            [Op.in]: ['Pending', 'Under Review']
-                        }
-                    }
-                });
-                return {
-                    admin: admin,
-                    workload: reportCount
-                };
-            })
-        );
-
-        // Assign to admin with lowest workload
-        adminWorkload.sort((a, b) => a.workload - b.workload);
-        return adminWorkload[0].admin;
+        // Least-loaded admin (Admin and SuperAdmin) from the cached workload index
+        return await pickLeastLoadedAdmin();
 
     } catch (error) {
         console.error('Error assigning admin:', error);
@@ -92,6 +46,10 @@ const assignAdminToReport = async () => {
     }
 };
 
+// Subquery selecting the admin conversations of reports assigned to an admin
+const assignedReportConversations = (adminId) =>
+    `(SELECT AdminConversationID FROM REPORT WHERE AssignedAdminID = ${sequelize.escape(adminId)} AND AdminConversationID IS NOT NULL)`;
+
 // Search users by username (for starting conversations)
 router.get('/search-users', checkAuth(['User', 'Seller', 'Admin', 'SuperAdmin']), async (req, res) => {
     try {
@@ -105,14 +63,7 @@ router.get('/search-users', checkAuth(['User', 'Seller', 'Admin', 'SuperAdmin'])
             });
         }
 
-        let searchConditions = {
-            Username: {
-                [Op.like]: `%${username.trim()}%`
-            },
-            UserID: {
-                [Op.ne]: currentUser.id // Exclude current user
-            }
-        };
+        let allowedRoles = null;
 
         // Enhanced Communication rules: 
         // - Buyers can contact Sellers only (not Admins directly)
@@ -120,25 +71,16 @@ router.get('/search-users', checkAuth(['User', 'Seller', 'Admin', 'SuperAdmin'])
         // - Admins can contact anyone
         if (currentUser.userAuth === 'User') {
             // Buyers can only search for Sellers (not Admins)
-            searchConditions.UserAuth = {
-                [Op.in]: ['Seller']
-            };
-            console.log(`🔍 Buyer search by ${currentUser.username} - can find Sellers only`);
+            allowedRoles = ['Seller'];
         } else if (currentUser.userAuth === 'Seller') {
             // Sellers can search for Buyers AND Admins (for disputes and support)
-            searchConditions.UserAuth = {
-                [Op.in]: ['User', 'Admin', 'SuperAdmin']
-            };
-            console.log(`🔍 Seller search by ${currentUser.username} - can find Buyers and Admins`);
-        } else {
-            // Admins and SuperAdmins can search for anyone
-            console.log(`🔍 Admin user search by ${currentUser.userAuth} (${currentUser.username}) - no filtering`);
+            allowedRoles = ['User', 'Admin', 'SuperAdmin'];
         }
 
-        // Search for users by username (case-insensitive partial match)
-        const users = await USERS.findAll({
-            where: searchConditions,
-            attributes: ['UserID', 'Username', 'FirstName', 'LastName', 'UserAuth'],
+        // Search the in-memory username index (case-insensitive, prefix matches first)
+        const users = await searchUsers(username, {
+            allowedRoles,
+            excludeUserId: currentUser.id, // Exclude current user
             limit: 10 // Limit results for performance
         });
 
@@ -245,20 +187,13 @@ router.get('/my-conversations', checkAuth(['User', 'Seller', 'Admin', 'SuperAdmi
 
         // UPDATED ADMIN ACCESS: Admins see both regular conversations AND assigned report conversations
         if (user.userAuth === 'Admin' || user.userAuth === 'SuperAdmin') {
-            // Get report IDs where this admin is assigned
-            const assignedReports = await REPORT.findAll({
-                where: { AssignedAdminID: user.id },
-                attributes: ['AdminConversationID']
-            });
-
-            const adminConversationIds = assignedReports.map(report => report.AdminConversationID).filter(id => id !== null);
-            
+            // Assigned report conversations are resolved by a subquery instead of loading every REPORT row
             whereClause = {
                 [Op.or]: [
                     { LodgedBy: user.id },           // Conversations admin started
                     { LodgedAgainst: user.id },      // Conversations directed to admin (seller contacting admin)
                     { HandledBy: user.id },          // Conversations admin is handling
-                    { DisputeID: { [Op.in]: adminConversationIds } } // Assigned report conversations
+                    { DisputeID: { [Op.in]: sequelize.literal(assignedReportConversations(user.id)) } } // Assigned report conversations
                 ]
             };
         }
@@ -301,6 +236,131 @@ router.get('/my-conversations', checkAuth(['User', 'Seller', 'Admin', 'SuperAdmi
     }
 });
 
+// Get a page of the user's inbox ordered by last activity, with last-message preview and unread counts
+router.get('/inbox', checkAuth(['User', 'Seller', 'Admin', 'SuperAdmin']), async (req, res) => {
+    try {
+        const user = req.user;
+        const { status = 'all' } = req.query;
+        const page = Math.max(parseInt(req.query.page) || 1, 1);
+        const limit = Math.min(Math.max(parseInt(req.query.limit) || 20, 1), 100);
+        const isAdmin = user.userAuth === 'Admin' || user.userAuth === 'SuperAdmin';
+
+        // Same visibility rules as /my-conversations
+        let participantClause = 'd.LodgedBy = :userId OR d.LodgedAgainst = :userId';
+        if (isAdmin) {
+            participantClause += ` OR d.HandledBy = :userId OR d.DisputeID IN ${assignedReportConversations(user.id)}`;
+        }
+        const statusClause = status !== 'all' ? 'AND d.Status = :status' : '';
+
+        const rows = await sequelize.query(`
+            SELECT
+                d.DisputeID, d.Title, d.Description, d.LodgedBy, d.LodgedAgainst, d.HandledBy,
+                d.Priority, d.Status, d.IsResolved, d.CreatedAt, d.ResolvedAt,
+                COALESCE(d.LastMessageAt, d.CreatedAt) AS LastActivityAt,
+                m.MessageID AS LastMessageID,
+                substr(m.Message, 1, :snippetLength) AS LastMessageSnippet,
+                length(m.Message) > :snippetLength AS LastMessageTruncated,
+                m.MessageType AS LastMessageType,
+                m.SentBy AS LastMessageSentBy,
+                m.MsgDate AS LastMessageAt,
+                (
+                    SELECT COUNT(*) FROM DISPUTE_MSG u
+                    WHERE u.DisputeID = d.DisputeID AND u.IsRead = 0 AND u.SentBy != :userId
+                ) AS UnreadCount,
+                c.Username AS ComplainantUsername, c.FirstName AS ComplainantFirstName, c.LastName AS ComplainantLastName, c.UserAuth AS ComplainantUserAuth,
+                r.Username AS RespondentUsername, r.FirstName AS RespondentFirstName, r.LastName AS RespondentLastName, r.UserAuth AS RespondentUserAuth,
+                h.Username AS HandlerUsername, h.FirstName AS HandlerFirstName, h.LastName AS HandlerLastName, h.UserAuth AS HandlerUserAuth,
+                COUNT(*) OVER () AS TotalCount
+            FROM DISPUTE d
+            LEFT JOIN DISPUTE_MSG m ON m.MessageID = d.LastMessageID
+            LEFT JOIN USERS c ON c.UserID = d.LodgedBy
+            LEFT JOIN USERS r ON r.UserID = d.LodgedAgainst
+            LEFT JOIN USERS h ON h.UserID = d.HandledBy
+            WHERE (${participantClause}) ${statusClause}
+            ORDER BY LastActivityAt DESC, d.DisputeID DESC
+            LIMIT :limit OFFSET :offset
+        `, {
+            replacements: {
+                userId: user.id,
+                status,
+                snippetLength: INBOX_SNIPPET_LENGTH,
+                limit,
+                offset: (page - 1) * limit
+            },
+            type: sequelize.QueryTypes.SELECT
+        });
+
+        const participant = (row, prefix, userId) => userId === null ? null : {
+            UserID: userId,
+            Username: row[`${prefix}Username`],
+            FirstName: row[`${prefix}FirstName`],
+            LastName: row[`${prefix}LastName`],
+            UserAuth: row[`${prefix}UserAuth`]
+        };
+
+        const conversations = rows.map(row => ({
+            DisputeID: row.DisputeID,
+            Title: row.Title,
+            Description: row.Description,
+            LodgedBy: row.LodgedBy,
+            LodgedAgainst: row.LodgedAgainst,
+            HandledBy: row.HandledBy,
+            Priority: row.Priority,
+            Status: row.Status,
+            IsResolved: Boolean(row.IsResolved),
+            CreatedAt: row.CreatedAt,
+            ResolvedAt: row.ResolvedAt,
+            LastActivityAt: row.LastActivityAt,
+            LastMessage: row.LastMessageID === null ? null : {
+                MessageID: row.LastMessageID,
+                Snippet: row.LastMessageTruncated ? `${row.LastMessageSnippet}...` : row.LastMessageSnippet,
+                MessageType: row.LastMessageType,
+                SentBy: row.LastMessageSentBy,
+                MsgDate: row.LastMessageAt
+            },
+            UnreadCount: row.UnreadCount,
+            Complainant: participant(row, 'Complainant', row.LodgedBy),
+            Respondent: participant(row, 'Respondent', row.LodgedAgainst),
+            Handler: participant(row, 'Handler', row.HandledBy)
+        }));
+
+        // COUNT(*) OVER () rides on the page's rows, so a page past the end counts separately
+        let total = rows.length > 0 ? rows[0].TotalCount : 0;
+        if (rows.length === 0 && page > 1) {
+            const [{ TotalCount }] = await sequelize.query(`
+                SELECT COUNT(*) AS TotalCount FROM DISPUTE d
+                WHERE (${participantClause}) ${statusClause}
+            `, {
+                replacements: { userId: user.id, status },
+                type: sequelize.QueryTypes.SELECT
+            });
+            total = TotalCount;
+        }
+
+        res.status(200).json({
+            status: 200,
+            message: 'Inbox retrieved successfully',
+            data: {
+                conversations,
+                pagination: {
+                    page,
+                    limit,
+                    total,
+                    totalPages: Math.ceil(total / limit),
+                    hasMore: page * limit < total
+                }
+            }
+        });
+
+    } catch (error) {
+        console.error('Error getting inbox:', error);
+        res.status(500).json({
+            status: 500,
+            message: 'Error retrieving inbox'
+        });
+    }
+});
+
 // Get messages for a specific dispute/conversation
 router.get('/conversation/:disputeId/messages', checkAuth(['User', 'Seller', 'Admin', 'SuperAdmin']), async (req, res) => {
     try {
@@ -586,7 +646,8 @@ router.post('/report-conversation', checkAuth(['User', 'Seller']), uploadReportA
         // Process attachments
         let attachmentPaths = [];
         if (req.files && req.files.length > 0) {
-            attachmentPaths = req.files.map(file => file.filename);
+            // identical files in one upload share a stored name
+            attachmentPaths = [...new Set(req.files.map(file => file.filename))];
         }
 
         // Create the report
@@ -826,52 +887,47 @@ router.post('/contact-seller', checkAuth(['User']), async (req, res) => {
 
 // Get report attachments
 router.get('/report-attachment/:filename', checkAuth(['Admin', 'SuperAdmin']), (req, res) => {
-    try {
-        const { filename } = req.params;
-        const filePath = path.join(reportAttachmentsPath, filename);
-        
-        if (!fs.existsSync(filePath)) {
+    const { filename } = req.params;
+    const attachment = resolveAttachment(filename);
+
+    if (!attachment) {
+        return res.status(404).json({
+            status: 404,
+            message: 'Attachment not found'
+        });
+    }
+
+    // Stored files never change: the content hash is a strong validator and the response can be cached
+    if (attachment.hash) {
+        res.set('ETag', `"${attachment.hash}"`);
+    }
+    res.set('Cache-Control', ATTACHMENT_CACHE_CONTROL);
+
+    // sendFile handles Range, If-None-Match and If-Modified-Since
+    res.sendFile(attachment.filePath, (error) => {
+        if (!error || res.headersSent) return;
+        if (error.code === 'ENOENT' || error.status === 404) {
+            res.removeHeader('ETag');
+            res.removeHeader('Cache-Control');
             return res.status(404).json({
                 status: 404,
                 message: 'Attachment not found'
             });
         }
-
-        res.sendFile(filePath);
-    } catch (error) {
         console.error('Error serving attachment:', error);
+        res.removeHeader('ETag');
+        res.removeHeader('Cache-Control');
         res.status(500).json({
             status: 500,
             message: 'Error retrieving attachment'
         });
-    }
+    });
 });
 
 // Get admin workload (for debugging/monitoring)
 router.get('/admin-workload', checkAuth(['SuperAdmin']), async (req, res) => {
     try {
-        const admins = await USERS.findAll({
-            where: {
-                UserAuth: { [Op.in]: ['Admin', 'SuperAdmin'] }
-            },
-            attributes: ['UserID', 'Username', 'FirstName', 'LastName']
-        });
-
-        const workloadData = await Promise.all(
-            admins.map(async (admin) => {
-                const reportCount = await REPORT.count({
-                    where: {
-                        AssignedAdminID: admin.UserID,
-                        Status: { [Op.in]: ['Pending', 'Under Review'] }
-                    }
-                });
-
-                return {
-                    admin: admin,
-                    activeReports: reportCount
-                };
-            })
-        );
+        const workloadData = await getWorkloadSnapshot();
 
         res.status(200).json({
             status: 200,
@@ -1,61 +1,155 @@
 // server/routes/orders.js - Order Management Endpoint Using Sequelize
 const express = require('express');
 const router = express.Router();
-const { TRANSACTIONS, PRODUCTS, DELIVERY_DETAILS, PRODUCT_TRANSACTION_INFO, USERS } = require('../models');
+const { TRANSACTIONS, PRODUCTS, DELIVERY_DETAILS, PRODUCT_TRANSACTION_INFO, USERS, sequelize } = require('../models');
 const { checkAuth } = require('../functions/checkAuth');
+const { compileSerializer, modelSchema, sendSerialized } = require('../functions/serializers');
+const { encodeCursor, decodeCursor } = require('../functions/keysetCursor');
+
+const userOrderInclude = [
+    {
+        model: PRODUCT_TRANSACTION_INFO,
+        attributes: ['Quantity', 'SoldPrice'],
+        include: [
+            {
+                model: PRODUCTS,
+                attributes: ['ProductName']
+            }
+            
+        ]
+    },
+    {
+        model: DELIVERY_DETAILS,
+        attributes: ['DeliveryID', 'TrackingNo', 'DeliveryStatus', 'FirstName', 'LastName', 'ContactNo', 'Address'],
+    }
+];
+
+const SELLER_ORDERS_PAGE_SIZE = 20;
+const DELIVERY_STATUSES = DELIVERY_DETAILS.rawAttributes.DeliveryStatus.values;
+
+// Seller orders are grouped per transaction in SQL: each row carries its order lines as a JSON array
+const serializeGroupedLines = (rows) => `[${rows.map(row => row.Lines).join(',')}]`;
+
+// Same text format as the DATE columns Sequelize writes to SQLite, so ranges compare correctly
+const toSqliteDate = (date) => date.toISOString().replace('T', ' ').replace('Z', ' +00:00');
+
+const serializeUserOrders = compileSerializer({ type: 'array', items: modelSchema(TRANSACTIONS, { include: userOrderInclude }) });
 
 
 // GET /orders - Get all completed and pending orders relevant to Seller (Seller only)
+// One page of transactions, newest first, each as an array of the seller's order lines.
+// Query: limit (default 20, max 100), cursor (pagination.nextCursor of the previous page),
+// from / to (order date range), deliveryStatus
 router.get('/', checkAuth(['Seller']), async (req, res) => {
     
     const user = req.user;
 
     try {
 
-        const orders = await PRODUCT_TRANSACTION_INFO.findAll({
-            include: [
-                {
-                    model: PRODUCTS,
-                    attributes: ['UserID', 'ProductName']
-                },
-                {
-                    model: TRANSACTIONS,
-                    attributes: ['TransactionState'],
-                    include: [
-                        {
-                            model: DELIVERY_DETAILS,
-                            attributes: ['DeliveryID', 'DeliveryStatus', 'FirstName', 'LastName', 'ContactNo', 'Address']
-                        }
-                    ]
-                }
-            ],
-            where: { '$PRODUCT.UserID$': user.id, '$TRANSACTION.TransactionState$': 'APPROVED' },
-            order: [['TransactionID', 'ASC']]
+        const limit = Math.min(Math.max(parseInt(req.query.limit) || SELLER_ORDERS_PAGE_SIZE, 1), 100);
+        const { deliveryStatus } = req.query;
+
+        if (deliveryStatus && !DELIVERY_STATUSES.includes(deliveryStatus)) {
+            return res.status(400).json({ status: 400, message: 'Invalid delivery status' });
+        }
+
+        // keyset cursor over (CreatedAt, TransactionID)
+        const cursor = req.query.cursor ? decodeCursor(req.query.cursor, ['string', 'string']) : null;
+        if (req.query.cursor && !cursor) {
+            return res.status(400).json({ status: 400, message: 'Invalid cursor' });
+        }
+
+        const from = req.query.from ? new Date(req.query.from) : null;
+        const to = req.query.to ? new Date(req.query.to) : null;
+        if ((from && isNaN(from)) || (to && isNaN(to))) {
+            return res.status(400).json({ status: 400, message: 'Invalid date range' });
+        }
+        // `to` is inclusive: a plain date covers that whole day
+        if (to) {
+            to.setTime(to.getTime() + (/^\d{4}-\d{2}-\d{2}$/.test(req.query.to) ? 24 * 60 * 60 * 1000 : 1));
+        }
+
+        const filters = [];
+        if (from) filters.push('t.CreatedAt >= :from');
+        if (to) filters.push('t.CreatedAt < :to');
+        if (deliveryStatus) filters.push('d.DeliveryStatus = :deliveryStatus');
+        if (cursor) filters.push('(t.CreatedAt < :cursorCreatedAt OR (t.CreatedAt = :cursorCreatedAt AND t.TransactionID < :cursorId))');
+
+        // Transactions containing the seller's products are found through the seller's products,
+        // then each page is grouped into one JSON array of order lines per transaction
+        const rows = await sequelize.query(`
+            WITH page AS (
+                SELECT t.TransactionID, t.TransactionState, t.CreatedAt, t.DeliveryID
+                FROM TRANSACTIONS t
+                LEFT JOIN DELIVERY_DETAILS d ON d.DeliveryID = t.DeliveryID
+                WHERE t.TransactionID IN (
+                        SELECT pti.TransactionID
+                        FROM PRODUCT_TRANSACTION_INFO pti
+                        JOIN PRODUCTS p ON p.ProductID = pti.ProductID
+                        WHERE p.UserID = :sellerId
+                    )
+                    AND t.TransactionState = 'APPROVED'
+                    ${filters.map(filter => `AND ${filter}`).join(' ')}
+                ORDER BY t.CreatedAt DESC, t.TransactionID DESC
+                LIMIT :limit
+            )
+            SELECT
+                page.TransactionID,
+                page.CreatedAt,
+                json_group_array(json_object(
+                    'TransactionID', pti.TransactionID,
+                    'ProductID', pti.ProductID,
+                    'Quantity', pti.Quantity,
+                    'SoldPrice', pti.SoldPrice,
+                    'PaymentClaimStatus', pti.PaymentClaimStatus,
+                    'PRODUCT', json_object('UserID', p.UserID, 'ProductName', p.ProductName),
+                    'TRANSACTION', json_object(
+                        'TransactionState', page.TransactionState,
+                        'DELIVERY_DETAIL', CASE WHEN d.DeliveryID IS NULL THEN NULL ELSE json_object(
+                            'DeliveryID', d.DeliveryID,
+                            'DeliveryStatus', d.DeliveryStatus,
+                            'FirstName', d.FirstName,
+                            'LastName', d.LastName,
+                            'ContactNo', d.ContactNo,
+                            'Address', d.Address
+                        ) END
+                    )
+                )) AS Lines
+            FROM page
+            JOIN PRODUCT_TRANSACTION_INFO pti ON pti.TransactionID = page.TransactionID
+            JOIN PRODUCTS p ON p.ProductID = pti.ProductID AND p.UserID = :sellerId
+            LEFT JOIN DELIVERY_DETAILS d ON d.DeliveryID = page.DeliveryID
+            GROUP BY page.TransactionID
+            ORDER BY page.CreatedAt DESC, page.TransactionID DESC
+        `, {
+            replacements: {
+                sellerId: user.id,
+                limit: limit + 1,
+                from: from && toSqliteDate(from),
+                to: to && toSqliteDate(to),
+                deliveryStatus: deliveryStatus || null,
+                cursorCreatedAt: cursor && cursor[0],
+                cursorId: cursor && cursor[1]
+            },
+            type: sequelize.QueryTypes.SELECT
         });
 
-        if (orders.length === 0) {
+        if (rows.length === 0 && !cursor) {
             return res.status(400).json({ status: 400, message: 'No orders found' });
         }
 
+        const hasMore = rows.length > limit;
+        const page = hasMore ? rows.slice(0, limit) : rows;
+        const last = page[page.length - 1];
 
-        //group the orders together by TransactionID
-        let groupedOrders = [];
-        groupedOrders[0] = [];
-        let index = 0;
-        orders.forEach(order => {
-            if (index === 0) {
-                groupedOrders[0].push(order);
-                index++;
-            } else if (order.TransactionID === groupedOrders[index-1][0].TransactionID) {
-                groupedOrders[index-1].push(order);
-            } else {
-                groupedOrders[index] = [];
-                groupedOrders[index].push(order);
-                index++;
+        // Lines is already JSON from SQLite; it is written out as is
+        sendSerialized(res, 200, 'Orders fetched successfully', serializeGroupedLines, page, {
+            pagination: {
+                limit,
+                hasMore,
+                nextCursor: hasMore ? encodeCursor([last.CreatedAt, last.TransactionID]) : null
             }
         });
-
-        res.status(200).json({ status: 200, message: 'Orders fetched successfully', data: groupedOrders });
         
     } catch (err) {
         console.error('Error retrieving orders:', err);
@@ -74,23 +168,7 @@ router.get('/user', checkAuth(['User', 'Seller']), async (req, res) => {
 
         const orders = await TRANSACTIONS.findAll({
             attributes: ['TransactionID', 'CreatedAt'],
-            include: [
-                {
-                    model: PRODUCT_TRANSACTION_INFO,
-                    attributes: ['Quantity', 'SoldPrice'],
-                    include: [
-                        {
-                            model: PRODUCTS,
-                            attributes: ['ProductName']
-                        }
-                        
-                    ]
-                },
-                {
-                    model: DELIVERY_DETAILS,
-                    attributes: ['DeliveryID', 'TrackingNo', 'DeliveryStatus', 'FirstName', 'LastName', 'ContactNo', 'Address'],
-                }
-            ],
+            include: userOrderInclude,
             where: { '$TRANSACTIONS.UserID$': user.id, '$TRANSACTIONS.TransactionState$': 'APPROVED' },
             order: [['CreatedAt', 'DESC']]
         });
@@ -101,7 +179,7 @@ router.get('/user', checkAuth(['User', 'Seller']), async (req, res) => {
         }
 
 
-        res.status(200).json({ status: 200, message: 'Orders fetched successfully', data: orders });
+        sendSerialized(res, 200, 'Orders fetched successfully', serializeUserOrders, orders);
         
     } catch (err) {
         console.error('Error retrieving orders:', err);
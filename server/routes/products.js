@@ -4,18 +4,27 @@ const multer = require('multer');
 const path = require('path');
 const router = express.Router();
 const { verifyToken } = require('../functions/verifyToken');
-const { checkAuth } = require('../functions/checkAuth');
+const { checkAuth, checkActiveAccount } = require('../functions/checkAuth');
 const fs = require('fs');
 
 // Import enhanced verification services
 const { suggestCategory, verifyProductSuitability, getAvailableCategories } = require('../functions/categoryVerification');
 const { generateProductImage, getImageOptions } = require('../functions/imageService');
+const { createImageRoute } = require('../functions/imageDelivery');
+const { enqueueUploadedImage, enqueueAutoImage, getImageStatus } = require('../functions/imageQueue');
+const { compileSerializer, modelSchema, sendSerialized } = require('../functions/serializers');
+const { versionedCache } = require('../functions/tableVersions');
+const { getProductsByCategory, getProductsBySeller, getProductWithSeller } = require('../functions/catalogSnapshot');
+const { recordProductView } = require('../functions/sellerStats');
+const { MAX_IMPORT_ROWS, importFormat, importProducts } = require('../functions/productImport');
 
 const { sequelize, CATEGORY, PRODUCTS, CART, PRODUCT_VIEWS, DISPUTE_MSG, USERS, Sequelize } = require('../models');
 const { Op } = Sequelize;
 
 const imageFolderPath = path.join(__dirname, '..', 'images/products');
 
+const serializeProductList = compileSerializer({ type: 'array', items: modelSchema(PRODUCTS) });
+
 //********************************************************************************************************************
 // GET route to fetch all products
 router.get('/', async (req, res) => {
@@ -24,7 +33,7 @@ router.get('/', async (req, res) => {
     if (products.length === 0) {
       return res.status(401).json({ status: 401, message: 'No products found' });
     }
-    res.status(200).json({ status: 200, message: 'All products fetched successfully', data: products });
+    sendSerialized(res, 200, 'All products fetched successfully', serializeProductList, products);
   } catch (err) {
     console.error('Error fetching products: ', err);
     if (err.name === 'SequelizeConnectionError') {
@@ -38,44 +47,39 @@ router.get('/', async (req, res) => {
 });
 
 //********************************************************************************************************************
-// ROUTE TO FETCH IMAGES OF PRODUCTS (serve actual bytes)
-router.get('/image/:id', async (req, res) => {
+// ROUTE TO FETCH IMAGES OF PRODUCTS (serve actual bytes, ?size=thumb|small|medium for resized variants)
+router.get('/image/:id', createImageRoute({
+  model: PRODUCTS,
+  keyField: 'ProductID',
+  imageField: 'ProductImage',
+  folder: imageFolderPath,
+  label: 'product',
+  fallbackToDefault: true
+}));
+
+//********************************************************************************************************************
+// ROUTE TO CHECK BACKGROUND IMAGE PROCESSING OF A PRODUCT
+router.get('/image-status/:id', checkAuth(['Seller']), async (req, res) => {
   try {
-    const product = await PRODUCTS.findOne({ where: { ProductID: req.params.id } });
-    if (!product) {
+    const product = await PRODUCTS.findOne({ where: { ProductID: req.params.id }, attributes: ['ProductID', 'UserID', 'ProductImage'] });
+    if (!product || product.UserID !== req.user.id) {
       return res.status(401).json({ status: 401, message: 'Invalid product id' });
     }
 
-    const file = product.ProductImage || 'default.jpg';
-    const imagePath = path.join(imageFolderPath, file);
-
-    const tryDefault = () => {
-      const fallback = path.join(imageFolderPath, 'default.jpg');
-      if (fs.existsSync(fallback)) {
-        const ext = path.extname('default.jpg').toLowerCase();
-        const mime =
-          ext === '.png' ? 'image/png' :
-          ext === '.svg' ? 'image/svg+xml' :
-          'image/jpeg';
-        res.setHeader('Content-Type', mime);
-        return fs.createReadStream(fallback).pipe(res);
+    const job = getImageStatus(product.ProductID);
+    res.status(200).json({
+      status: 200,
+      message: 'Image status fetched successfully',
+      data: {
+        ProductID: product.ProductID,
+        ProductImage: product.ProductImage,
+        imageStatus: job ? job.status : (product.ProductImage === 'default.jpg' ? 'none' : 'done'),
+        error: job ? job.error : null
       }
-      return res.status(402).json({ status: 402, message: 'Image does not exist in server. Please upload new image.' });
-    };
-
-    if (!fs.existsSync(imagePath)) return tryDefault();
-
-    const ext = path.extname(file).toLowerCase();
-    const mime =
-      ext === '.png' ? 'image/png' :
-      ext === '.svg' ? 'image/svg+xml' :
-      'image/jpeg';
-
-    res.setHeader('Content-Type', mime);
-    return fs.createReadStream(imagePath).pipe(res);
+    });
   } catch (err) {
-    console.error('Error fetching product image: ', err);
-    res.status(403).json({ status: 403, message: 'Error fetching product image' });
+    console.error('Error fetching image status: ', err);
+    res.status(403).json({ status: 403, message: 'Error fetching image status' });
   }
 });
 
@@ -93,7 +97,8 @@ const storage = multer.diskStorage({
     cb(null, imageFolderPath); // Specify the upload directory
   },
   filename: (req, file, cb) => {
-    cb(null, Date.now() + path.extname(file.originalname)); // Use timestamp as filename (fixed)
+    // temporary name - the image queue moves it to <ProductID><ext> once processed
+    cb(null, `upload_${Date.now()}-${Math.round(Math.random() * 1E9)}${path.extname(file.originalname)}`);
   }
 });
 
@@ -162,7 +167,7 @@ const validateProduct = async (req, res, next) => {
 };
 
 // ACTUAL POST route to create a new product
-router.post('/', checkAuth(['Seller']), upload.single('image'), validateProduct, async (req, res) => {
+router.post('/', checkAuth(['Seller']), checkActiveAccount, upload.single('image'), validateProduct, async (req, res) => {
   try {
     let { productName, price, MOQ, availableQty, description, category, useAutoImage } = req.body;
     const user = req.user;
@@ -191,46 +196,23 @@ router.post('/', checkAuth(['Seller']), upload.single('image'), validateProduct,
       CategoryID: category
     });
 
-    let imageProcessed = false;
+    // Image ingestion runs in the background; the product keeps default.jpg until the job finishes
+    let imageStatus = 'none';
 
     // Manual upload
     if (req.file) {
-      const newFileName = `${productEntry.ProductID}${path.extname(req.file.originalname)}`;
-      const oldPath = path.join(imageFolderPath, req.file.filename);
-      const newPath = path.join(imageFolderPath, newFileName);
-
-      fs.rename(oldPath, newPath, (err) => {
-        if (err) {
-          console.error('Error renaming file:', err);
-          fs.unlink(oldPath, (err2) => {
-            if (err2) console.error(err2);
-          });
-          return res.status(405).json({ status: 405, message: 'Error uploading image', data: productEntry.get() });
-        }
-      });
-
-      productEntry.ProductImage = newFileName;
-      await productEntry.save();
-      imageProcessed = true;
+      imageStatus = enqueueUploadedImage(productEntry.ProductID, req.file);
     }
     // Auto image
     else if (useAutoImage === 'true' || useAutoImage === true) {
-      try {
-        const imageResult = await generateProductImage(productName, categoryExists.CategoryName);
-        if (imageResult.success) {
-          productEntry.ProductImage = imageResult.imagePath;
-          await productEntry.save();
-          imageProcessed = true;
-        }
-      } catch (autoImageError) {
-        console.error('Error in auto image generation:', autoImageError);
-      }
+      imageStatus = enqueueAutoImage(productEntry.ProductID, productName, categoryExists.CategoryName);
     }
 
     // Enhanced response with verification info
     const responseData = {
       ...productEntry.get(), 
-      imageProcessed,
+      imageProcessed: false,
+      imageStatus,
       verification: {
         approved: req.verificationResult.approved,
         confidence: req.verificationResult.confidence,
@@ -261,9 +243,39 @@ router.post('/', checkAuth(['Seller']), upload.single('image'), validateProduct,
   }
 });
 
+//********************************************************************************************************************
+// POST route to import many products at once (SELLERS ONLY!)
+// Body: text/csv with a header row, or application/x-ndjson with one object per line. Columns/keys are the
+// fields of POST /products: productName, price, category (required), MOQ, availableQty, description.
+// Every row is reported back (created / rejected with its errors); products are created with the default image.
+router.post('/import', checkAuth(['Seller']), checkActiveAccount, async (req, res) => {
+  const format = importFormat(req.headers['content-type']);
+  if (!format) {
+    return res.status(415).json({ status: 415, message: 'Send the products as text/csv or application/x-ndjson' });
+  }
+
+  try {
+    const result = await importProducts(req.user.id, req, format);
+
+    // malformed file (missing header columns, unterminated quote, oversized row): earlier batches stay imported
+    if (result.error) {
+      return res.status(400).json({ status: 400, message: `Import stopped: ${result.error}`, data: result });
+    }
+
+    const message = result.truncated
+      ? `Import stopped after ${MAX_IMPORT_ROWS} rows: ${result.created} products created, ${result.rejected} rows rejected`
+      : `${result.created} products created, ${result.rejected} rows rejected`;
+
+    res.status(200).json({ status: 200, message, data: result });
+  } catch (err) {
+    console.error('Error importing products:', err);
+    res.status(500).json({ status: 500, message: `Error importing products: ${err}` });
+  }
+});
+
 //********************************************************************************************************************
 // PATCH route to edit product info (SELLERS ONLY!)
-router.patch('/edit/:id', checkAuth(['Seller']), async (req, res) => {
+router.patch('/edit/:id', checkAuth(['Seller']), checkActiveAccount, async (req, res) => {
   const { id } = req.params;
   const { productName, price, MOQ, availableQty, description, category } = req.body;
   const user = req.user;
@@ -329,7 +341,7 @@ router.patch('/edit/:id', checkAuth(['Seller']), async (req, res) => {
 
 //********************************************************************************************************************
 // route to update product image
-router.patch('/imageEdit/:id', checkAuth(['Seller']), upload.single('image'), async (req, res) => {
+router.patch('/imageEdit/:id', checkAuth(['Seller']), checkActiveAccount, upload.single('image'), async (req, res) => {
   const { id: productID } = req.params;
   const user = req.user;
 
@@ -337,49 +349,16 @@ router.patch('/imageEdit/:id', checkAuth(['Seller']), upload.single('image'), as
     const product = await PRODUCTS.findOne({ where: { ProductID: productID } });
 
     if (req.file) {
-      let existingFileName;
-      let oldImageExists = 0;
-
-      if (product.ProductImage === 'default.jpg') {
-        existingFileName = `${product.ProductID}${path.extname(req.file.originalname)}`;
-      } else {
-        existingFileName = product.ProductImage;
-        oldImageExists = 1;
-      }
-
-      const existingPath = path.join(imageFolderPath, existingFileName);
-      const newUnrenamedPath = path.join(imageFolderPath, req.file.filename);
-
-      if (user.id !== product.UserID) {
-        fs.unlink(newUnrenamedPath, (err) => {
+      if (!product || user.id !== product.UserID) {
+        fs.unlink(path.join(imageFolderPath, req.file.filename), (err) => {
           if (err) console.error(err);
         });
         return res.status(600).json({ status: 600, message: 'User not authorized to edit this product' });
       }
 
-      if (oldImageExists && fs.existsSync(existingPath)) {
-        fs.unlink(existingPath, (err) => {
-          if (err) console.error(err);
-        });
-      }
-
-      fs.rename(newUnrenamedPath, existingPath, async (err) => {
-        if (err) {
-          console.error('Error renaming file:', err);
-          fs.unlink(newUnrenamedPath, (err2) => {
-            if (err2) console.error(err2);
-          });
-
-          product.ProductImage = 'default.jpg';
-          await product.save();
-          return res.status(601).json({ status: 601, message: 'Error uploading new image', data: product.get() });
-        }
-      });
-
-      product.ProductImage = existingFileName;
-      await product.save();
+      const imageStatus = enqueueUploadedImage(product.ProductID, req.file);
 
-      return res.status(200).json({ status: 200, message: 'Product image updated successfully', data: product.get() });
+      return res.status(200).json({ status: 200, message: 'Product image update queued', data: { ...product.get(), imageStatus } });
     }
 
     return res.status(602).json({ status: 602, message: 'No image uploaded' });
@@ -393,43 +372,65 @@ router.patch('/imageEdit/:id', checkAuth(['Seller']), upload.single('image'), as
 
 //********************************************************************************************************************
 // route to delete product (Seller & Admin only)
-router.patch('/toggleStatus', checkAuth(['Seller', 'SuperAdmin', 'Admin']), async (req, res) => {
+router.patch('/toggleStatus', checkAuth(['Seller', 'SuperAdmin', 'Admin']), checkActiveAccount, async (req, res) => {
   const { products, newStatus } = req.body; //array of product IDs to delete
   const user = req.user;
 
   var failedDeletions = [];
 
-  try {
-    if (newStatus !== 'Active' && newStatus !== 'Inactive') {
-      return res.status(400).json({ status: 400, message: 'Invalid status provided' });
-    }
+  if (newStatus !== 'Active' && newStatus !== 'Inactive') {
+    return res.status(400).json({ status: 400, message: 'Invalid status provided' });
+  }
 
-    for (const productID of products) {
-      const product = await PRODUCTS.findOne({ where: { ProductID: productID } });
+  if (!Array.isArray(products) || products.length === 0) {
+    return res.status(400).json({ status: 400, message: 'products must be a non-empty array of product IDs' });
+  }
+
+  const t = await sequelize.transaction();
 
+  try {
+    // one read for every product, then one UPDATE ... IN and (when deactivating) one DELETE ... IN
+    const productIDs = new Map(products.map(productID => [String(productID), productID]));
+    const found = await PRODUCTS.findAll({
+      attributes: ['ProductID', 'UserID', 'ProdStatus'],
+      where: { ProductID: { [Op.in]: [...productIDs.keys()] } },
+      raw: true,
+      transaction: t
+    });
+    const productByID = new Map(found.map(product => [String(product.ProductID), product]));
+
+    const editable = [];
+    for (const [key, productID] of productIDs) {
+      const product = productByID.get(key);
       if (!product) {
         failedDeletions.push({ productID: productID, message: 'Invalid product ID' });
-        continue;
-      }
-
-      if (user.userAuth === 'Seller' && product.UserID !== user.id) {
+      } else if (user.userAuth === 'Seller' && product.UserID !== user.id) {
         failedDeletions.push({ productID: productID, message: 'User not authorized to edit this product' });
-        continue;
+      } else if (product.ProdStatus === 'Suspended') {
+        // only reactivating the seller's account lists suspended products again
+        failedDeletions.push({ productID: productID, message: 'Product is suspended' });
+      } else {
+        editable.push(key);
       }
+    }
+
+    if (editable.length > 0) {
+      const where = { ProductID: { [Op.in]: editable }, ProdStatus: { [Op.ne]: 'Suspended' } };
+      // ownership and suspension are checked again in the statement itself
+      if (user.userAuth === 'Seller') where.UserID = user.id;
 
-      product.ProdStatus = newStatus;
-      await product.save();
+      await PRODUCTS.update({ ProdStatus: newStatus }, { where, transaction: t });
 
       if (newStatus === 'Inactive') {
-        const cart = await CART.findAll({ where: { ProductID: productID } });
-        for (const cartItem of cart) {
-          cartItem.destroy();
-        }
+        await CART.destroy({ where: { ProductID: { [Op.in]: editable } }, transaction: t });
       }
     }
 
+    await t.commit();
+
     return res.status(200).json({ status: 200, message: "Products' status edit completed. Please check data to see if any edits failed.", data: failedDeletions });
   } catch (err) {
+    await t.rollback();
     return res.status(401).json({ status: 401, message: `Error: ${err}` });
   }
 });
@@ -496,7 +497,8 @@ router.post('/suggest-category', checkAuth(['Seller']), async (req, res) => {
 });
 
 // Route to get available categories with their keywords
-router.get('/categories-info', async (req, res) => {
+// static data: the ETag only changes when the server restarts
+router.get('/categories-info', versionedCache({ cacheControl: 'public, max-age=3600' }), async (req, res) => {
   try {
     const categoriesInfo = getAvailableCategories();
 
@@ -636,10 +638,14 @@ router.post('/track-view/:id', async (req, res) => {
       }
     }
 
-    await PRODUCT_VIEWS.create({
-      ProductID: productId,
-      UserID: userId,
-      UserAgent: userAgent
+    // the view and the seller dashboard's daily totals are recorded together or not at all
+    await sequelize.transaction(async (t) => {
+      await PRODUCT_VIEWS.create({
+        ProductID: productId,
+        UserID: userId,
+        UserAgent: userAgent
+      }, { transaction: t });
+      await recordProductView(product, { transaction: t });
     });
 
     res.status(200).json({
@@ -655,33 +661,87 @@ router.post('/track-view/:id', async (req, res) => {
   }
 });
 
-// Route to get product view statistics
-router.get('/view-stats/:id', async (req, res) => {
+const VIEW_STATS_MAX_IDS = 500;
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Total, 7-day and 30-day views of many products in one grouped query (conditional aggregation).
+// `where` selects the products; products without views are returned with zero counts.
+const getViewStats = async (where, replacements) => {
+  const now = Date.now();
+  const rows = await sequelize.query(`
+      SELECT p.ProductID AS productId,
+             COUNT(pv.ViewID) AS totalViews,
+             COALESCE(SUM(CASE WHEN pv.ViewedAt >= :sevenDaysAgo THEN 1 ELSE 0 END), 0) AS recentViews,
+             COALESCE(SUM(CASE WHEN pv.ViewedAt >= :thirtyDaysAgo THEN 1 ELSE 0 END), 0) AS last30DaysViews
+      FROM PRODUCTS p
+      LEFT JOIN PRODUCT_VIEWS pv ON pv.ProductID = p.ProductID
+      WHERE ${where}
+      GROUP BY p.ProductID
+      ORDER BY p.ProductID ASC
+  `, {
+    replacements: {
+      ...replacements,
+      sevenDaysAgo: new Date(now - 7 * DAY_MS),
+      thirtyDaysAgo: new Date(now - 30 * DAY_MS)
+    },
+    type: sequelize.QueryTypes.SELECT
+  });
+  return rows;
+};
+
+// Route to get view statistics of many products at once
+// Query: ids=1,2,3 (at most 500) or sellerId=5 (every product of that seller)
+router.get('/view-stats', async (req, res) => {
   try {
-    const productId = req.params.id;
+    const { ids, sellerId } = req.query;
+    let stats;
+
+    if (ids) {
+      const productIds = [...new Set(String(ids).split(',').map(id => id.trim()))];
+      if (productIds.some(id => !/^\d+$/.test(id))) {
+        return res.status(400).json({ status: 400, message: 'ids must be a comma-separated list of product IDs' });
+      }
+      if (productIds.length > VIEW_STATS_MAX_IDS) {
+        return res.status(400).json({ status: 400, message: `At most ${VIEW_STATS_MAX_IDS} product IDs per request` });
+      }
+      stats = await getViewStats('p.ProductID IN (:productIds)', { productIds: productIds.map(Number) });
+    } else if (sellerId) {
+      if (!/^\d+$/.test(String(sellerId))) {
+        return res.status(400).json({ status: 400, message: 'Invalid seller ID' });
+      }
+      stats = await getViewStats('p.UserID = :sellerId', { sellerId: Number(sellerId) });
+    } else {
+      return res.status(400).json({ status: 400, message: 'Provide ids or sellerId' });
+    }
 
-    const totalViews = await PRODUCT_VIEWS.count({
-      where: { ProductID: productId }
+    res.status(200).json({
+      status: 200,
+      message: 'View statistics retrieved successfully',
+      data: stats
+    });
+  } catch (error) {
+    console.error('Error getting view stats:', error);
+    res.status(500).json({
+      status: 500,
+      message: 'Error retrieving view statistics'
     });
+  }
+});
 
-    const sevenDaysAgo = new Date();
-    sevenDaysAgo.setDate(sevenDaysAgo.getDate() - 7);
+// Route to get product view statistics
+router.get('/view-stats/:id', async (req, res) => {
+  try {
+    const productId = req.params.id;
 
-    const recentViews = await PRODUCT_VIEWS.count({
-      where: {
-        ProductID: productId,
-        ViewedAt: {
-          [Op.gte]: sevenDaysAgo
-        }
-      }
-    });
+    const [stats] = await getViewStats('p.ProductID = :productId', { productId });
 
     res.status(200).json({
       status: 200,
       message: 'View statistics retrieved successfully',
       data: {
-        totalViews,
-        recentViews,
+        totalViews: stats ? stats.totalViews : 0,
+        recentViews: stats ? stats.recentViews : 0,
+        last30DaysViews: stats ? stats.last30DaysViews : 0,
         productId: productId
       }
     });
@@ -1078,7 +1138,8 @@ router.get('/recommendations/category/:categoryId', async (req, res) => {
 //********************************************************************************************************************
 // GET route to fetch a single product OR products of a category OR seller ID
 // IMPORTANT: Keep this route LAST to avoid conflicts with specific routes
-router.get('/:searchBy/:id', async (req, res) => {
+// responses depend on the Authorization header (a token replaces the id), so validators vary by it
+router.get('/:searchBy/:id', versionedCache({ tables: ['PRODUCTS', 'USERS'], cacheControl: 'private, no-cache', varyByAuth: true }), async (req, res) => {
   const { searchBy } = req.params;
   let id;
 
@@ -1098,16 +1159,29 @@ router.get('/:searchBy/:id', async (req, res) => {
 
   if (searchBy === 'category') {
     try {
-      const products = await PRODUCTS.findAll({ where: { CategoryID: id } });
+      const products = getProductsByCategory(id) || await PRODUCTS.findAll({ where: { CategoryID: id } });
       if (products.length === 0) {
         return res.status(402).json({ status: 402, message: `No products found for category ID=${id}` });
       }
-      res.status(200).json({ status: 200, message: 'Product by category fetched successfully', data: products });
+      sendSerialized(res, 200, 'Product by category fetched successfully', serializeProductList, products);
     } catch (err) {
       res.status(403).json({ status: 403, message: `Error fetching products: ${err}` });
     }
   } else if (searchBy === 'product') {
     try {
+      // served from the catalog snapshot when it is enabled and loaded
+      const cachedProduct = getProductWithSeller(id);
+      if (cachedProduct !== undefined) {
+        if (!cachedProduct) {
+          return res.status(404).json({ status: 404, message: `Product ID ${id} does not exist` });
+        }
+        return res.status(200).json({ 
+          status: 200, 
+          message: 'Single product with seller info fetched successfully', 
+          data: cachedProduct 
+        });
+      }
+
       const product = await PRODUCTS.findOne({ 
         where: { ProductID: id },
         include: [{
@@ -1143,11 +1217,11 @@ router.get('/:searchBy/:id', async (req, res) => {
     }
   } else if (searchBy === 'seller') {
     try {
-      const products = await PRODUCTS.findAll({ where: { UserID: id } });
+      const products = getProductsBySeller(id) || await PRODUCTS.findAll({ where: { UserID: id } });
       if (products.length === 0) {
         return res.status(405).json({ status: 405, message: `No products found for seller ID=${id}` });
       }
-      res.status(200).json({ status: 200, message: 'Product by seller fetched successfully', data: products });
+      sendSerialized(res, 200, 'Product by seller fetched successfully', serializeProductList, products);
     } catch (err) {
       res.status(406).json({ status: 406, message: `Error fetching products: ${err}` });
     }
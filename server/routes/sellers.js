@@ -0,0 +1,26 @@
+// server/routes/sellers.js - Seller Dashboard Endpoint
+const express = require('express');
+const { checkAuth } = require('../functions/checkAuth');
+const { SUMMARY_WINDOWS, getSellerSummary } = require('../functions/sellerStats');
+const router = express.Router();
+
+// GET /sellers/me/summary - Revenue, units sold, orders, views, conversion rate, top products and
+// low-stock alerts of the logged-in seller. Query: window = 7d | 30d (default) | 90d | 365d
+router.get('/me/summary', checkAuth(['Seller']), async (req, res) => {
+  const user = req.user;
+  const window = req.query.window || '30d';
+
+  if (!SUMMARY_WINDOWS[window]) {
+    return res.status(400).json({ status: 400, message: `Invalid window, expected one of: ${Object.keys(SUMMARY_WINDOWS).join(', ')}` });
+  }
+
+  try {
+    const summary = await getSellerSummary(user.id, window);
+    return res.status(200).json({ status: 200, message: 'Seller summary fetched successfully', data: summary });
+  } catch (err) {
+    console.error('Error fetching seller summary:', err);
+    res.status(500).json({ status: 500, message: `Error fetching seller summary: ${err}` });
+  }
+});
+
+module.exports = router;
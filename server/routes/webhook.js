@@ -5,6 +5,7 @@ const router = express.Router();
 const { CART, TRANSACTIONS, PRODUCT_TRANSACTION_INFO, PAYMENT, PRODUCTS, DELIVERY_DETAILS } = require('../models');
 const { gateway } = require('../interfaces/payment_interface/stripe');
 const { createDeliveryOrder } = require('../interfaces/logistics_interface/mockup');
+const { recordApprovedSale } = require('../functions/sellerStats');
 
 
 // function to set PaymentClaimStatus to INVALID and update AvailableQty in PRODUCTS table
@@ -79,6 +80,7 @@ router.post('/stripeWebhook', async (req, res) => {
                     entry.TransactionState = 'PAID BUT COLLIDED';
                     await entry.save({ transaction: t });
                     }
+                    await t.commit();  // Keep the collided transactions on hold
                     console.log("Collision occurred. Collided transactions on hold.");
                     return res.status(432).json({ status: 432, message: 'Collision occurred. Collided transactions on hold.' });
                 }
@@ -93,6 +95,9 @@ router.post('/stripeWebhook', async (req, res) => {
                     item.PaymentClaimStatus = 'UNCLAIMED';
                     await item.save({ transaction: t });
                 }
+
+                // seller dashboard daily totals
+                await recordApprovedSale(transactionId, { transaction: t });
         
         
                 //clear cart
@@ -155,6 +160,7 @@ router.post('/stripeWebhook', async (req, res) => {
                     await entry.save({ transaction: t });
                     await invalidateTransactionItems(entry.TransactionID, t);
                     }
+                    await t.commit();  // Commit the aborted transactions
         
                     return res.status(441).json({ status: 441, message: 'Collision occurred. Collided transactions aborted.' });
                 }